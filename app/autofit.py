@@ -0,0 +1,260 @@
+"""
+This module contains the auto-fit of the lyric text.
+
+Each strophe is measured with the metrics of the real font of the slides and gets the
+largest font size that fits in the textbox of the slide (16 x 9 inches).
+
+The advance width of each character is measured once per font, at a reference size, and
+scaled to the other sizes (the widths are proportional to the size). The widths are kept
+in memory and in settings/glyph_widths.json, so after the first slides fitting a strophe
+is only a sum of the widths of its characters.
+"""
+
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from PIL.ImageFont import FreeTypeFont, ImageFont
+
+    from app.create_pptx import SlidesConfig
+
+GLYPH_WIDTHS_FILE_NAME = "glyph_widths.json"
+
+# the size (in points) the characters are measured at
+REFERENCE_SIZE = 100
+
+# the textbox of the lyric slides (the whole 16 x 9 inches slide) minus its insets, in points
+TEXTBOX_WIDTH_PT = 16 * 72 - 2 * 7.2
+TEXTBOX_HEIGHT_PT = 9 * 72 - 2 * 3.6
+
+# the textbox starts with an empty paragraph (18 PT) before the lyric paragraph
+EMPTY_PARAGRAPH_HEIGHT_PT = 18 * 1.2
+
+MIN_FONT_SIZE_PT = 12
+MAX_FONT_SIZE_PT = 96
+
+# the measures don't include kerning and the line breaks of PowerPoint, a small margin
+FIT_MARGIN = 0.95
+
+
+class GlyphWidthCache:
+    """
+    This class keeps the advance width of the characters of each font.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Creates the cache, it's only read from the disk when a width is first needed.
+
+        :param path (str | None): the path of the file, the settings folder by default.
+        """
+        self.path = path or os.path.join(
+            os.getcwd(), "settings", GLYPH_WIDTHS_FILE_NAME
+        )
+
+        # font key -> character -> width at REFERENCE_SIZE (points)
+        self._widths: Dict[str, Dict[str, float]] | None = None
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def text_width(self, text: str, font_name: str, bold: bool = False) -> float:
+        """
+        Returns the width of a line of text at REFERENCE_SIZE.
+
+        :param text (str): the line.
+        :param font_name (str): the name of the font.
+        :param bold (bool): if the font is bold.
+
+        :return (float): the width in points.
+        """
+        with self._lock:
+            if self._widths is None:
+                self._widths = self._load()
+
+            font_key = _font_key(font_name, bold)
+            font_widths = self._widths.setdefault(font_key, {})
+
+            missing = set(text).difference(font_widths)
+
+            if missing:
+                font = _load_font(font_name, bold)
+
+                for character in missing:
+                    font_widths[character] = font.getlength(character)
+
+                self._changed = True
+
+            return sum(font_widths[character] for character in text)
+
+    def save(self) -> None:
+        """
+        Writes the widths to the disk, if new characters were measured.
+        """
+        with self._lock:
+            if not self._changed or self._widths is None:
+                return
+
+            temporary_path = self.path + ".tmp"
+
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+                with open(temporary_path, "w", encoding="utf-8") as widths_file:
+                    json.dump(
+                        {"reference_size": REFERENCE_SIZE, "fonts": self._widths},
+                        widths_file,
+                        ensure_ascii=False,
+                    )
+
+                os.replace(temporary_path, self.path)
+                self._changed = False
+
+            except OSError:
+                pass
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        """
+        Reads the widths saved on the disk.
+
+        :return: the widths of each font.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as widths_file:
+                saved = json.load(widths_file)
+
+            if saved.get("reference_size") == REFERENCE_SIZE:
+                return saved["fonts"]
+
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        return {}
+
+
+@lru_cache(maxsize=None)
+def find_font_file(font_name: str, bold: bool) -> str:
+    """
+    Finds the file of an installed font.
+
+    :param font_name (str): the name of the font.
+    :param bold (bool): if the font is bold.
+
+    :return (str): the path of the font file, "" if the font isn't installed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from pptx.text.fonts import FontFiles
+
+    try:
+        return FontFiles.find(font_name, bold, False)
+
+    except (KeyError, OSError):
+        if bold:
+            return find_font_file(font_name, False)
+
+        return ""
+
+
+def _font_key(font_name: str, bold: bool) -> str:
+    """
+    Returns the key of the font in the cache, the fonts that aren't installed are
+    measured with the default font, so they share its key.
+
+    :param font_name (str): the name of the font.
+    :param bold (bool): if the font is bold.
+
+    :return (str): the key of the font.
+    """
+    font_path = find_font_file(font_name, bold)
+
+    return os.path.basename(font_path) if font_path else "<default>"
+
+
+@lru_cache(maxsize=16)
+def _load_font(font_name: str, bold: bool) -> "FreeTypeFont | ImageFont":
+    """
+    Loads the font at REFERENCE_SIZE.
+
+    :param font_name (str): the name of the font.
+    :param bold (bool): if the font is bold.
+
+    :return: the font, the default font of PIL if it isn't installed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from PIL import ImageFont
+
+    font_path = find_font_file(font_name, bold)
+
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, REFERENCE_SIZE)
+
+        except OSError:
+            pass
+
+    return ImageFont.load_default(REFERENCE_SIZE)
+
+
+glyph_widths = GlyphWidthCache()
+
+
+def fit_font_size(strophe: str, slides_config: "SlidesConfig") -> int:
+    """
+    Returns the largest font size the strophe fits in the lyric textbox.
+
+    :param strophe (str): the strophe, its lines are separated by "\\n".
+    :param slides_config (SlidesConfig): the configuration of the slides.
+
+    :return (int): the font size in points.
+    """
+    lines = strophe.upper().split("\n")
+
+    widest_line = max(
+        glyph_widths.text_width(
+            line, slides_config.text_font_name, slides_config.text_font_isbold
+        )
+        for line in lines
+    )
+
+    # the lines don't wrap, so the widest line limits the size
+    width_limit = (
+        TEXTBOX_WIDTH_PT * REFERENCE_SIZE / widest_line
+        if widest_line
+        else MAX_FONT_SIZE_PT
+    )
+
+    # the line spacing grows with the font size, keeping the ratio of the style
+    line_height_ratio = (
+        slides_config.text_font_line_spacing_PT * 2 / slides_config.text_font_size_PT
+    )
+
+    free_height = (
+        TEXTBOX_HEIGHT_PT
+        - EMPTY_PARAGRAPH_HEIGHT_PT
+        - slides_config.text_font_space_before_PT
+        - slides_config.text_font_space_after_PT
+    )
+
+    height_limit = free_height / (len(lines) * line_height_ratio)
+
+    size = int(min(width_limit, height_limit) * FIT_MARGIN)
+
+    return max(MIN_FONT_SIZE_PT, min(MAX_FONT_SIZE_PT, size))
+
+
+def fit_font_sizes(strophes: List[str], slides_config: "SlidesConfig") -> List[int]:
+    """
+    Returns the font size of each strophe and saves the new widths measured.
+
+    :param strophes (List[str]): the strophes.
+    :param slides_config (SlidesConfig): the configuration of the slides.
+
+    :return (List[int]): the font size of each strophe in points.
+    """
+    sizes = [fit_font_size(strophe, slides_config) for strophe in strophes]
+
+    glyph_widths.save()
+
+    return sizes
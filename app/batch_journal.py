@@ -0,0 +1,364 @@
+"""
+This module contains the journal of the page many batches.
+
+The journal is an append-only JSONL file in the settings folder, with one line each time
+a song of the batch changes state (queued -> searched -> rendered or failed).
+If the application crashes or is closed in the middle of a batch, the journal is still
+there on the next launch and the batch can be resumed: the rendered songs are skipped
+and the searched ones use the lyrics saved in the journal instead of searching again.
+A setlist (a single presentation with all the songs) is only saved at the end, so all its
+songs are created again, but none of them is searched again.
+
+A line is only trusted when it's complete, so a line cut by a crash is ignored.
+
+The destination folder, the slides style and the background image (saved next to the
+journal, with the transparency applied) of the batch are kept too: a resumed batch uses
+them, not the ones selected on the app when it's resumed.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal
+
+JOURNAL_FILE_NAME = "batch_journal.jsonl"
+
+JobState = Literal["queued", "searched", "rendered", "failed"]
+
+# when the journal is synced to the disk (os.fsync):
+#   "always": after every line, nothing is lost, but it's slower on slow disks.
+#   "final": only after the lines of the final states (rendered, failed) and the
+#            queued songs, a crash can lose only the "searched" lines (the song is
+#            searched again).
+#   "never": the operating system decides, a power loss can lose any line.
+FsyncPolicy = Literal["always", "final", "never"]
+
+DEFAULT_FSYNC_POLICY: FsyncPolicy = "final"
+
+FINAL_STATES = ("rendered", "failed")
+
+
+def default_journal_path() -> str:
+    """
+    Returns the path of the journal in the settings folder.
+
+    :return (str): the path of the journal.
+    """
+    return os.path.join(os.getcwd(), "settings", JOURNAL_FILE_NAME)
+
+
+@dataclass
+class BatchJob:
+    """
+    This class represents a song of a batch.
+
+    :param index: The position of the song in the batch.
+
+    :param music: The music name typed by the user.
+
+    :param singer: The singer name typed by the user.
+
+    :param state: The last state of the song.
+
+    :param search_result: The result of the search (music, singer, lyrics, image link),
+        saved when the song is searched.
+    """
+
+    index: int
+    music: str
+    singer: str
+    state: JobState = "queued"
+    search_result: List | None = None
+
+
+@dataclass
+class BatchJournal:
+    """
+    This class represents the journal of a batch.
+
+    :param path: The path of the journal file.
+
+    :param jobs: The songs of the batch.
+
+    :param folder: The destination folder of the batch.
+
+    :param style: The slides style of the batch.
+
+    :param created: When the batch was started (unix time).
+
+    :param fsync_policy: When the journal is synced to the disk.
+
+    :param setlist: If the songs are added to a single presentation (see app.setlist).
+
+    :param sections: If each song of the setlist is in its own section.
+
+    :param background: The background image of the slides, None if there is none.
+
+    :param background_lost: If the batch had a background image but its file
+        (next to the journal) couldn't be read, the batch can't be resumed as it was.
+    """
+
+    path: str
+    jobs: List[BatchJob] = field(default_factory=list)
+    folder: str = ""
+    style: str = ""
+    created: float = 0.0
+    fsync_policy: FsyncPolicy = DEFAULT_FSYNC_POLICY
+    setlist: bool = False
+    sections: bool = False
+    background: bytes | None = field(default=None, repr=False)
+    background_lost: bool = False
+    _write_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def create(
+        cls,
+        musics: List[str],
+        singers: List[str],
+        folder: str = "",
+        style: str = "",
+        path: str | None = None,
+        fsync_policy: FsyncPolicy = DEFAULT_FSYNC_POLICY,
+        setlist: bool = False,
+        sections: bool = False,
+        background: bytes | None = None,
+    ) -> "BatchJournal":
+        """
+        Creates the journal of a new batch (it replaces the journal of the last batch).
+
+        :param musics (List[str]): The list of music names.
+        :param singers (List[str]): The list of singer names.
+        :param folder (str): The destination folder.
+        :param style (str): The slides style.
+        :param path (str | None): The path of the journal, the settings folder by default.
+        :param fsync_policy (FsyncPolicy): When the journal is synced to the disk.
+        :param setlist (bool): If the songs are added to a single presentation.
+        :param sections (bool): If each song of the setlist is in its own section.
+        :param background (bytes | None): The background image of the slides.
+
+        :return (BatchJournal): the journal, with every song queued.
+        """
+        journal = cls(
+            path or default_journal_path(),
+            [
+                BatchJob(index, music, singers[index])
+                for index, music in enumerate(musics)
+            ],
+            folder,
+            style,
+            time.time(),
+            fsync_policy,
+            setlist,
+            sections,
+            background,
+        )
+
+        os.makedirs(os.path.dirname(journal.path), exist_ok=True)
+
+        # the image is written before the journal, a journal always has its image
+        if background is not None:
+            with open(journal.background_path, "wb") as background_file:
+                background_file.write(background)
+                journal._sync(background_file, "queued")
+
+        lines = [
+            {
+                "event": "batch",
+                "folder": folder,
+                "style": style,
+                "created": journal.created,
+                "size": len(journal.jobs),
+                "setlist": setlist,
+                "sections": sections,
+                "background": background is not None,
+            }
+        ] + [
+            {
+                "event": "job",
+                "job": job.index,
+                "state": "queued",
+                "music": job.music,
+                "singer": job.singer,
+            }
+            for job in journal.jobs
+        ]
+
+        with open(journal.path, "w", encoding="utf-8") as journal_file:
+            journal_file.writelines(
+                json.dumps(line, ensure_ascii=False) + "\n" for line in lines
+            )
+            journal._sync(journal_file, "queued")
+
+        return journal
+
+    @classmethod
+    def load_unfinished(cls, path: str | None = None) -> "BatchJournal | None":
+        """
+        Loads the journal of a batch that didn't finish.
+
+        :param path (str | None): The path of the journal, the settings folder by default.
+
+        :return (BatchJournal | None): the journal, None if there is no unfinished batch.
+        """
+        journal = cls(path or default_journal_path())
+
+        try:
+            with open(journal.path, "r", encoding="utf-8") as journal_file:
+                lines = journal_file.readlines()
+
+        except OSError:
+            return None
+
+        jobs: Dict[int, BatchJob] = {}
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+                event = record["event"]
+
+                if event == "batch":
+                    journal.folder = record.get("folder", "")
+                    journal.style = record.get("style", "")
+                    journal.created = record.get("created", 0.0)
+                    journal.setlist = record.get("setlist", False)
+                    journal.sections = record.get("sections", False)
+
+                    if record.get("background", False):
+                        journal._read_background()
+
+                elif event == "finished":
+                    return None
+
+                elif event == "job" and record["state"] == "queued":
+                    jobs[record["job"]] = BatchJob(
+                        record["job"], record["music"], record["singer"]
+                    )
+
+                elif event == "job" and record["job"] in jobs:
+                    jobs[record["job"]].state = record["state"]
+
+                    if "search_result" in record:
+                        jobs[record["job"]].search_result = record["search_result"]
+
+            # a line cut by a crash (or edited by hand) is ignored
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        journal.jobs = [jobs[index] for index in sorted(jobs)]
+
+        if not journal.pending_jobs():
+            return None
+
+        return journal
+
+    @property
+    def background_path(self) -> str:
+        """
+        Returns the path of the background image of the batch (next to the journal).
+
+        :return (str): the path of the image.
+        """
+        return self.path + ".background"
+
+    def _read_background(self) -> None:
+        """
+        Reads the background image of the batch, background_lost is set if it can't.
+        """
+        try:
+            with open(self.background_path, "rb") as background_file:
+                self.background = background_file.read()
+
+        except OSError:
+            self.background_lost = True
+
+    def pending_jobs(self) -> List[BatchJob]:
+        """
+        Returns the songs that still have to be rendered (the failed ones are tried again).
+        All the songs of a setlist are rendered again, it's only saved at the end.
+
+        :return (List[BatchJob]): the songs not rendered.
+        """
+        if self.setlist:
+            return list(self.jobs)
+
+        return [job for job in self.jobs if job.state != "rendered"]
+
+    def done_count(self) -> int:
+        """
+        Returns the number of songs already rendered.
+
+        :return (int): the number of songs rendered.
+        """
+        return sum(job.state == "rendered" for job in self.jobs)
+
+    def mark(
+        self, job: BatchJob, state: JobState, search_result: List | None = None
+    ) -> None:
+        """
+        Appends the new state of a song to the journal.
+
+        :param job (BatchJob): the song.
+        :param state (JobState): the new state.
+        :param search_result (List | None): the result of the search ("searched" state).
+        """
+        job.state = state
+
+        record = {"event": "job", "job": job.index, "state": state}
+
+        if search_result is not None:
+            job.search_result = list(search_result)
+            record["search_result"] = job.search_result
+
+        self._append(record, state)
+
+    def finish(self) -> None:
+        """
+        Marks the batch as finished and removes the journal, there is nothing to resume.
+        """
+        try:
+            os.remove(self.background_path)
+
+        except OSError:
+            pass
+
+        try:
+            os.remove(self.path)
+
+        except OSError:
+            # if it can't be removed, the finished line avoids resuming it
+            self._append({"event": "finished"}, "rendered")
+
+    def _append(self, record: Dict, state: JobState) -> None:
+        """
+        Appends a line to the journal.
+
+        :param record (Dict): the line.
+        :param state (JobState): the state of the line, used by the fsync policy.
+        """
+        try:
+            # the final states can be written by the thread that copies the presentations
+            with self._write_lock, open(self.path, "a", encoding="utf-8") as journal_file:
+                journal_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._sync(journal_file, state)
+
+        # the batch doesn't stop because the journal couldn't be written
+        except OSError:
+            pass
+
+    def _sync(self, journal_file, state: JobState) -> None:
+        """
+        Syncs the journal to the disk, according to the fsync policy.
+
+        :param journal_file: the open journal file.
+        :param state (JobState): the state of the last line written.
+        """
+        journal_file.flush()
+
+        if self.fsync_policy == "always" or (
+            self.fsync_policy == "final" and state in FINAL_STATES + ("queued",)
+        ):
+            os.fsync(journal_file.fileno())
@@ -6,22 +6,45 @@ Data: setembro 2023 ~ dezembro 2023
 
 import os
 import re
+import shutil
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Literal, Tuple, Union
+from typing import Callable, Dict, List, Literal, Tuple, Union
 from io import BytesIO
 
 import requests
 
 from pptx import Presentation
+from pptx.presentation import Presentation as PresentationType
+from pptx.slide import Slide
 from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_PARAGRAPH_ALIGNMENT
-from PIL import Image
 
 from PySide6.QtWidgets import QWidget
 
+from app.autofit import fit_font_sizes
+from app.lookup import SingleFlight
+from app.ooxml_writer import render_song
+from app.output_writer import OutputWriter, save_atomically
+from app.pagination import paginate_lyric
+from app.render_manifest import RenderManifest, deck_fingerprint
+from app.template_pool import song_layouts, template_pool
+from app.tracing import tracer
+
 # pylint: disable=E0401,E1101, C0301, C0103, E1136, W0212
 
+# the downloads of the song images running
+_image_downloads = SingleFlight()
+
+# the number of song images downloaded kept to be used again
+MAX_DOWNLOADED_IMAGES = 64
+
+# the song images already downloaded (url -> path), a batch can repeat the same song
+_downloaded_images: "OrderedDict[str, str]" = OrderedDict()
+_downloaded_images_lock = threading.Lock()
+
 
 def _format_filename(name: str) -> str:
     """
@@ -73,6 +96,12 @@ class SlidesConfig:
     :param text_font_space_after_PT: The space after the text font. In points (its an integer).
 
     :param text_font_name: The name of the text font.
+
+    :param text_font_autofit: If the size of the text font of each slide is the largest one
+        that fits in the slide (its a boolean), the line spacing keeps its proportion.
+
+    :param template_name: The name of a .pptx in "app/slides styles" whose master (layouts,
+        theme) is used by the slides. Empty to use the default template.
     """
 
     background_color_RGB: Tuple = (255, 255, 255)
@@ -92,10 +121,12 @@ class SlidesConfig:
     text_font_space_before_PT: int = 0
     text_font_space_after_PT: int = 0
     text_font_name: str = "Arial"
+    text_font_autofit: bool = False
+    template_name: str = ""
 
 
 def create_slides(
-    widget: QWidget,
+    widget: QWidget | None,
     music_title: str,
     music_singer: str,
     music_lyric: List[str],
@@ -103,12 +134,19 @@ def create_slides(
     FILES_FOLDER: str = "./files",
     method: str = "page_one",
     genius_image_link: str = "",
-    image: bytes | None = None,
+    image: bytes | BytesIO | None = None,
     background_image: bytes | BytesIO | None = None,
     language: Literal["pt", "en"] = "pt",
+    manifest: RenderManifest | None = None,
+    output_writer: OutputWriter | None = None,
+    backend: Literal["python-pptx", "ooxml"] = "python-pptx",
+    on_saved: Callable[[], None] | None = None,
+    on_failed: Callable[[], None] | None = None,
 ) -> Tuple[str, str, str]:
     """
     Function that creates presentation slides based on a song lyric.
+    :param widget (QWidget | None): The label that shows the status, None if there is
+        no window (e.g. on the render daemon).
     :param music_title (str): The title of the song.
     :param music_singer (str): The singer of the song.
     :param music_lyric (list[str]): The lyric of the song, formatted as a list of strings. Each item in the list must be a strophe.
@@ -118,21 +156,305 @@ def create_slides(
     :param genius_image (str, optional): The api genius music image link. Defaults to ""
     :param image (bytes, optional): The image in bytes format. Defaults to None.
     :param background_image (bytes, optional): The background image in bytes format. Defaults to None.
+    :param manifest (RenderManifest, optional): The manifest of the folder, if given the
+        presentation is only created if its inputs changed since it was last created.
+    :param output_writer (OutputWriter, optional): If given, the presentation is copied to
+        the folder by its I/O thread and this function doesn't wait for the copy.
+    :param backend (Literal["python-pptx", "ooxml"], optional): how the slides are built,
+        with the python-pptx objects or with the XML written directly (app.ooxml_writer,
+        much faster on big decks). Both give the same slides. Defaults to "python-pptx".
+    :param on_saved (Callable, optional): called when the presentation is in the folder
+        (right away if it was kept or saved here, on the I/O thread of the output_writer
+        after its copy).
+    :param on_failed (Callable, optional): called if the output_writer couldn't copy
+        the presentation (the other errors are raised).
 
     :return music (str): Music name, singer and the lyrics.
     :return file_name (str): The name of the file to be created.
     :return path (str): The path of the file to be created.
     """
+    file_name = _format_filename(
+        music_title + " (" + music_singer.lower().strip() + ").pptx"
+    )
+
+    result = (
+        "{0} {1}\n{2}".format(music_title, music_singer, "\n\n".join(music_lyric)),
+        file_name,
+        str(os.path.join(FILES_FOLDER)),
+    )
+
+    fingerprint = ""
+
+    if manifest is not None:
+        fingerprint = deck_fingerprint(
+            music_title,
+            music_singer,
+            music_lyric,
+            slides_config,
+            method,
+            genius_image_link,
+            image,
+            background_image,
+        )
+
+        if manifest.is_current(file_name, fingerprint):
+            manifest.reused += 1
+            tracer.annotate(reused=True)
+
+            if widget is None:
+                pass
+            elif language == "pt":
+                widget.setText(f'Arquivo: "{file_name}" sem mudanças, mantido.')  # type: ignore
+            else:
+                widget.setText(f'File: "{file_name}" unchanged, kept.')  # type: ignore
+
+            if on_saved:
+                on_saved()
+
+            return result
+
+    with tracer.span("build_slides"):
+        new_presentation = _build_presentation(
+            music_title,
+            music_singer,
+            music_lyric,
+            slides_config,
+            method,
+            genius_image_link,
+            image,
+            background_image,
+            backend,
+        )
+
+    # saving the presentation, the old file is only replaced when the new one is complete
+    with tracer.span("save"):
+        if output_writer is not None:
+            def saved() -> None:
+                if manifest is not None:
+                    manifest.record(file_name, fingerprint)
+
+                if on_saved:
+                    on_saved()
+
+            output_writer.submit(
+                new_presentation, FILES_FOLDER, file_name, saved, on_failed
+            )
+
+        else:
+            save_atomically(new_presentation, FILES_FOLDER, file_name)
+
+            if manifest is not None:
+                manifest.record(file_name, fingerprint)
+
+            if on_saved:
+                on_saved()
+
+    if widget is None:
+        pass
+    elif language == "pt":
+        widget.setText(f'Arquivo: "{file_name}" concluído com sucesso!')  # type: ignore
+    else:
+        widget.setText(f'File: "{file_name}" completed!')  # type: ignore
+
+    return result
+
+
+def _build_presentation(
+    music_title: str,
+    music_singer: str,
+    music_lyric: List[str],
+    slides_config: SlidesConfig,
+    method: str,
+    genius_image_link: str,
+    image: bytes | BytesIO | None,
+    background_image: bytes | BytesIO | None,
+    backend: str = "python-pptx",
+) -> PresentationType | Dict[str, bytes]:
+    """
+    Builds the presentation in memory, the params are the same as create_slides.
+
+    :return: the built presentation, or its parts with the "ooxml" backend.
+    """
+    if backend == "ooxml":
+        pages, text_font_sizes = _paginate(music_lyric, slides_config)
+
+        return render_song(
+            music_title,
+            music_singer,
+            pages,
+            text_font_sizes,
+            slides_config,
+            method,
+            (
+                _download_song_image(music_title, genius_image_link)
+                if method in ("page_one", "page_many")
+                else ""
+            ),
+            image,
+            background_image,
+        )
+
+    if backend != "python-pptx":
+        raise ValueError(f"unknown backend: {backend}")
+
+    new_presentation = template_pool.new_presentation(slides_config.template_name)
+
+    add_song_slides(
+        new_presentation,
+        music_title,
+        music_singer,
+        music_lyric,
+        slides_config,
+        method,
+        genius_image_link,
+        image,
+        background_image,
+    )
+
+    return new_presentation
+
+
+def _paginate(
+    music_lyric: List[str], slides_config: SlidesConfig
+) -> Tuple[List[str], List[float]]:
+    """
+    Splits the lyric into slides and gets the size of the text of each slide.
+
+    :param music_lyric (List[str]): the lyric, the first item is the title slide.
+    :param slides_config (SlidesConfig): the configuration for the slides.
+
+    :return: the text of each slide and its font size.
+    """
+    # the strophes that overflow the slide are split into continuation slides
+    music_lyric = paginate_lyric(music_lyric, slides_config)
+
+    # the first item of the lyric is the title slide
+    text_font_sizes = (
+        [0] + fit_font_sizes(music_lyric[1:], slides_config)
+        if slides_config.text_font_autofit
+        else [slides_config.text_font_size_PT] * len(music_lyric)
+    )
+
+    return music_lyric, text_font_sizes
+
+
+def _downloaded_image(genius_image_link: str) -> str:
+    """
+    Returns the path of an image already downloaded, if its file is still there.
+
+    :param genius_image_link (str): the link of the image.
+
+    :return (str): the path of the image, "" if it wasn't downloaded.
+    """
+    with _downloaded_images_lock:
+        img_path = _downloaded_images.get(genius_image_link, "")
+
+        if img_path and os.path.isfile(img_path):
+            _downloaded_images.move_to_end(genius_image_link)
+            return img_path
+
+        _downloaded_images.pop(genius_image_link, None)
+
+        return ""
+
+
+def _remember_image(genius_image_link: str, img_path: str) -> None:
+    """
+    Keeps the path of an image downloaded, the least used ones over
+    MAX_DOWNLOADED_IMAGES are forgotten.
+
+    :param genius_image_link (str): the link of the image.
+    :param img_path (str): the path of the image.
+    """
+    with _downloaded_images_lock:
+        # the file was written again, it's no longer the image of another link
+        for link, path in list(_downloaded_images.items()):
+            if path == img_path and link != genius_image_link:
+                del _downloaded_images[link]
+
+        _downloaded_images[genius_image_link] = img_path
+        _downloaded_images.move_to_end(genius_image_link)
+
+        while len(_downloaded_images) > MAX_DOWNLOADED_IMAGES:
+            _downloaded_images.popitem(last=False)
+
+
+def _download_song_image(music_title: str, genius_image_link: str) -> str:
+    """
+    Downloads the image of the song from genius to "app/images".
+    The downloads of the same image at the same time (e.g. a song repeated in a batch)
+    share a single download, and the last images downloaded aren't downloaded again.
+
+    :param music_title (str): the title of the song (the name of the image).
+    :param genius_image_link (str): the link of the image.
+
+    :return (str): the path of the image, "" if the link isn't an url.
+    """
+    img_path = os.path.abspath(f"app/images/{music_title}.png")
+
+    os.makedirs(os.path.abspath("app/images"), exist_ok=True)
+
+    # verify if its an url
+    if not (
+        isinstance(genius_image_link, str) and genius_image_link.startswith("http")
+    ):
+        return ""
+
+    def download() -> str:
+        downloaded_path = _downloaded_image(genius_image_link)
+
+        if downloaded_path == img_path:
+            return img_path
+
+        if downloaded_path:
+            # the same image saved with the name of another song
+            shutil.copyfile(downloaded_path, img_path)
+
+        else:
+            with tracer.span("thumbnail_download"):
+                response = requests.get(genius_image_link, timeout=5)
+                response.raise_for_status()
+                with open(img_path, "wb") as f:
+                    f.write(response.content)
+
+        _remember_image(genius_image_link, img_path)
+
+        return img_path
+
+    return _image_downloads.run((img_path, genius_image_link), download)
+
+
+def add_song_slides(
+    new_presentation: PresentationType,
+    music_title: str,
+    music_singer: str,
+    music_lyric: List[str],
+    slides_config: SlidesConfig,
+    method: str,
+    genius_image_link: str = "",
+    image: bytes | BytesIO | None = None,
+    background_image: bytes | BytesIO | None = None,
+) -> List[Slide]:
+    """
+    Appends the title slide and the lyric slides of a song to a presentation,
+    the other params are the same as create_slides.
 
-    new_presentation = Presentation()
+    :param new_presentation (PresentationType): the presentation.
+
+    :return: the slides added.
+    """
+    new_slides = []
+
+    music_lyric, text_font_sizes = _paginate(music_lyric, slides_config)
+
+    title_layout, lyric_layout = song_layouts(new_presentation)
 
     # loop through each line (which is a strophe) in the lyric, creating a slide for each
     for i, paragraph_text in enumerate(music_lyric):
         new_slide = new_presentation.slides.add_slide(
-            new_presentation.slide_layouts[0]
-            if i == 0
-            else new_presentation.slide_layouts[6]
+            title_layout if i == 0 else lyric_layout
         )
+        new_slides.append(new_slide)
 
         # set the slide width and height to 16:9
         new_presentation.slide_width = Inches(16)
@@ -216,26 +538,21 @@ def create_slides(
             )
 
             if method in ("page_one", "page_many"):
-                img_path = os.path.abspath(f"app/images/{music_title}.png")
-
-                os.makedirs(os.path.abspath("app/images"), exist_ok=True)
-
-                # verify if its an url
-                if isinstance(genius_image_link, str) and genius_image_link.startswith(
-                    "http"
-                ):
-                    response = requests.get(genius_image_link, timeout=5)
-                    response.raise_for_status()
-                    with open(img_path, "wb") as f:
-                        f.write(response.content)
+                img_path = _download_song_image(music_title, genius_image_link)
 
+                if img_path:
                     new_slide.shapes.add_picture(
                         img_path, Inches(9), Inches(2), Inches(6), Inches(4)
                     )
 
             if image:
+                # python-pptx reads the image from a file, not from a PIL image
                 new_slide.shapes.add_picture(
-                    Image.open(image), Inches(9), Inches(2), Inches(6), Inches(4)
+                    BytesIO(image) if isinstance(image, bytes) else image,
+                    Inches(9),
+                    Inches(2),
+                    Inches(6),
+                    Inches(4),
                 )
 
         # if it's not the first slide
@@ -258,37 +575,19 @@ def create_slides(
             new_paragraph.alignment = slides_config.text_font_alignment
             new_paragraph.font.bold = slides_config.text_font_isbold
             new_paragraph.font.color.rgb = RGBColor(*slides_config.text_font_color_RGB)
-            new_paragraph.font.size = Pt(slides_config.text_font_size_PT)
+            new_paragraph.font.size = Pt(text_font_sizes[i])
             new_paragraph.line_spacing = Pt(
-                slides_config.text_font_line_spacing_PT * 2
+                slides_config.text_font_line_spacing_PT
+                * 2
+                * text_font_sizes[i]
+                / slides_config.text_font_size_PT
             )  # default = 1.2
             new_paragraph.space_before = Pt(slides_config.text_font_space_before_PT)
             new_paragraph.space_after = Pt(slides_config.text_font_space_after_PT)
 
             new_paragraph.text = paragraph_text.upper()
 
-    file_name = _format_filename(
-        music_title + " (" + music_singer.lower().strip() + ").pptx"
-    )
-
-    # saving the presentation
-    new_presentation_path = os.path.join(FILES_FOLDER, file_name)
-
-    if os.path.exists(new_presentation_path):
-        os.remove(new_presentation_path)
-
-    new_presentation.save(new_presentation_path)
-
-    if language == "pt":
-        widget.setText(f'Arquivo: "{file_name}" concluído com sucesso!')  # type: ignore
-    else:
-        widget.setText(f'File: "{file_name}" completed!')  # type: ignore
-
-    return (
-        "{0} {1}\n{2}".format(music_title, music_singer, "\n\n".join(music_lyric)),
-        file_name,
-        str(os.path.join(FILES_FOLDER)),
-    )
+    return new_slides
 
 
 def extract_presentation_infos(
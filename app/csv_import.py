@@ -0,0 +1,207 @@
+"""
+This module contains the streaming CSV import used by page many.
+
+The CSV is read row by row (never entirely in memory), its encoding and delimiter are
+detected from the first bytes, the (music, singer) pairs are normalized and deduplicated
+and the invalid rows are reported instead of being shown.
+"""
+
+import codecs
+import csv
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+# the number of bytes read to detect the encoding and the delimiter
+SAMPLE_SIZE = 64 * 1024
+
+DELIMITERS = ",;\t|"
+
+# first rows that are headers and not songs
+HEADER_NAMES = {
+    ("música", "cantor"),
+    ("música", "cantor(a)"),
+    ("musica", "cantor"),
+    ("nome", "cantor"),
+    ("music", "singer"),
+    ("title", "artist"),
+    ("song", "artist"),
+}
+
+
+@dataclass
+class CsvImportReport:
+    """
+    This class represents the result of a CSV import.
+
+    :param encoding: The encoding detected.
+
+    :param delimiter: The delimiter detected.
+
+    :param imported: The number of songs imported.
+
+    :param duplicates: The number of repeated songs ignored.
+
+    :param bad_rows: The invalid rows, as (line number, reason) tuples.
+
+    :param extra_columns: The number of rows with more than two columns (the extra
+        columns are ignored).
+    """
+
+    encoding: str = "utf-8"
+    delimiter: str = ","
+    imported: int = 0
+    duplicates: int = 0
+    bad_rows: List[Tuple[int, str]] = field(default_factory=list)
+    extra_columns: int = 0
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes a music or singer name: unicode NFC, no extra spaces.
+
+    :param text (str): the text.
+
+    :return: the normalized text.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def song_key(music: str, singer: str) -> Tuple[str, str]:
+    """
+    Returns the key that identifies a song, two songs with the same key are the same song
+    (the comparison ignores the case and the extra spaces).
+
+    :param music (str): the name of the music.
+    :param singer (str): the name of the singer.
+
+    :return: the key of the song.
+    """
+    return normalize_text(music).casefold(), normalize_text(singer).casefold()
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """
+    Detects the encoding of the file using its first bytes.
+
+    :param sample (bytes): the first bytes of the file.
+
+    :return: the name of the encoding.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+
+    try:
+        # the sample can end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        # charset_normalizer is installed with requests
+        from charset_normalizer import (  # pylint: disable=import-outside-toplevel
+            from_bytes,
+        )
+
+        best_guess = from_bytes(sample).best()
+        if best_guess is not None:
+            return best_guess.encoding
+
+    except ImportError:
+        pass
+
+    # excel saves the CSV files as cp1252 on windows
+    return "cp1252"
+
+
+def sniff_delimiter(sample: str) -> str:
+    """
+    Detects the delimiter of the CSV using its first lines.
+
+    :param sample (str): the first lines of the file.
+
+    :return: the delimiter, "," if it can't be detected.
+    """
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+
+    except csv.Error:
+        return ","
+
+
+def iter_csv_songs(
+    csv_path: str, report: CsvImportReport, chunk_size: int = 200
+) -> Iterator[List[List[str]]]:
+    """
+    Reads the songs of a CSV file structured as: music, singer.
+    The songs are yielded in chunks as soon as they are read and the report is updated.
+
+    :param csv_path (str): the path of the CSV file.
+    :param report (CsvImportReport): the report updated while reading.
+    :param chunk_size (int): the number of songs in each chunk.
+
+    :return: chunks of [music, singer] lists.
+    """
+    with open(csv_path, "rb") as binary_file:
+        sample = binary_file.read(SAMPLE_SIZE)
+
+    report.encoding = sniff_encoding(sample)
+    report.delimiter = sniff_delimiter(
+        sample.decode(report.encoding, errors="ignore")
+    )
+
+    seen_songs = set()
+    chunk: List[List[str]] = []
+
+    with open(csv_path, "r", encoding=report.encoding, errors="replace", newline="") as file:
+        csv_reader = csv.reader(file, delimiter=report.delimiter)
+
+        for row in csv_reader:
+            line_number = csv_reader.line_num
+
+            values = [normalize_text(value) for value in row]
+
+            # removes the empty columns at the end (e.g. "music,singer,,")
+            while values and not values[-1]:
+                values.pop()
+
+            # blank lines are ignored
+            if not values:
+                continue
+
+            # the columns after the singer are ignored (e.g. a column of notes)
+            if len(values) > 2:
+                report.extra_columns += 1
+
+            music = values[0]
+            singer = values[1] if len(values) > 1 else ""
+
+            if not music:
+                report.bad_rows.append((line_number, "music"))
+                continue
+
+            key = song_key(music, singer)
+
+            if line_number == 1 and key in HEADER_NAMES:
+                continue
+
+            if key in seen_songs:
+                report.duplicates += 1
+                continue
+
+            seen_songs.add(key)
+
+            chunk.append([music, singer])
+            report.imported += 1
+
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    if chunk:
+        yield chunk
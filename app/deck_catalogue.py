@@ -0,0 +1,420 @@
+"""
+This module contains the DeckCatalogue class.
+
+The catalogue is an SQLite database (settings/deck_catalogue.sqlite3) with the content of
+the presentations found in the output folders: title, singer, strophes, number of slides
+and the hash of the background image. The texts are in an FTS5 table, so finding the
+presentation that has a verse takes a few milliseconds even with thousands of them.
+
+The folders are indexed incrementally: a presentation is only read again when its
+modification time or size changed, and the presentations that were deleted are removed.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import sqlite3
+import threading
+import zipfile
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from lxml import etree
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.text.text import _Paragraph
+
+CATALOGUE_FILE_NAME = "deck_catalogue.sqlite3"
+
+# the number of presentations indexed between two commits
+COMMIT_EVERY = 200
+
+SLIDE_PART_NAME = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    singer TEXT NOT NULL,
+    slide_count INTEGER NOT NULL,
+    background_hash TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS deck_text USING fts5(
+    title, singer, lyric, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+@dataclass
+class DeckInfos:
+    """
+    The content of a presentation saved in the catalogue.
+    """
+
+    title: str = ""
+    singer: str = ""
+    strophes: Tuple[str, ...] = ()
+    slide_count: int = 0
+    background_hash: str = ""
+
+
+@dataclass
+class CatalogueEntry:
+    """
+    A presentation found by a search.
+    """
+
+    path: str
+    title: str
+    singer: str
+    slide_count: int
+    # the part of the text that matched the search, the matched words are in [ ]
+    snippet: str
+
+
+def _shape_text(shape: etree._Element) -> str:
+    """
+    Returns the text of a shape, its lines are separated by "\\n".
+
+    :param shape (_Element): the p:sp element.
+
+    :return (str): the text.
+    """
+    if shape.txBody is None:
+        return ""
+
+    return "\n".join(
+        _Paragraph(paragraph, None).text.replace("\x0b", "\n")
+        for paragraph in shape.txBody.p_lst
+        if paragraph.r_lst
+    )
+
+
+def _background_hash(
+    package: zipfile.ZipFile, slide_name: str, slide: etree._Element
+) -> str:
+    """
+    Returns the hash of the background image of a slide (the picture at the top left
+    corner that covers the whole slide).
+
+    :param package (ZipFile): the presentation.
+    :param slide_name (str): the name of the slide part.
+    :param slide (_Element): the p:sld element.
+
+    :return (str): the sha1 of the image, "" if the slide has no background image.
+    """
+    presentation = etree.fromstring(package.read("ppt/presentation.xml"))
+    slide_size = presentation.find(qn("p:sldSz"))
+
+    if slide_size is None:
+        return ""
+
+    for picture in slide.xpath("./p:cSld/p:spTree/p:pic"):
+        offset = picture.find(".//" + qn("a:off"))
+        extent = picture.find(".//" + qn("a:ext"))
+
+        if (
+            offset is None
+            or extent is None
+            or (offset.get("x"), offset.get("y")) != ("0", "0")
+            or (extent.get("cx"), extent.get("cy"))
+            != (slide_size.get("cx"), slide_size.get("cy"))
+        ):
+            continue
+
+        relationship_id = picture.blipFill.blip.rEmbed
+
+        folder, file_name = posixpath.split(slide_name)
+        relationships = etree.fromstring(
+            package.read(posixpath.join(folder, "_rels", file_name + ".rels"))
+        )
+
+        for relationship in relationships:
+            if relationship.get("Id") == relationship_id:
+                image_name = posixpath.normpath(
+                    posixpath.join(folder, relationship.get("Target"))
+                )
+
+                return hashlib.sha1(package.read(image_name)).hexdigest()
+
+    return ""
+
+
+def read_deck_infos(path: str) -> DeckInfos:
+    """
+    Reads the content of a presentation created by the app, directly from its slides XML.
+
+    :param path (str): the path of the presentation.
+
+    :return (DeckInfos): the content, empty if the file isn't a valid presentation.
+    """
+    try:
+        with zipfile.ZipFile(path) as package:
+            slide_names = sorted(
+                (
+                    name
+                    for name in package.namelist()
+                    if SLIDE_PART_NAME.match(name)
+                ),
+                key=lambda name: int(SLIDE_PART_NAME.match(name).group(1)),  # type: ignore
+            )
+
+            infos = DeckInfos(slide_count=len(slide_names))
+            strophes = []
+
+            for slide_name in slide_names:
+                slide = parse_xml(package.read(slide_name))
+
+                for shape in slide.xpath("./p:cSld/p:spTree/p:sp"):
+                    if shape.has_ph_elm:
+                        if (
+                            shape.ph_type
+                            in (PP_PLACEHOLDER.CENTER_TITLE, PP_PLACEHOLDER.TITLE)
+                            and not infos.title
+                        ):
+                            infos.title = _shape_text(shape)
+
+                        elif (
+                            shape.ph_type == PP_PLACEHOLDER.SUBTITLE
+                            and not infos.singer
+                        ):
+                            infos.singer = _shape_text(shape)
+
+                    elif shape.is_textbox:
+                        text = _shape_text(shape)
+
+                        if text:
+                            strophes.append(text)
+
+                # all the slides have the same background
+                if slide_name == slide_names[0]:
+                    infos.background_hash = _background_hash(
+                        package, slide_name, slide
+                    )
+
+            infos.strophes = tuple(strophes)
+
+            return infos
+
+    except (OSError, zipfile.BadZipFile, KeyError, ValueError, etree.XMLSyntaxError):
+        return DeckInfos()
+
+
+def _scan_presentations(root: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Walks the folder and its subfolders looking for presentations.
+
+    :param root (str): the folder.
+
+    :return: the path, modification time and size of each presentation.
+    """
+    folders = [root]
+
+    while folders:
+        folder = folders.pop()
+
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+
+                        # the temporary files of the app and the lock files of PowerPoint
+                        elif entry.name.lower().endswith(
+                            ".pptx"
+                        ) and not entry.name.startswith((".", "~$")):
+                            entry_stat = entry.stat()
+                            yield entry.path, int(entry_stat.st_mtime), entry_stat.st_size
+
+                    except OSError:
+                        continue
+
+        except OSError:
+            continue
+
+
+def _fts_query(text: str) -> str:
+    """
+    Converts the text typed by the user to an FTS5 query: every word must be in the
+    presentation, the last letters of a word can be missing (it's a prefix).
+
+    :param text (str): the text.
+
+    :return (str): the query, "" if the text has no words.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+class DeckCatalogue:
+    """
+    This class represents the catalogue of the presentations.
+    Each thread uses its own connection to the database.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Creates the catalogue, the database is created on the first use.
+
+        :param path (str | None): the path of the database, the settings folder by default.
+        """
+        self.path = path or os.path.join(os.getcwd(), "settings", CATALOGUE_FILE_NAME)
+
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection of the current thread.
+
+        :return (Connection): the connection.
+        """
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+            connection = sqlite3.connect(self.path)
+
+            # the searches don't wait for the indexer
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(SCHEMA)
+
+            self._local.connection = connection
+
+        return connection
+
+    def index_folder(
+        self,
+        root: str,
+        progress: Callable[[int], None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> Tuple[int, int]:
+        """
+        Updates the catalogue with the presentations of the folder and its subfolders.
+
+        :param root (str): the folder.
+        :param progress (Callable, optional): called with the number of presentations read.
+        :param should_stop (Callable, optional): the indexing stops when it returns True
+            (the presentations already read are kept).
+
+        :return: the number of presentations read and removed.
+        """
+        root = os.path.abspath(root)
+        connection = self._connection()
+
+        # the presentations of the folder in the catalogue (the paths with the root prefix)
+        prefix = os.path.join(root, "")
+        indexed: Dict[str, Tuple[int, int, int]] = {
+            path: (deck_id, mtime, size)
+            for deck_id, path, mtime, size in connection.execute(
+                "SELECT id, path, mtime, size FROM decks WHERE path > ? AND path < ?",
+                (prefix, prefix + "\U0010ffff"),
+            )
+        }
+
+        read = 0
+
+        for path, mtime, size in _scan_presentations(root):
+            if should_stop and should_stop():
+                connection.commit()
+                return read, 0
+
+            deck = indexed.pop(path, None)
+
+            if deck and deck[1:] == (mtime, size):
+                continue
+
+            infos = read_deck_infos(path)
+
+            if deck:
+                connection.execute("DELETE FROM deck_text WHERE rowid = ?", (deck[0],))
+                connection.execute("DELETE FROM decks WHERE id = ?", (deck[0],))
+
+            deck_id = connection.execute(
+                "INSERT INTO decks (path, mtime, size, title, singer, slide_count, "
+                "background_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    mtime,
+                    size,
+                    infos.title,
+                    infos.singer,
+                    infos.slide_count,
+                    infos.background_hash,
+                ),
+            ).lastrowid
+
+            connection.execute(
+                "INSERT INTO deck_text (rowid, title, singer, lyric) VALUES (?, ?, ?, ?)",
+                (deck_id, infos.title, infos.singer, "\n\n".join(infos.strophes)),
+            )
+
+            read += 1
+
+            if read % COMMIT_EVERY == 0:
+                connection.commit()
+
+                if progress:
+                    progress(read)
+
+        # the presentations that weren't found anymore
+        for deck_id, _, _ in indexed.values():
+            connection.execute("DELETE FROM deck_text WHERE rowid = ?", (deck_id,))
+            connection.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+
+        connection.commit()
+
+        if progress:
+            progress(read)
+
+        return read, len(indexed)
+
+    def search(
+        self, text: str, folder: str | None = None, limit: int = 200
+    ) -> List[CatalogueEntry]:
+        """
+        Finds the presentations that have all the words of the text
+        (in the title, singer or lyric), the best matches first.
+
+        :param text (str): the text typed by the user.
+        :param folder (str | None): if given, only the presentations inside this folder.
+        :param limit (int): the maximum number of presentations returned.
+
+        :return (List[CatalogueEntry]): the presentations found.
+        """
+        query = _fts_query(text)
+
+        if not query:
+            return []
+
+        prefix = os.path.join(os.path.abspath(folder), "") if folder else ""
+
+        try:
+            rows = self._connection().execute(
+                "SELECT decks.path, decks.title, decks.singer, decks.slide_count, "
+                "snippet(deck_text, 2, '[', ']', '...', 8) "
+                "FROM deck_text JOIN decks ON decks.id = deck_text.rowid "
+                "WHERE deck_text MATCH ? AND decks.path > ? AND decks.path < ? "
+                # the title and the singer weigh more than the lyric
+                "ORDER BY bm25(deck_text, 10.0, 5.0, 1.0) LIMIT ?",
+                (query, prefix, prefix + "\U0010ffff", limit),
+            ).fetchall()
+
+        except sqlite3.OperationalError:
+            return []
+
+        return [CatalogueEntry(*row) for row in rows]
+
+    def count(self) -> int:
+        """
+        Returns the number of presentations in the catalogue.
+
+        :return (int): the number of presentations.
+        """
+        return self._connection().execute("SELECT COUNT(*) FROM decks").fetchone()[0]
@@ -0,0 +1,291 @@
+"""
+This module contains the LyricsLookup class, the cache of the song lookups on Genius.
+
+A lookup is the search of a song (find_song) and the download of its lyric
+(fetch_lyric). Their results are kept in memory, so a song searched again (e.g. the
+user confirms the same song twice) doesn't go to the network.
+
+On page_one the lookup of the typed song starts in the background as soon as the
+fields stop changing (prefetch), before the user confirms, so the confirm usually finds
+the song and its lyric in the cache. Only the last song typed is prefetched: the
+prefetches of the songs typed before it are cancelled (one that didn't start never
+runs, one that is searching doesn't download the lyric).
+
+The lookups of the same song at the same time (e.g. a song repeated in a batch, or the
+confirm of the song being prefetched) share a single search and download (SingleFlight):
+the first one goes to the network and the others wait for its result.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Tuple, TypeVar
+
+from app.csv_import import song_key
+
+# the songs (and lyrics) kept in the cache, the least used ones are removed first
+MAX_CACHED_SONGS = 256
+
+_executor = ThreadPoolExecutor(
+    max_workers=min(2, os.cpu_count() or 1), thread_name_prefix="LyricsLookup"
+)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    This class runs a call only once for all the threads that ask for the same key at
+    the same time, the others wait for it and get its result (or its error).
+    """
+
+    def __init__(self) -> None:
+        # the calls running and the future of their results
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: Hashable, call: Callable[[], T]) -> T:
+        """
+        Runs the call, or waits for the call of the same key that is running.
+
+        :param key (Hashable): the key of the call.
+        :param call (Callable): the call.
+
+        :raises: the error of the call.
+
+        :return: the result of the call.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            running = future is not None
+
+            if not running:
+                future = self._calls[key] = Future()
+
+        if running:
+            return future.result()  # type: ignore
+
+        try:
+            result = call()
+
+        except BaseException as exc:
+            future.set_exception(exc)  # type: ignore
+            raise
+
+        else:
+            future.set_result(result)  # type: ignore
+
+            return result
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class LyricsLookup:
+    """
+    This class keeps the results of the searches and lyric downloads and prefetches them.
+    """
+
+    def __init__(
+        self,
+        search: Callable[[str, str, str | None], Dict | None],
+        fetch: Callable[[int, str | None], List[str]],
+    ) -> None:
+        """
+        :param search (Callable): searches a song (music, singer, genius key), returns
+            the first result of the search or None (see search_music_lyric.find_song).
+        :param fetch (Callable): downloads the lyric of a song (song id, genius key),
+            see search_music_lyric.fetch_lyric.
+        """
+        self._search = search
+        self._fetch = fetch
+
+        # the search result of each song (None if nothing was found) and each lyric
+        self._songs: "OrderedDict[Tuple, Dict | None]" = OrderedDict()
+        self._lyrics: "OrderedDict[Tuple, List[str]]" = OrderedDict()
+
+        # the searches and downloads running
+        self._searches = SingleFlight()
+        self._downloads = SingleFlight()
+
+        # the prefetches that didn't finish and the event that cancels them
+        self._prefetches: Dict[Tuple, Tuple[Future, threading.Event]] = {}
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(music: str, singer: str, genius_key: str | None) -> Tuple:
+        """
+        :return: the key of a song in the cache (see csv_import.song_key).
+        """
+        return (*song_key(music, singer), genius_key)
+
+    def _store(self, cache: OrderedDict, key: Tuple, value) -> None:
+        """
+        Stores a value in a cache, removing the least used ones over MAX_CACHED_SONGS.
+
+        :param cache (OrderedDict): the cache.
+        :param key (Tuple): the key.
+        :param value: the value.
+        """
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+
+            while len(cache) > MAX_CACHED_SONGS:
+                cache.popitem(last=False)
+
+    def _cached(self, cache: OrderedDict, key: Tuple) -> Tuple[bool, object]:
+        """
+        :return: if the key is in the cache and its value.
+        """
+        with self._lock:
+            if key not in cache:
+                return False, None
+
+            cache.move_to_end(key)
+
+            return True, cache[key]
+
+    def _cached_or_load(
+        self, cache: OrderedDict, key: Tuple, load: Callable[[], object]
+    ) -> object:
+        """
+        Returns the value of the key in the cache, loading (and storing) it if it isn't.
+
+        :param cache (OrderedDict): the cache.
+        :param key (Tuple): the key.
+        :param load (Callable): loads the value.
+
+        :return: the value.
+        """
+        found, value = self._cached(cache, key)
+
+        if not found:
+            value = load()
+            self._store(cache, key, value)
+
+        return value
+
+    def find_song(
+        self, music: str, singer: str, genius_key: str | None = None
+    ) -> Dict | None:
+        """
+        Searches for the song, the result of a previous search (or prefetch) is reused
+        and the search of the same song that is running is shared.
+
+        :param music (str): the name of the music.
+        :param singer (str): the name of the singer.
+        :param genius_key (str | None): the API key.
+
+        :return: the first result of the search, None if nothing was found.
+        """
+        key = self._key(music, singer, genius_key)
+
+        found, song = self._cached(self._songs, key)
+
+        if not found:
+            # the cache is checked again by the shared search, another one may have
+            # just finished
+            song = self._searches.run(
+                key,
+                lambda: self._cached_or_load(
+                    self._songs, key, lambda: self._search(music, singer, genius_key)
+                ),
+            )
+
+        return song  # type: ignore
+
+    def fetch_lyric(self, song_id: int, genius_key: str | None = None) -> List[str]:
+        """
+        Downloads the lyric of a song, the lyric downloaded before (or prefetched) is
+        reused and the download of the same lyric that is running is shared.
+
+        :param song_id (int): the id of the song on Genius.
+        :param genius_key (str | None): the API key.
+
+        :raises: the errors of the download and of the division of the blocks.
+
+        :return: the strophes, the first item is a blank (the title slide).
+        """
+        key = (song_id, genius_key)
+
+        found, lyric = self._cached(self._lyrics, key)
+
+        if not found:
+            lyric = self._downloads.run(
+                key,
+                lambda: self._cached_or_load(
+                    self._lyrics, key, lambda: self._fetch(song_id, genius_key)
+                ),
+            )
+
+        # each caller can change its list
+        return list(lyric)  # type: ignore
+
+    def prefetch(self, music: str, singer: str, genius_key: str | None = None) -> None:
+        """
+        Starts the lookup of a song in the background (if it isn't in the cache) and
+        cancels the prefetches of the other songs.
+
+        :param music (str): the name of the music.
+        :param singer (str): the name of the singer.
+        :param genius_key (str | None): the API key.
+        """
+        key = self._key(music, singer, genius_key)
+
+        with self._lock:
+            for other_key, (future, cancelled) in list(self._prefetches.items()):
+                if other_key != key:
+                    cancelled.set()
+                    future.cancel()
+                    del self._prefetches[other_key]
+
+            if key in self._prefetches or key in self._songs:
+                return
+
+            cancelled = threading.Event()
+            future = _executor.submit(
+                self._prefetch, key, music, singer, genius_key, cancelled
+            )
+            self._prefetches[key] = (future, cancelled)
+
+    def cancel_prefetches(self) -> None:
+        """
+        Cancels all the prefetches.
+        """
+        with self._lock:
+            for future, cancelled in self._prefetches.values():
+                cancelled.set()
+                future.cancel()
+
+            self._prefetches.clear()
+
+    def _prefetch(
+        self,
+        key: Tuple,
+        music: str,
+        singer: str,
+        genius_key: str | None,
+        cancelled: threading.Event,
+    ) -> None:
+        """
+        Searches the song and downloads its lyric, on the thread pool.
+        The errors are ignored: the lookup is done again when the user confirms,
+        and the error is shown then.
+        """
+        try:
+            song = self.find_song(music, singer, genius_key)
+
+            if song is not None and not cancelled.is_set():
+                self.fetch_lyric(song["id"], genius_key)
+
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+        finally:
+            with self._lock:
+                if key in self._prefetches and self._prefetches[key][1] is cancelled:
+                    del self._prefetches[key]
@@ -0,0 +1,437 @@
+"""
+This module contains the LyricLibrary class, the local library of lyrics.
+
+Many songs aren't on Genius. Their lyrics can be imported from a folder of text files
+(.txt, e.g. exported from Word, and .lrc) to an SQLite database
+(settings/lyric_library.sqlite3), and the songs of the library are created without any
+search on Genius (see search_music_lyric.search_lyrics).
+
+The music and singer of each file come from:
+    - the [ti:] and [ar:] tags of the .lrc files;
+    - the file name, as the presentations are named ("Music (Singer).txt")
+      or "Music - Singer.txt";
+    - otherwise the file name is the music and its folder is the singer
+      ("Singer/Music.txt", no singer if the file is on the imported folder).
+
+The lyric is divided in strophes by the blank lines, as on page insert manually.
+
+The folders are imported incrementally, as the deck catalogue: a file is only read again
+when its modification time or size changed, and the files that were deleted are removed.
+The files are read and divided on a thread pool while the database is written.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, List, Tuple
+
+from app.csv_import import normalize_text, sniff_encoding, song_key
+from app.song_index import SongEntry, song_index
+
+LIBRARY_FILE_NAME = "lyric_library.sqlite3"
+
+LYRIC_EXTENSIONS = (".txt", ".lrc")
+
+# the files bigger than this aren't lyrics
+MAX_LYRIC_BYTES = 1024 * 1024
+
+# the number of songs imported between two commits (and progress reports)
+COMMIT_EVERY = 200
+
+# the timestamps of the lines of the .lrc files ([01:02.34]) and their tags ([ti:...])
+LRC_TIMESTAMP = re.compile(r"\[\d+:\d+(?:[.:]\d+)?\]")
+LRC_TAG = re.compile(r"^\[(\w+):(.*)\]$")
+
+# the names of the presentations created by the app: "Music (singer)"
+NAME_WITH_SINGER = re.compile(r"^(.+?)\s*\((.+)\)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    music TEXT NOT NULL,
+    singer TEXT NOT NULL,
+    music_key TEXT NOT NULL,
+    singer_key TEXT NOT NULL,
+    lyric TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS songs_key ON songs (music_key, singer_key);
+"""
+
+# the files read at the same time, a few more are queued so the pool is never idle (and
+# the folder is never entirely in memory)
+READ_WORKERS = min(8, os.cpu_count() or 1)
+MAX_QUEUED_FILES = READ_WORKERS * 4
+
+_executor = ThreadPoolExecutor(
+    max_workers=READ_WORKERS, thread_name_prefix="LyricLibrary"
+)
+
+
+@dataclass
+class LibrarySong:
+    """
+    A song read from a lyric file.
+
+    :param music: The name of the music.
+
+    :param singer: The name of the singer.
+
+    :param lyric: The strophes, the first item is a blank (the title slide).
+    """
+
+    music: str
+    singer: str
+    lyric: List[str]
+
+
+def split_strophes(text: str) -> List[str]:
+    """
+    Divides a lyric in strophes by its blank lines (as page insert manually).
+
+    :param text (str): the lyric.
+
+    :return (List[str]): the strophes, the first item is a blank (the title slide).
+    """
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").split("\n")]
+
+    return [""] + [
+        strophe for strophe in re.split(r"\n{2,}", "\n".join(lines).strip()) if strophe
+    ]
+
+
+def _song_names(path: str, root: str) -> Tuple[str, str]:
+    """
+    Returns the music and singer of a lyric file from its name and folder.
+
+    :param path (str): the path of the file.
+    :param root (str): the imported folder.
+
+    :return: the music and the singer.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    match = NAME_WITH_SINGER.match(name)
+    if match:
+        return match.group(1), match.group(2)
+
+    if " - " in name:
+        music, singer = name.split(" - ", 1)
+        return music, singer
+
+    folder = os.path.dirname(path)
+
+    return name, os.path.basename(folder) if folder != root else ""
+
+
+def read_lyric_file(path: str, root: str) -> LibrarySong | None:
+    """
+    Reads a lyric file (.txt or .lrc).
+
+    :param path (str): the path of the file.
+    :param root (str): the imported folder (the singer can be the folder of the file).
+
+    :return (LibrarySong | None): the song, None if the file can't be read or is empty.
+    """
+    try:
+        with open(path, "rb") as lyric_file:
+            data = lyric_file.read(MAX_LYRIC_BYTES + 1)
+
+    except OSError:
+        return None
+
+    if len(data) > MAX_LYRIC_BYTES:
+        return None
+
+    try:
+        text = data.decode(sniff_encoding(data))
+
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+    music, singer = _song_names(path, root)
+
+    if path.lower().endswith(".lrc"):
+        lines = []
+
+        for line in text.splitlines():
+            tag = LRC_TAG.match(line.strip())
+
+            if tag and not LRC_TIMESTAMP.match(line.strip()):
+                if tag.group(1).lower() == "ti" and tag.group(2).strip():
+                    music = tag.group(2)
+
+                elif tag.group(1).lower() == "ar" and tag.group(2).strip():
+                    singer = tag.group(2)
+
+                continue
+
+            lines.append(LRC_TIMESTAMP.sub("", line))
+
+        text = "\n".join(lines)
+
+    lyric = split_strophes(text)
+
+    if len(lyric) == 1:
+        return None
+
+    return LibrarySong(normalize_text(music), normalize_text(singer), lyric)
+
+
+def _scan_lyric_files(root: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Walks the folder and its subfolders looking for lyric files.
+
+    :param root (str): the folder.
+
+    :return: the path, modification time and size of each file.
+    """
+    folders = [root]
+
+    while folders:
+        folder = folders.pop()
+
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+
+                        elif entry.name.lower().endswith(
+                            LYRIC_EXTENSIONS
+                        ) and not entry.name.startswith("."):
+                            entry_stat = entry.stat()
+                            yield entry.path, int(entry_stat.st_mtime), entry_stat.st_size
+
+                    except OSError:
+                        continue
+
+        except OSError:
+            continue
+
+
+class LyricLibrary:
+    """
+    This class represents the library of lyrics.
+    Each thread uses its own connection to the database.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Creates the library, the database is created on the first use.
+
+        :param path (str | None): the path of the database, the settings folder by default.
+        """
+        self.path = path or os.path.join(os.getcwd(), "settings", LIBRARY_FILE_NAME)
+
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection of the current thread.
+
+        :return (Connection): the connection.
+        """
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+            connection = sqlite3.connect(self.path)
+
+            # the searches of the batches don't wait for an import
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(SCHEMA)
+
+            self._local.connection = connection
+
+        return connection
+
+    def import_folder(
+        self,
+        root: str,
+        progress: Callable[[int], None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> Tuple[int, int]:
+        """
+        Updates the library with the lyric files of the folder and its subfolders.
+
+        :param root (str): the folder.
+        :param progress (Callable, optional): called with the number of songs imported.
+        :param should_stop (Callable, optional): the import stops when it returns True
+            (the songs already imported are kept).
+
+        :return: the number of songs imported and removed.
+        """
+        root = os.path.abspath(root)
+        connection = self._connection()
+
+        # the files of the folder in the library (the paths with the root prefix)
+        prefix = os.path.join(root, "")
+        imported_files: Dict[str, Tuple[int, int]] = {
+            path: (mtime, size)
+            for path, mtime, size in connection.execute(
+                "SELECT path, mtime, size FROM songs WHERE path > ? AND path < ?",
+                (prefix, prefix + "\U0010ffff"),
+            )
+        }
+
+        # the files being read on the pool, in the order they were found
+        reading: Deque[Tuple[str, int, int, Future]] = deque()
+        new_songs: List[SongEntry] = []
+        imported = 0
+        stopped = False
+
+        for path, mtime, size in _scan_lyric_files(root):
+            if should_stop and should_stop():
+                stopped = True
+                break
+
+            if imported_files.pop(path, None) == (mtime, size):
+                continue
+
+            reading.append(
+                (path, mtime, size, _executor.submit(read_lyric_file, path, root))
+            )
+
+            # the songs already read are saved while the others are read
+            while len(reading) >= MAX_QUEUED_FILES or reading and reading[0][3].done():
+                imported += self._store(connection, *reading.popleft(), new_songs)
+
+                if len(new_songs) >= COMMIT_EVERY:
+                    self._commit(connection, new_songs)
+
+                    if progress:
+                        progress(imported)
+
+        if stopped:
+            # the files not read yet are read on the next import
+            for *_, future in reading:
+                future.cancel()
+
+            imported_files.clear()
+
+        else:
+            while reading:
+                imported += self._store(connection, *reading.popleft(), new_songs)
+
+            # the files that weren't found anymore
+            for path in imported_files:
+                connection.execute("DELETE FROM songs WHERE path = ?", (path,))
+
+        self._commit(connection, new_songs)
+
+        if progress:
+            progress(imported)
+
+        return imported, len(imported_files)
+
+    @staticmethod
+    def _store(
+        connection: sqlite3.Connection,
+        path: str,
+        mtime: int,
+        size: int,
+        future: Future,
+        new_songs: List[SongEntry],
+    ) -> bool:
+        """
+        Saves the song read from a file (a file that isn't a lyric anymore is removed).
+
+        :param connection (Connection): the connection.
+        :param path (str): the path of the file.
+        :param mtime (int): the modification time of the file.
+        :param size (int): the size of the file.
+        :param future (Future): the reading of the file (see read_lyric_file).
+        :param new_songs (List[SongEntry]): the songs not committed yet, the song is
+            added to it.
+
+        :return (bool): True if the song was saved.
+        """
+        song = future.result()
+
+        connection.execute("DELETE FROM songs WHERE path = ?", (path,))
+
+        if song is None:
+            return False
+
+        connection.execute(
+            "INSERT INTO songs (path, mtime, size, music, singer, music_key, "
+            "singer_key, lyric) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                path,
+                mtime,
+                size,
+                song.music,
+                song.singer,
+                *song_key(song.music, song.singer),
+                json.dumps(song.lyric),
+            ),
+        )
+        new_songs.append(SongEntry(song.music, song.singer))
+
+        return True
+
+    @staticmethod
+    def _commit(connection: sqlite3.Connection, new_songs: List[SongEntry]) -> None:
+        """
+        Commits the imported songs and adds them to the song index (they are suggested
+        while typing).
+
+        :param connection (Connection): the connection.
+        :param new_songs (List[SongEntry]): the songs imported since the last commit,
+            the list is emptied.
+        """
+        connection.commit()
+
+        song_index.add_songs(new_songs)
+        new_songs.clear()
+
+    def find(self, music: str, singer: str) -> LibrarySong | None:
+        """
+        Returns the song of the library with this music and singer
+        (see csv_import.song_key).
+
+        :param music (str): the name of the music.
+        :param singer (str): the name of the singer.
+
+        :return (LibrarySong | None): the song, None if it isn't in the library.
+        """
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT music, singer, lyric FROM songs "
+                    "WHERE music_key = ? AND singer_key = ? LIMIT 1",
+                    song_key(music, singer),
+                )
+                .fetchone()
+            )
+
+        except sqlite3.Error:
+            return None
+
+        if row is None:
+            return None
+
+        return LibrarySong(row[0], row[1], json.loads(row[2]))
+
+    def count(self) -> int:
+        """
+        Returns the number of songs in the library.
+
+        :return (int): the number of songs.
+        """
+        return self._connection().execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+
+# the library of the application, used by the searches and the import of the menu
+lyric_library = LyricLibrary()
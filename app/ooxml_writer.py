@@ -0,0 +1,810 @@
+"""
+This module contains the OOXML writer of the song presentations (the "ooxml" backend
+of create_slides).
+
+python-pptx builds each slide through its object model: every property set on a shape
+or a paragraph creates proxy objects and looks up or inserts XML elements, and the
+slides are serialized by lxml at the end. The songs only have 2 kinds of slides (the
+title slide and the lyric slides), so this writer writes their XML directly from string
+templates, the same XML python-pptx writes (after app.optimize_pptx).
+
+python-pptx is only used once per template, to get the parts shared by the presentations
+(the master, the 2 layouts used, the theme...) and the placeholders the slides copy from
+the layouts (a template saved by the user can have other placeholders on them).
+"""
+
+import os
+import posixpath
+import re
+import threading
+from io import BytesIO
+from typing import IO, TYPE_CHECKING, Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+from lxml import etree
+from pptx.enum.text import PP_PARAGRAPH_ALIGNMENT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.spec import default_content_types
+from pptx.oxml.ns import nsdecls
+from pptx.parts.image import Image, ImagePart
+from pptx.slide import Slide
+from pptx.util import Inches, Pt
+
+from app.autofit import EMPTY_PARAGRAPH_HEIGHT_PT
+from app.optimize_pptx import (
+    CONTENT_TYPES_NAME,
+    CONTENT_TYPES_NAMESPACE,
+    DEFAULT_TOP_INSET,
+    optimize_parts,
+    serialize_presentation,
+)
+from app.package_writer import write_package
+from app.template_pool import (
+    song_layouts,
+    template_path,
+    template_pool,
+    template_signature,
+)
+from app.tracing import tracer
+
+if TYPE_CHECKING:
+    from app.create_pptx import SlidesConfig
+
+SLIDE_WIDTH = Inches(16)
+SLIDE_HEIGHT = Inches(9)
+
+# the position of the song image on the title slide
+SONG_IMAGE_POSITION = (Inches(9), Inches(2), Inches(6), Inches(4))
+
+# the top inset of the lyric textboxes: the optimizer moves the height of their empty
+# first paragraph to it
+LYRIC_TOP_INSET = DEFAULT_TOP_INSET + Pt(EMPTY_PARAGRAPH_HEIGHT_PT)
+
+XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+
+RELATIONSHIPS_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+CONTENT_TYPE_SLIDE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+)
+
+# the namespaces declared on the root of the slides
+SLIDE_NAMESPACES = nsdecls("a", "p", "r")
+
+# python-pptx escapes the control characters of the text (except tab and line feed)
+CONTROL_CHARACTERS = re.compile(r"([\x00-\x08\x0B-\x1F])")
+
+# the empty list of slides of the presentation part, the slides are written in its place
+EMPTY_SLIDE_LIST = "<p:sldIdLst/>"
+
+# the id of the first slide on the presentation part, the next ones follow it
+FIRST_SLIDE_ID = 256
+
+
+def _text(text: str) -> str:
+    """
+    Escapes a text to the content of an element.
+
+    :param text (str): the text.
+
+    :return (str): the escaped text.
+    """
+    return escape(
+        CONTROL_CHARACTERS.sub(lambda match: "_x%04X_" % ord(match.group(1)), text)
+    )
+
+
+def _attribute(value: str) -> str:
+    """
+    Escapes a text to the value of an attribute.
+
+    :param value (str): the text.
+
+    :return (str): the escaped text.
+    """
+    return escape(value, {'"': "&quot;"})
+
+
+def _solid_fill(color_RGB: Tuple) -> str:
+    """
+    :param color_RGB (Tuple): the color in RGB.
+
+    :return (str): the a:solidFill element of the color.
+    """
+    return '<a:solidFill><a:srgbClr val="%02X%02X%02X"/></a:solidFill>' % tuple(
+        color_RGB
+    )
+
+
+def _runs(text: str) -> str:
+    """
+    Returns the runs of a paragraph, the line feeds are line breaks
+    (as python-pptx does on _Paragraph.text).
+
+    :param text (str): the text of the paragraph.
+
+    :return (str): the a:r and a:br elements.
+    """
+    return "<a:br/>".join(
+        f"<a:r><a:t>{_text(line)}</a:t></a:r>" if line else ""
+        for line in re.split("\n|\v", text)
+    )
+
+
+def _title_paragraphs(
+    text: str, font_size_PT: int, font_color_RGB: Tuple, font_name: str, bold: bool
+) -> str:
+    """
+    Returns the paragraphs of the title or the subtitle, a paragraph for each line
+    (as python-pptx does on TextFrame.text), the font is set on the first one.
+
+    :param text (str): the text.
+    :param font_size_PT (int): the size of the font.
+    :param font_color_RGB (Tuple): the color of the font.
+    :param font_name (str): the name of the font.
+    :param bold (bool): if the font is bold.
+
+    :return (str): the a:p elements.
+    """
+    lines = text.split("\n")
+
+    paragraphs = [
+        f'<a:p><a:pPr><a:defRPr sz="{Pt(font_size_PT).centipoints}" '
+        f'b="{int(bool(bold))}">{_solid_fill(font_color_RGB)}'
+        f'<a:latin typeface="{_attribute(font_name)}"/></a:defRPr></a:pPr>'
+        f"{_runs(lines[0])}</a:p>"
+    ]
+
+    paragraphs.extend(
+        f"<a:p>{_runs(line)}</a:p>" if line else "<a:p/>" for line in lines[1:]
+    )
+
+    return "".join(paragraphs)
+
+
+def _geometry(left: int, top: int, width: int, height: int) -> str:
+    """
+    :return (str): the a:xfrm element of a shape.
+    """
+    return (
+        f'<a:xfrm><a:off x="{left}" y="{top}"/>'
+        f'<a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+    )
+
+
+def _picture(
+    shape_id: int,
+    description: str,
+    relationship_id: str,
+    position: Tuple[int, int, int, int],
+) -> str:
+    """
+    Returns a picture (as python-pptx adds it).
+
+    :param shape_id (int): the id of the shape.
+    :param description (str): the description (the file name of the image).
+    :param relationship_id (str): the relationship of the slide to the image.
+    :param position (Tuple): the left, top, width and height.
+
+    :return (str): the p:pic element.
+    """
+    return (
+        f'<p:pic><p:nvPicPr><p:cNvPr id="{shape_id}" name="Picture {shape_id - 1}" '
+        f'descr="{_attribute(description)}"/><p:cNvPicPr>'
+        '<a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/></p:nvPicPr>'
+        f'<p:blipFill><a:blip r:embed="{relationship_id}"/>'
+        "<a:stretch><a:fillRect/></a:stretch></p:blipFill>"
+        f"<p:spPr>{_geometry(*position)}"
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+    )
+
+
+def _serialize(element: etree._Element) -> str:
+    """
+    Serializes an element of a slide without the namespaces declared on the slide root.
+
+    :param element (_Element): the element.
+
+    :return (str): the XML.
+    """
+    xml = etree.tostring(element, encoding="unicode")
+
+    for prefix in ("a", "p", "r"):
+        xml = xml.replace(f" {nsdecls(prefix)}", "")
+
+    return xml
+
+
+class _Placeholder:
+    """
+    A placeholder a slide copies from its layout.
+    """
+
+    def __init__(self, shape: etree._Element, idx: int) -> None:
+        """
+        :param shape (_Element): the p:sp element, as python-pptx copies it to the slide.
+        :param idx (int): the idx of the placeholder.
+        """
+        self.idx = idx
+        self.shape_id = int(shape[0][0].get("id"))
+        self.xml = _serialize(shape)
+
+        # the title and the subtitle only keep the non-visual properties, their
+        # geometry and text are written by the slide
+        self.properties_xml = _serialize(shape[0])
+
+
+def _placeholders(slide: Slide) -> List[_Placeholder]:
+    """
+    Returns the placeholders python-pptx copied from the layout to a slide.
+
+    :param slide (Slide): the slide.
+
+    :return: the placeholders, in order.
+    """
+    return [
+        _Placeholder(placeholder._element, placeholder.placeholder_format.idx)
+        for placeholder in slide.placeholders
+    ]
+
+
+class _Template:
+    """
+    The parts of a template and what the slides copy from it.
+    """
+
+    def __init__(self, template_name: str, signature: str) -> None:
+        """
+        Gets the parts of the template from python-pptx.
+
+        :param template_name (str): the name of the template, "" for the default one.
+        :param signature (str): the signature of the template file.
+        """
+        self.signature = signature
+
+        presentation = template_pool.new_presentation(template_name)
+        presentation.slide_width = SLIDE_WIDTH
+        presentation.slide_height = SLIDE_HEIGHT
+        presentation.part._element.get_or_add_sldIdLst()
+
+        title_layout, lyric_layout = song_layouts(presentation)
+
+        self.title_layout_name = title_layout.part.partname[1:]
+        self.lyric_layout_name = lyric_layout.part.partname[1:]
+        self.presentation_name = presentation.part.partname[1:]
+
+        package_parts = list(presentation.part.package.iter_parts())
+
+        # the image numbers and relationships python-pptx would avoid when adding the slides
+        self.image_numbers = {
+            part.partname.idx
+            for part in package_parts
+            if part.partname.startswith("/ppt/media/image")
+            and part.partname.idx is not None
+        }
+        self.relationship_ids = set(presentation.part.rels)
+
+        # python-pptx reuses an image of the template if a slide adds the same one
+        self.media = {
+            part.sha1: (part.partname[1:], part.desc)
+            for part in package_parts
+            if isinstance(part, ImagePart)
+        }
+
+        self.parts = serialize_presentation(presentation)
+        optimize_parts(self.parts, (self.title_layout_name, self.lyric_layout_name))
+
+        # the presentation part, its relationships and the content types are written
+        # again with the slides of each presentation
+        self.presentation_head, self.presentation_tail = (
+            self.parts.pop(self.presentation_name)
+            .decode("utf-8")
+            .split(EMPTY_SLIDE_LIST)
+        )
+
+        self.presentation_rels_name = posixpath.join(
+            posixpath.dirname(self.presentation_name),
+            "_rels",
+            posixpath.basename(self.presentation_name) + ".rels",
+        )
+        self.presentation_rels = (
+            self.parts.pop(self.presentation_rels_name)
+            .decode("utf-8")
+            .replace("</Relationships>", "")
+        )
+
+        content_types = etree.fromstring(self.parts.pop(CONTENT_TYPES_NAME))
+        self.defaults = {
+            element.get("Extension"): element.get("ContentType")
+            for element in content_types.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Default")
+        }
+        self.overrides = {
+            element.get("PartName"): element.get("ContentType")
+            for element in content_types.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Override")
+        }
+
+        # the slides are only added after the parts were serialized
+        self.title_placeholders = _placeholders(
+            presentation.slides.add_slide(title_layout)
+        )
+        self.lyric_placeholders = _placeholders(
+            presentation.slides.add_slide(lyric_layout)
+        )
+
+
+class _Deck:
+    """
+    The parts of a presentation being written.
+    """
+
+    def __init__(self, template: _Template) -> None:
+        """
+        :param template (_Template): the template of the presentation.
+        """
+        self.template = template
+        self.parts = dict(template.parts)
+        self.defaults = dict(template.defaults)
+        self.overrides = dict(template.overrides)
+        self.media = dict(template.media)
+        self.slide_names: List[str] = []
+
+        self._image_numbers = set(template.image_numbers)
+
+    def _next_image_name(self, extension: str) -> str:
+        """
+        Returns the name of a new image part, with the first number not used by another
+        image (as python-pptx does).
+
+        :param extension (str): the extension of the image.
+
+        :return (str): the name.
+        """
+        number = 1
+
+        while number in self._image_numbers:
+            number += 1
+
+        self._image_numbers.add(number)
+
+        return f"ppt/media/image{number}.{extension}"
+
+    def add_image(self, image_file: str | bytes | IO[bytes]) -> Tuple[str, str]:
+        """
+        Adds an image to the presentation, if it isn't already in it.
+
+        :param image_file (str | bytes | IO[bytes]): the path, the image or the file.
+
+        :return: the name of the image part and the description of the pictures
+            (the file name of the image, "image.png" and so on if it wasn't a path).
+        """
+        image = Image.from_file(
+            BytesIO(image_file) if isinstance(image_file, bytes) else image_file
+        )
+
+        # the pictures of the same image share the part, and its description
+        if image.sha1 in self.media:
+            return self.media[image.sha1]
+
+        name = self._next_image_name(image.ext)
+
+        self.parts[name] = image.blob
+        self.media[image.sha1] = (name, image.filename or f"image.{image.ext}")
+
+        if (image.ext.lower(), image.content_type) in default_content_types:
+            self.defaults[image.ext.lower()] = image.content_type
+
+        else:
+            self.overrides[f"/{name}"] = image.content_type
+
+        return self.media[image.sha1]
+
+    def add_slide(self, layout_name: str, slide_xml: str, image_names: List[str]) -> None:
+        """
+        Adds a slide to the presentation.
+
+        :param layout_name (str): the name of the layout part.
+        :param slide_xml (str): the XML of the slide.
+        :param image_names (List[str]): the image parts, the relationship "rId2" is the
+            first one and so on.
+        """
+        name = f"ppt/slides/slide{len(self.slide_names) + 1}.xml"
+        relationships = [(RT.SLIDE_LAYOUT, layout_name)] + [
+            (RT.IMAGE, image_name) for image_name in image_names
+        ]
+
+        rels_name = f"ppt/slides/_rels/{posixpath.basename(name)}.rels"
+
+        self.parts[name] = slide_xml.encode("utf-8")
+        self.parts[rels_name] = (
+            XML_DECLARATION
+            + f'<Relationships xmlns="{RELATIONSHIPS_NAMESPACE}">'
+            + "".join(
+                f'<Relationship Id="rId{number}" Type="{relationship_type}" '
+                f'Target="{posixpath.relpath(target_name, "ppt/slides")}"/>'
+                for number, (relationship_type, target_name) in enumerate(
+                    relationships, 1
+                )
+            )
+            + "</Relationships>"
+        ).encode("utf-8")
+
+        self.overrides[f"/{name}"] = CONTENT_TYPE_SLIDE
+        self.slide_names.append(name)
+
+    @staticmethod
+    def slide_id(position: int) -> int:
+        """
+        Returns the id of a slide on the presentation part (see finish).
+
+        :param position (int): the position of the slide, 0 for the first one.
+
+        :return (int): the id, the first slide is 256 (as python-pptx).
+        """
+        return FIRST_SLIDE_ID + position
+
+    def finish(self) -> Dict[str, bytes]:
+        """
+        Writes the presentation part, its relationships and the content types.
+
+        :return: the parts of the presentation, in the order they are zipped.
+        """
+        template = self.template
+        folder = posixpath.dirname(template.presentation_name)
+
+        relationship_ids = []
+        number = 1
+
+        for _ in self.slide_names:
+            while f"rId{number}" in template.relationship_ids:
+                number += 1
+
+            relationship_ids.append(f"rId{number}")
+            number += 1
+
+        presentation_xml = (
+            template.presentation_head
+            + "<p:sldIdLst>"
+            + "".join(
+                f'<p:sldId id="{slide_id}" r:id="{relationship_id}"/>'
+                for slide_id, relationship_id in enumerate(
+                    relationship_ids, FIRST_SLIDE_ID
+                )
+            )
+            + "</p:sldIdLst>"
+            + template.presentation_tail
+        )
+
+        presentation_rels = (
+            template.presentation_rels
+            + "".join(
+                f'<Relationship Id="{relationship_id}" Type="{RT.SLIDE}" '
+                f'Target="{posixpath.relpath(slide_name, folder)}"/>'
+                for relationship_id, slide_name in zip(
+                    relationship_ids, self.slide_names
+                )
+            )
+            + "</Relationships>"
+        )
+
+        content_types = (
+            XML_DECLARATION
+            + f'<Types xmlns="{CONTENT_TYPES_NAMESPACE}">'
+            + "".join(
+                f'<Default Extension="{extension}" ContentType="{content_type}"/>'
+                for extension, content_type in sorted(self.defaults.items())
+            )
+            + "".join(
+                f'<Override PartName="{part_name}" ContentType="{content_type}"/>'
+                for part_name, content_type in sorted(self.overrides.items())
+            )
+            + "</Types>"
+        )
+
+        return {
+            CONTENT_TYPES_NAME: content_types.encode("utf-8"),
+            **self.parts,
+            template.presentation_name: presentation_xml.encode("utf-8"),
+            template.presentation_rels_name: presentation_rels.encode("utf-8"),
+        }
+
+
+def _relationship_id(image_names: List[str], image_name: str) -> str:
+    """
+    Returns the relationship of a slide to an image, the layout is the first one.
+
+    :param image_names (List[str]): the images of the slide, the image is appended
+        if it isn't in it.
+    :param image_name (str): the name of the image part.
+
+    :return (str): the id of the relationship.
+    """
+    if image_name not in image_names:
+        image_names.append(image_name)
+
+    return f"rId{image_names.index(image_name) + 2}"
+
+
+def _slide(background_color_RGB: Tuple, shapes: List[str]) -> str:
+    """
+    :param background_color_RGB (Tuple): the color of the background.
+    :param shapes (List[str]): the XML of the shapes, from the back to the front.
+
+    :return (str): the XML of the slide part.
+    """
+    return (
+        f"{XML_DECLARATION}<p:sld {SLIDE_NAMESPACES}><p:cSld>"
+        f"<p:bg><p:bgPr>{_solid_fill(background_color_RGB)}<a:effectLst/></p:bgPr></p:bg>"
+        '<p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/>'
+        f'</p:nvGrpSpPr><p:grpSpPr/>{"".join(shapes)}</p:spTree></p:cSld>'
+        "<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>"
+    )
+
+
+_templates: Dict[str, _Template] = {}
+_templates_lock = threading.Lock()
+
+
+def _template(template_name: str) -> _Template:
+    """
+    Returns the template, getting its parts again when its file changes.
+
+    :param template_name (str): the name of the template, "" for the default one.
+
+    :return (_Template): the template.
+    """
+    path = template_path(template_name)
+    signature = template_signature(template_name)
+
+    template = _templates.get(path)
+
+    if template is not None and template.signature == signature:
+        return template
+
+    with _templates_lock:
+        template = _templates.get(path)
+
+        if template is None or template.signature != signature:
+            template = _Template(template_name, signature)
+            _templates[path] = template
+
+    return template
+
+
+def new_deck(template_name: str) -> _Deck:
+    """
+    Starts an empty presentation, its songs are added with add_song and its parts are
+    written by its finish method.
+
+    :param template_name (str): the name of the template, "" for the default one.
+
+    :return (_Deck): the presentation.
+    """
+    return _Deck(_template(template_name))
+
+
+def render_song(
+    music_title: str,
+    music_singer: str,
+    pages: List[str],
+    font_sizes: List[float],
+    slides_config: "SlidesConfig",
+    method: str,
+    thumbnail_path: str = "",
+    image: bytes | BytesIO | None = None,
+    background_image: bytes | BytesIO | None = None,
+) -> Dict[str, bytes]:
+    """
+    Writes the parts of the presentation of a song, the same slides add_song_slides adds.
+    The params are the same as add_song.
+
+    :return: the parts of the presentation (see app.package_writer.write_package).
+    """
+    deck = new_deck(slides_config.template_name)
+
+    add_song(
+        deck,
+        music_title,
+        music_singer,
+        pages,
+        font_sizes,
+        slides_config,
+        method,
+        thumbnail_path,
+        image,
+        background_image,
+    )
+
+    return deck.finish()
+
+
+def add_song(
+    deck: _Deck,
+    music_title: str,
+    music_singer: str,
+    pages: List[str],
+    font_sizes: List[float],
+    slides_config: "SlidesConfig",
+    method: str,
+    thumbnail_path: str = "",
+    image: bytes | BytesIO | None = None,
+    background_image: bytes | BytesIO | None = None,
+) -> List[int]:
+    """
+    Appends the slides of a song to the presentation, the same slides add_song_slides
+    adds. The slides are kept as their XML (not as lxml trees).
+
+    :param deck (_Deck): the presentation (see new_deck).
+    :param music_title (str): the title of the song.
+    :param music_singer (str): the singer of the song.
+    :param pages (List[str]): the lyric split into slides, the first item is the
+        title slide.
+    :param font_sizes (List[float]): the size of the text of each slide.
+    :param slides_config (SlidesConfig): the configuration of the slides.
+    :param method (str): the method to insert the lyrics (see create_slides).
+    :param thumbnail_path (str): the image of the song downloaded from genius, if any.
+    :param image (bytes | BytesIO | None): the image of the song.
+    :param background_image (bytes | BytesIO | None): the background image of the slides.
+
+    :return (List[int]): the ids of the slides added (see _Deck.slide_id).
+    """
+    template = deck.template
+    first_slide = len(deck.slide_names)
+
+    background = deck.add_image(background_image) if background_image else None
+    background_position = (0, 0, SLIDE_WIDTH, SLIDE_HEIGHT)
+
+    alignment = (
+        f' algn="{PP_PARAGRAPH_ALIGNMENT.to_xml(slides_config.text_font_alignment)}"'
+        if slides_config.text_font_alignment is not None
+        else ""
+    )
+
+    for i, page in enumerate(pages):
+        placeholders = (
+            template.title_placeholders if i == 0 else template.lyric_placeholders
+        )
+        shape_id = max([1] + [placeholder.shape_id for placeholder in placeholders])
+
+        shapes = []
+        image_names: List[str] = []
+
+        if background:
+            shape_id += 1
+            shapes.append(
+                _picture(
+                    shape_id,
+                    background[1],
+                    _relationship_id(image_names, background[0]),
+                    background_position,
+                )
+            )
+
+        if i == 0:
+            width = int(SLIDE_WIDTH / 2)
+            height = int(SLIDE_HEIGHT / 5)
+            left = (
+                int((SLIDE_WIDTH - width) / 2) if method == "page_insert_manually" else 2
+            )
+            top = int((SLIDE_HEIGHT - height) / 4)
+
+            texts = {
+                0: (
+                    music_title.upper(),
+                    top,
+                    slides_config.title_font_size_PT,
+                    slides_config.title_font_color_RGB,
+                    slides_config.title_font_name,
+                    slides_config.title_font_isbold,
+                ),
+                1: (
+                    music_singer.upper(),
+                    top + height,
+                    slides_config.subtitle_font_size_PT,
+                    slides_config.subtitle_font_color_RGB,
+                    slides_config.subtitle_font_name,
+                    slides_config.subtitle_font_isbold,
+                ),
+            }
+
+            for placeholder in placeholders:
+                if placeholder.idx not in texts:
+                    shapes.append(placeholder.xml)
+                    continue
+
+                text, text_top, *font = texts.pop(placeholder.idx)
+
+                shapes.append(
+                    f"<p:sp>{placeholder.properties_xml}"
+                    f"<p:spPr>{_geometry(left, text_top, width, height)}</p:spPr>"
+                    "<p:txBody><a:bodyPr/><a:lstStyle/>"
+                    f"{_title_paragraphs(text, *font)}</p:txBody></p:sp>"
+                )
+
+            for song_image in (thumbnail_path, image):
+                if song_image:
+                    image_name, description = deck.add_image(song_image)
+
+                    shape_id += 1
+                    shapes.append(
+                        _picture(
+                            shape_id,
+                            description,
+                            _relationship_id(image_names, image_name),
+                            SONG_IMAGE_POSITION,
+                        )
+                    )
+
+            deck.add_slide(
+                template.title_layout_name,
+                _slide(slides_config.background_color_RGB, shapes),
+                image_names,
+            )
+
+            continue
+
+        shapes.extend(placeholder.xml for placeholder in placeholders)
+
+        font_size = font_sizes[i]
+        line_spacing = Pt(
+            slides_config.text_font_line_spacing_PT
+            * 2
+            * font_size
+            / slides_config.text_font_size_PT
+        )
+
+        space_before = Pt(slides_config.text_font_space_before_PT)
+        space_after = Pt(slides_config.text_font_space_after_PT)
+
+        shape_id += 1
+        shapes.append(
+            f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="TextBox {shape_id - 1}"/>'
+            '<p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+            f"<p:spPr>{_geometry(0, 0, SLIDE_WIDTH, SLIDE_HEIGHT)}"
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+            f'<p:txBody><a:bodyPr wrap="none" tIns="{LYRIC_TOP_INSET}"><a:spAutoFit/>'
+            f"</a:bodyPr><a:lstStyle/><a:p><a:pPr{alignment}>"
+            f'<a:lnSpc><a:spcPts val="{line_spacing.centipoints}"/></a:lnSpc>'
+            f'<a:spcBef><a:spcPts val="{space_before.centipoints}"/></a:spcBef>'
+            f'<a:spcAft><a:spcPts val="{space_after.centipoints}"/></a:spcAft>'
+            f'<a:defRPr b="{int(bool(slides_config.text_font_isbold))}" '
+            f'sz="{Pt(font_size).centipoints}">'
+            f"{_solid_fill(slides_config.text_font_color_RGB)}"
+            f'<a:latin typeface="{_attribute(slides_config.text_font_name)}"/>'
+            f"</a:defRPr></a:pPr>{_runs(page.upper())}</a:p></p:txBody></p:sp>"
+        )
+
+        deck.add_slide(
+            template.lyric_layout_name,
+            _slide(slides_config.background_color_RGB, shapes),
+            image_names,
+        )
+
+    return [
+        deck.slide_id(position) for position in range(first_slide, len(deck.slide_names))
+    ]
+
+
+def save_parts(
+    parts: Dict[str, bytes],
+    file: str | IO[bytes],
+    compression_level: int | None = None,
+    reproducible: bool | None = None,
+) -> int:
+    """
+    Saves the parts written by render_song, instead of save_presentation.
+
+    :param parts (Dict[str, bytes]): the parts.
+    :param file (str | IO[bytes]): the path or the file.
+    :param compression_level (int | None): the zlib level, the one of the settings if None.
+    :param reproducible (bool | None): if True, the same presentation always gives the
+        same bytes (see app.package_writer), the mode of the settings if None.
+
+    :return (int): the size of the file.
+    """
+    write_package(parts, file, compression_level, reproducible)
+
+    size = os.path.getsize(file) if isinstance(file, str) else file.tell()
+
+    tracer.annotate(deck_bytes=size)
+
+    return size
@@ -0,0 +1,572 @@
+"""
+This module contains the size optimizer of the presentations created by the app.
+
+python-pptx writes every part of the template to each presentation: the 11 slide
+layouts of the default template (only the title and blank ones are used), the printer
+settings and the thumbnail of the template. The optimizer works on the serialized
+parts, before they are zipped (or on a presentation already saved):
+    - removes the layouts no slide uses, the masters left without layouts and the parts
+      only they used (any part that can't be reached from the package relationships);
+    - removes the printer settings and the thumbnail of the template;
+    - removes the empty first paragraph of the lyric textboxes (its height is moved to
+      the top inset of the textbox, so the text stays in the same place) and the empty runs.
+
+The optimized parts are zipped by app.package_writer.
+
+The parts shared by the presentations of the template pool are never changed, only their
+serialized copies.
+
+Run it on presentations already saved:
+    python -m app.optimize_pptx "path/to/folder or presentation.pptx"
+"""
+
+import argparse
+import os
+import posixpath
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Dict, Iterable, Iterator, List, Set
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.oxml.ns import qn
+from pptx.presentation import Presentation as PresentationType
+from pptx.util import Pt
+
+from app.autofit import EMPTY_PARAGRAPH_HEIGHT_PT
+from app.package_writer import write_package
+from app.tracing import tracer
+
+CONTENT_TYPES_NAME = "[Content_Types].xml"
+PACKAGE_RELS_NAME = "_rels/.rels"
+
+CONTENT_TYPES_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+# the relationships removed from every presentation (the thumbnail is the one of the
+# template, not of the presentation, PowerPoint creates it again when it saves)
+UNUSED_RELATIONSHIPS = (RT.PRINTER_SETTINGS, RT.THUMBNAIL)
+
+# the default top inset of a textbox, in EMU
+DEFAULT_TOP_INSET = 45720
+
+
+@dataclass
+class OptimizeReport:
+    """
+    What the optimizer removed from a presentation.
+    """
+
+    removed_parts: int = 0
+    removed_paragraphs: int = 0
+    removed_runs: int = 0
+    # the size of the parts, before they are compressed
+    bytes_before: int = 0
+    bytes_after: int = 0
+    # the size of the file written, 0 if it wasn't written yet
+    size: int = 0
+
+    @property
+    def saved_bytes(self) -> int:
+        """
+        The bytes removed from the parts (before they are compressed).
+        """
+        return self.bytes_before - self.bytes_after
+
+
+def serialize_presentation(presentation: PresentationType) -> Dict[str, bytes]:
+    """
+    Serializes the parts of a presentation, the same ones Presentation.save writes.
+
+    :param presentation (PresentationType): the presentation.
+
+    :return: the name of each part in the zip and its content, in the order they are written.
+    """
+    package = presentation.part.package
+    parts = tuple(package.iter_parts())
+
+    serialized_parts = {
+        CONTENT_TYPES_NAME: serialize_part_xml(_ContentTypesItem.xml_for(parts)),
+        PACKAGE_RELS_NAME: package._rels.xml,
+    }
+
+    for part in parts:
+        serialized_parts[part.partname[1:]] = part.blob
+
+        if part._rels:
+            serialized_parts[part.partname.rels_uri[1:]] = part.rels.xml
+
+    return serialized_parts
+
+
+def _rels_name(part_name: str) -> str:
+    """
+    Returns the name of the relationships part of a part.
+
+    :param part_name (str): the name of the part ("" for the package).
+
+    :return (str): the name of its relationships part.
+    """
+    folder, file_name = posixpath.split(part_name)
+
+    return posixpath.join(folder, "_rels", file_name + ".rels")
+
+
+def _target_name(part_name: str, relationship: etree._Element) -> str:
+    """
+    Returns the name of the part a relationship points to.
+
+    :param part_name (str): the name of the part of the relationship ("" for the package).
+    :param relationship (_Element): the Relationship element.
+
+    :return (str): the name of the target part.
+    """
+    target = relationship.get("Target", "")
+
+    if target.startswith("/"):
+        return target[1:]
+
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part_name), target))
+
+
+class _Package:
+    """
+    The serialized parts of a presentation, with their XML parsed on demand.
+    """
+
+    def __init__(self, parts: Dict[str, bytes]) -> None:
+        """
+        :param parts (Dict[str, bytes]): the serialized parts, changed in place.
+        """
+        self.parts = parts
+        self._elements: Dict[str, etree._Element] = {}
+
+    def element(self, name: str) -> etree._Element:
+        """
+        Returns the parsed XML of a part (it's serialized again by save).
+
+        :param name (str): the name of the part.
+
+        :return (_Element): the root element.
+        """
+        if name not in self._elements:
+            self._elements[name] = etree.fromstring(self.parts[name])
+
+        return self._elements[name]
+
+    def relationships(self, part_name: str) -> List[etree._Element]:
+        """
+        Returns the internal relationships of a part.
+
+        :param part_name (str): the name of the part ("" for the package).
+
+        :return: the Relationship elements.
+        """
+        rels_name = _rels_name(part_name)
+
+        if rels_name not in self.parts:
+            return []
+
+        return [
+            relationship
+            for relationship in self.element(rels_name)
+            if relationship.get("TargetMode") != "External"
+        ]
+
+    def remove_relationship(self, part_name: str, relationship: etree._Element) -> None:
+        """
+        Removes a relationship of a part (the target is removed by remove_unreachable).
+
+        :param part_name (str): the name of the part ("" for the package).
+        :param relationship (_Element): the Relationship element.
+        """
+        self.element(_rels_name(part_name)).remove(relationship)
+
+    def remove_unreachable(self) -> int:
+        """
+        Removes the parts that no relationship leads to, starting from the package.
+
+        :return (int): the number of parts removed (their relationship parts included).
+        """
+        reachable: Set[str] = {CONTENT_TYPES_NAME}
+        pending = [""]
+
+        while pending:
+            part_name = pending.pop()
+
+            if _rels_name(part_name) in self.parts:
+                reachable.add(_rels_name(part_name))
+
+            for relationship in self.relationships(part_name):
+                target_name = _target_name(part_name, relationship)
+
+                if target_name not in reachable and target_name in self.parts:
+                    reachable.add(target_name)
+                    pending.append(target_name)
+
+        unreachable = [name for name in self.parts if name not in reachable]
+
+        content_types = self.element(CONTENT_TYPES_NAME)
+
+        for override in content_types.findall(f"{{{CONTENT_TYPES_NAMESPACE}}}Override"):
+            if override.get("PartName", "")[1:] in unreachable:
+                content_types.remove(override)
+
+        for name in unreachable:
+            del self.parts[name]
+            self._elements.pop(name, None)
+
+        return len(unreachable)
+
+    def save(self) -> None:
+        """
+        Serializes the parsed parts again.
+        """
+        for name, element in self._elements.items():
+            self.parts[name] = serialize_part_xml(element)
+
+        self._elements.clear()
+
+
+def _presentation_name(package: _Package) -> str:
+    """
+    Returns the name of the presentation part.
+
+    :param package (_Package): the package.
+
+    :return (str): the name, "" if the package has no presentation.
+    """
+    return next(
+        (
+            _target_name("", relationship)
+            for relationship in package.relationships("")
+            if relationship.get("Type") == RT.OFFICE_DOCUMENT
+        ),
+        "",
+    )
+
+
+def _slide_names(package: _Package, presentation_name: str) -> List[str]:
+    """
+    Returns the names of the slide parts of the presentation.
+
+    :param package (_Package): the package.
+    :param presentation_name (str): the name of the presentation part.
+
+    :return: the names.
+    """
+    return [
+        _target_name(presentation_name, relationship)
+        for relationship in package.relationships(presentation_name)
+        if relationship.get("Type") == RT.SLIDE
+    ]
+
+
+def _used_layouts(package: _Package, slide_names: List[str]) -> Set[str]:
+    """
+    Returns the names of the layouts used by the slides.
+
+    :param package (_Package): the package.
+    :param slide_names (List[str]): the names of the slide parts.
+
+    :return: the names of the layout parts.
+    """
+    return {
+        _target_name(slide_name, relationship)
+        for slide_name in slide_names
+        for relationship in package.relationships(slide_name)
+        if relationship.get("Type") == RT.SLIDE_LAYOUT
+    }
+
+
+def _remove_unused_layouts(
+    package: _Package, presentation_name: str, used_layouts: Set[str]
+) -> None:
+    """
+    Removes the layouts that aren't used and the masters left without layouts.
+
+    :param package (_Package): the package.
+    :param presentation_name (str): the name of the presentation part.
+    :param used_layouts (Set[str]): the names of the layout parts kept.
+    """
+    for master_relationship in package.relationships(presentation_name):
+        if master_relationship.get("Type") != RT.SLIDE_MASTER:
+            continue
+
+        master_name = _target_name(presentation_name, master_relationship)
+        master = package.element(master_name)
+
+        master_layouts = 0
+
+        for relationship in package.relationships(master_name):
+            if relationship.get("Type") != RT.SLIDE_LAYOUT:
+                continue
+
+            if _target_name(master_name, relationship) in used_layouts:
+                master_layouts += 1
+                continue
+
+            package.remove_relationship(master_name, relationship)
+
+            for layout_id in master.iter(qn("p:sldLayoutId")):
+                if layout_id.get(qn("r:id")) == relationship.get("Id"):
+                    layout_id.getparent().remove(layout_id)
+                    break
+
+        # the master isn't used by any slide
+        if master_layouts == 0:
+            package.remove_relationship(presentation_name, master_relationship)
+
+            for master_id in package.element(presentation_name).iter(qn("p:sldMasterId")):
+                if master_id.get(qn("r:id")) == master_relationship.get("Id"):
+                    master_id.getparent().remove(master_id)
+                    break
+
+
+def _remove_unused_relationships(package: _Package) -> None:
+    """
+    Removes the relationships to the parts the presentations don't need
+    (see UNUSED_RELATIONSHIPS), from the package and from the parts it points to.
+
+    :param package (_Package): the package.
+    """
+    part_names = [""] + [
+        _target_name("", relationship) for relationship in package.relationships("")
+    ]
+
+    for part_name in part_names:
+        for relationship in package.relationships(part_name):
+            if relationship.get("Type") in UNUSED_RELATIONSHIPS:
+                package.remove_relationship(part_name, relationship)
+
+
+def _is_empty(paragraph: etree._Element) -> bool:
+    """
+    Returns if a paragraph has no text and no formatting (its height is the default one).
+
+    :param paragraph (_Element): the a:p element.
+
+    :return (bool): if it's empty.
+    """
+    return len(paragraph) == 0
+
+
+def _clean_slide_text(slide: etree._Element, report: OptimizeReport) -> None:
+    """
+    Removes the empty runs of a slide and the empty paragraphs at the start and at the
+    end of its textboxes.
+
+    :param slide (_Element): the p:sld element.
+    :param report (OptimizeReport): the report, updated with what was removed.
+    """
+    for run in list(slide.iter(qn("a:r"))):
+        text = run.find(qn("a:t"))
+
+        if text is None or not text.text:
+            run.getparent().remove(run)
+            report.removed_runs += 1
+
+    for shape in slide.iter(qn("p:sp")):
+        shape_properties = shape.find(f"{qn('p:nvSpPr')}/{qn('p:cNvSpPr')}")
+        text_body = shape.find(qn("p:txBody"))
+
+        if (
+            shape_properties is None
+            or shape_properties.get("txBox") not in ("1", "true")
+            or text_body is None
+        ):
+            continue
+
+        paragraphs = text_body.findall(qn("a:p"))
+
+        # a text body must have a paragraph
+        if all(_is_empty(paragraph) for paragraph in paragraphs):
+            continue
+
+        body_properties = text_body.find(qn("a:bodyPr"))
+        list_style = text_body.find(qn("a:lstStyle"))
+
+        # the text starts where the empty paragraph ended, only when the text is at the
+        # top of the textbox and the empty paragraph has the default size
+        top_anchored = body_properties is not None and body_properties.get(
+            "anchor", "t"
+        ) == "t"
+        default_style = list_style is None or len(list_style) == 0
+
+        while top_anchored and default_style and _is_empty(paragraphs[0]):
+            top_inset = int(body_properties.get("tIns", DEFAULT_TOP_INSET))
+            body_properties.set(
+                "tIns", str(top_inset + Pt(EMPTY_PARAGRAPH_HEIGHT_PT))
+            )
+
+            text_body.remove(paragraphs.pop(0))
+            report.removed_paragraphs += 1
+
+        while _is_empty(paragraphs[-1]):
+            text_body.remove(paragraphs.pop())
+            report.removed_paragraphs += 1
+
+
+def optimize_parts(
+    parts: Dict[str, bytes], layout_names: Iterable[str] | None = None
+) -> OptimizeReport:
+    """
+    Optimizes the serialized parts of a presentation (see the module docstring).
+
+    :param parts (Dict[str, bytes]): the parts, changed in place.
+    :param layout_names (Iterable[str] | None): the names of the layout parts kept
+        (e.g. the ones a presentation without slides yet will use), if None the ones
+        used by the slides.
+
+    :return (OptimizeReport): what was removed.
+    """
+    report = OptimizeReport(bytes_before=sum(len(blob) for blob in parts.values()))
+
+    package = _Package(parts)
+    presentation_name = _presentation_name(package)
+    slide_names = _slide_names(package, presentation_name)
+
+    if layout_names is not None:
+        _remove_unused_layouts(package, presentation_name, set(layout_names))
+
+    # without slides there is nothing to compare the layouts with
+    elif slide_names:
+        _remove_unused_layouts(
+            package, presentation_name, _used_layouts(package, slide_names)
+        )
+
+    _remove_unused_relationships(package)
+
+    report.removed_parts = package.remove_unreachable()
+
+    for slide_name in slide_names:
+        _clean_slide_text(package.element(slide_name), report)
+
+    package.save()
+
+    report.bytes_after = sum(len(blob) for blob in parts.values())
+
+    return report
+
+
+def save_presentation(
+    presentation: PresentationType,
+    file: str | IO[bytes],
+    compression_level: int | None = None,
+    reproducible: bool | None = None,
+) -> OptimizeReport:
+    """
+    Saves a presentation optimized, instead of Presentation.save.
+
+    :param presentation (PresentationType): the presentation.
+    :param file (str | IO[bytes]): the path or the file.
+    :param compression_level (int | None): the zlib level, the one of the settings if None.
+    :param reproducible (bool | None): if True, the same presentation always gives the
+        same bytes (see app.package_writer), the mode of the settings if None.
+
+    :return (OptimizeReport): what was removed and the size of the file.
+    """
+    parts = serialize_presentation(presentation)
+    report = optimize_parts(parts)
+
+    write_package(parts, file, compression_level, reproducible)
+
+    report.size = os.path.getsize(file) if isinstance(file, str) else file.tell()
+
+    tracer.annotate(deck_bytes=report.size, optimized_bytes=report.saved_bytes)
+
+    return report
+
+
+def optimize_file(path: str) -> OptimizeReport:
+    """
+    Optimizes a presentation already saved, replacing the file.
+
+    :param path (str): the path of the presentation.
+
+    :return (OptimizeReport): what was removed, bytes_before and size are the sizes
+        of the file before and after.
+    """
+    # output_writer saves the presentations with this module
+    from app.output_writer import (  # pylint: disable=import-outside-toplevel
+        write_atomically,
+    )
+
+    with zipfile.ZipFile(path) as package:
+        parts = {name: package.read(name) for name in package.namelist()}
+
+    size_before = os.path.getsize(path)
+
+    report = optimize_parts(parts)
+
+    folder, file_name = os.path.split(os.path.abspath(path))
+    write_atomically(
+        lambda temporary_path: write_package(parts, temporary_path), folder, file_name
+    )
+
+    report.bytes_before = size_before
+    report.size = report.bytes_after = os.path.getsize(path)
+
+    return report
+
+
+def _presentation_paths(paths: List[str]) -> Iterator[str]:
+    """
+    Returns the presentations of the paths (the folders are walked).
+
+    :param paths (List[str]): the paths of presentations and folders.
+
+    :return: the paths of the presentations.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for folder, _, file_names in os.walk(path):
+            for file_name in sorted(file_names):
+                if file_name.lower().endswith(".pptx") and not file_name.startswith(
+                    (".", "~$")
+                ):
+                    yield os.path.join(folder, file_name)
+
+
+def main() -> None:
+    """
+    Optimizes the presentations given on the command line and prints the savings.
+    """
+    parser = argparse.ArgumentParser(
+        description="Removes the unused parts of the presentations created by the app"
+    )
+    parser.add_argument("paths", nargs="+", help="presentations or folders")
+    args = parser.parse_args()
+
+    total_before = total_after = 0
+
+    for path in _presentation_paths(args.paths):
+        try:
+            report = optimize_file(path)
+
+        except (OSError, zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as error:
+            print(f"{path}: skipped ({error})")
+            continue
+
+        total_before += report.bytes_before
+        total_after += report.size
+
+        print(
+            f"{path}: {report.bytes_before / 1024:.1f} KB -> {report.size / 1024:.1f} KB "
+            f"({report.removed_parts} parts, {report.removed_paragraphs} paragraphs and "
+            f"{report.removed_runs} runs removed)"
+        )
+
+    if total_before:
+        print(
+            f"total: {total_before / 1024:.1f} KB -> {total_after / 1024:.1f} KB "
+            f"({(1 - total_after / total_before) * 100:.0f}% smaller)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+This module contains the functions that write the presentations to the destination folder.
+
+The destination folder can be a network share, so a presentation is never written
+directly over the final file: it's written to a temporary file and then moved over the
+final file with os.replace (atomic), so a connection failure never leaves a partial file.
+
+The OutputWriter does the copies to the destination folder on its own I/O thread,
+so the worker that creates the presentations never waits for the network.
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Union
+
+if TYPE_CHECKING:
+    from pptx.presentation import Presentation as PresentationType
+
+# the number of presentations waiting to be copied before submit blocks
+DEFAULT_MAX_PENDING = 8
+
+DEFAULT_RETRIES = 3
+
+# seconds waited before the first retry, doubled at each retry
+DEFAULT_RETRY_DELAY = 1.0
+
+
+def save_deck(
+    presentation: Union["PresentationType", Dict[str, bytes]], path: str
+) -> None:
+    """
+    Saves a presentation optimized (see app.optimize_pptx), or the parts written by
+    app.ooxml_writer.
+
+    :param presentation (PresentationType | Dict[str, bytes]): the presentation or its parts.
+    :param path (str): the path of the file.
+    """
+    # python-pptx is only imported when the first presentation is saved (the pages
+    # import this module when the application starts)
+    # pylint: disable=import-outside-toplevel
+    if isinstance(presentation, dict):
+        from app.ooxml_writer import save_parts
+
+        save_parts(presentation, path)
+
+    else:
+        from app.optimize_pptx import save_presentation
+
+        save_presentation(presentation, path)
+
+
+def write_atomically(
+    write_function: Callable[[str], None], folder: str, file_name: str
+) -> str:
+    """
+    Writes a file to the folder, the file with the same name is only replaced
+    when the new one is complete.
+
+    :param write_function (Callable[[str], None]): writes the file to the path it receives.
+    :param folder (str): the destination folder.
+    :param file_name (str): the name of the file.
+
+    :return (str): the path of the file written.
+    """
+    final_path = os.path.join(folder, file_name)
+    temporary_path = os.path.join(folder, f".{file_name}.{os.getpid()}.tmp")
+
+    try:
+        write_function(temporary_path)
+        os.replace(temporary_path, final_path)
+
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+
+        except OSError:
+            pass
+
+        raise
+
+    return final_path
+
+
+def replace_atomically(source_path: str, folder: str, file_name: str) -> str:
+    """
+    Copies a file to the folder, replacing the file with the same name only when the
+    copy is complete (a temporary file in the same folder is moved over it).
+
+    :param source_path (str): the path of the file to copy.
+    :param folder (str): the destination folder.
+    :param file_name (str): the name of the file in the destination folder.
+
+    :return (str): the path of the file in the destination folder.
+    """
+    return write_atomically(
+        lambda temporary_path: shutil.copyfile(source_path, temporary_path),
+        folder,
+        file_name,
+    )
+
+
+def save_atomically(
+    presentation: Union["PresentationType", Dict[str, bytes]],
+    folder: str,
+    file_name: str,
+) -> str:
+    """
+    Saves a presentation to the folder (see save_deck), the file with the same name is
+    only replaced when the new one is complete.
+
+    :param presentation (PresentationType | Dict[str, bytes]): the presentation or its parts.
+    :param folder (str): the destination folder.
+    :param file_name (str): the name of the file.
+
+    :return (str): the path of the file saved.
+    """
+    return write_atomically(
+        lambda temporary_path: save_deck(presentation, temporary_path),
+        folder,
+        file_name,
+    )
+
+
+@dataclass
+class _OutputJob:
+    """
+    A presentation saved locally, waiting to be copied to the destination folder.
+    """
+
+    local_path: str
+    folder: str
+    file_name: str
+    on_saved: Callable[[], None] | None = None
+    on_failed: Callable[[], None] | None = None
+
+
+class OutputWriter:
+    """
+    This class copies the presentations to the destination folder on its own thread.
+
+    The thread never stops on an error, each one is added to failed with the file name:
+        - the copy failed with an OSError on every try (_copy, on_failed is called);
+        - any other error of the copy, e.g. a bug (_run, on_failed is called);
+        - on_saved or on_failed raised (_notify, the file is in the folder or not as
+          the function says).
+    """
+
+    def __init__(
+        self,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        retries: int = DEFAULT_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ) -> None:
+        """
+        Creates the writer and starts its thread.
+
+        :param max_pending (int): the number of presentations waiting to be copied
+            before submit blocks (so the local temporary files don't pile up).
+        :param retries (int): how many times a failed copy is tried again.
+        :param retry_delay (float): the seconds waited before the first retry.
+        """
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        # the file names that couldn't be copied (or whose on_saved or on_failed
+        # raised) and the error
+        self.failed: List[Tuple[str, str]] = []
+
+        self.saved = 0
+
+        # the presentations to copy and None to stop
+        self._queue: queue.Queue = queue.Queue(max_pending)
+
+        self._thread = threading.Thread(
+            target=self._run, name="OutputWriter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        presentation: Union["PresentationType", Dict[str, bytes]],
+        folder: str,
+        file_name: str,
+        on_saved: Callable[[], None] | None = None,
+        on_failed: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Saves the presentation to a local temporary file and queues its copy to the folder.
+
+        :param presentation (PresentationType | Dict[str, bytes]): the presentation or
+            its parts (see save_deck).
+        :param folder (str): the destination folder.
+        :param file_name (str): the name of the file in the destination folder.
+        :param on_saved (Callable, optional): called on the I/O thread when the file is
+            in the destination folder.
+        :param on_failed (Callable, optional): called on the I/O thread when the file
+            couldn't be copied (see failed).
+        """
+        file_descriptor, local_path = tempfile.mkstemp(
+            prefix="music_pptx_", suffix=".pptx"
+        )
+        os.close(file_descriptor)
+
+        save_deck(presentation, local_path)
+
+        self._queue.put(_OutputJob(local_path, folder, file_name, on_saved, on_failed))
+
+    def close(self) -> None:
+        """
+        Waits until all the presentations are copied and stops the thread.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """
+        Copies the queued presentations until close is called.
+        """
+        while True:
+            job = self._queue.get()
+
+            if job is None:
+                return
+
+            try:
+                copied = self._copy(job)
+
+            except Exception as error:  # pylint: disable=broad-except
+                # _copy handles the OSError of the copy, this is any other error: the
+                # thread never stops, submit and close would wait for it forever
+                self.failed.append((job.file_name, str(error)))
+                copied = False
+
+            finally:
+                try:
+                    os.remove(job.local_path)
+
+                except OSError:
+                    pass
+
+            self._notify(job, copied)
+
+    def _copy(self, job: _OutputJob) -> bool:
+        """
+        Copies a presentation to the destination folder, trying again if it fails.
+
+        :param job (_OutputJob): the presentation.
+
+        :return (bool): True if it was copied, False if every try failed (the error is
+            in failed).
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                replace_atomically(job.local_path, job.folder, job.file_name)
+
+            except OSError as error:
+                if attempt == self.retries:
+                    self.failed.append((job.file_name, str(error)))
+                    return False
+
+                time.sleep(self.retry_delay * 2**attempt)
+
+            else:
+                self.saved += 1
+                return True
+
+        return False
+
+    def _notify(self, job: _OutputJob, copied: bool) -> None:
+        """
+        Calls the on_saved or on_failed function of a presentation, its errors are
+        added to failed (the file is in the folder, but e.g. the journal wasn't updated).
+
+        :param job (_OutputJob): the presentation.
+        :param copied (bool): if it was copied to the destination folder.
+        """
+        callback = job.on_saved if copied else job.on_failed
+
+        if callback is None:
+            return
+
+        try:
+            callback()
+
+        except Exception as error:  # pylint: disable=broad-except
+            self.failed.append((job.file_name, str(error)))
@@ -0,0 +1,288 @@
+"""
+This module contains the zip writer of the presentations.
+
+zipfile compresses the parts one after the other on a single core, and compresses again
+the images, that are already compressed (PNG, JPEG...). This writer stores the media
+parts as they are and compresses the other parts on a pool of threads (zlib releases the
+GIL while it compresses), then writes them in order on the calling thread.
+
+The compression level is set by PPTX_COMPRESSION_LEVEL on settings/.env
+(0 stores every part, 1 is the fastest and 9 the smallest).
+
+On the reproducible mode (PPTX_REPRODUCIBLE on settings/.env) the parts are written
+sorted by name and with a fixed date, so the same presentation always gives the same
+bytes (e.g. a folder sync only copies the presentations that really changed).
+"""
+
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Dict, List, Tuple
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# the parts that are already compressed, deflating them again only costs time
+COMPRESSED_EXTENSIONS = (
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".jpe",
+    ".gif",
+    ".webp",
+    ".wdp",
+    ".mp3",
+    ".m4a",
+    ".mp4",
+    ".m4v",
+    ".mov",
+)
+
+# the parts smaller than this are compressed on the calling thread (sending them to the
+# pool costs more than compressing them)
+PARALLEL_MIN_BYTES = 16 * 1024
+
+# the date and time of the parts on the reproducible mode: 1980-01-01 00:00,
+# the first date of the zip format
+REPRODUCIBLE_DATE = 1 << 5 | 1
+REPRODUCIBLE_TIME = 0
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# the version of the zip format needed to extract the parts (2.0, deflate)
+ZIP_VERSION = 20
+
+# the names are encoded in UTF-8
+UTF8_FLAG = 0x800
+
+# the zip format without the ZIP64 extensions can't go past 4 GB
+MAX_ZIP_BYTES = 0xFFFFFFFF
+MAX_ZIP_ENTRIES = 0xFFFF
+
+_executor = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="PackageWriter"
+)
+
+
+def compression_level_from_settings() -> int:
+    """
+    Returns the compression level set on the settings (PPTX_COMPRESSION_LEVEL).
+
+    :return (int): the level (0 to 9), DEFAULT_COMPRESSION_LEVEL if it isn't set or is invalid.
+    """
+    try:
+        return min(max(int(os.getenv("PPTX_COMPRESSION_LEVEL", "")), 0), 9)
+
+    except ValueError:
+        return DEFAULT_COMPRESSION_LEVEL
+
+
+def reproducible_from_settings() -> bool:
+    """
+    Returns if the reproducible mode is on in the settings (PPTX_REPRODUCIBLE).
+
+    :return (bool): True if it's "1", "true" or "yes".
+    """
+    return os.getenv("PPTX_REPRODUCIBLE", "").strip().lower() in ("1", "true", "yes")
+
+
+def _dos_date_time(timestamp: float) -> Tuple[int, int]:
+    """
+    Converts a timestamp to the date and time of the zip format.
+
+    :param timestamp (float): the seconds since the epoch.
+
+    :return: the date and the time.
+    """
+    local_time = time.localtime(timestamp)
+
+    # the zip format can't represent dates before 1980
+    year = max(local_time.tm_year, 1980)
+
+    return (
+        (year - 1980) << 9 | local_time.tm_mon << 5 | local_time.tm_mday,
+        local_time.tm_hour << 11 | local_time.tm_min << 5 | local_time.tm_sec // 2,
+    )
+
+
+def _compress(blob: bytes, compression_level: int) -> Tuple[int, int, bytes]:
+    """
+    Compresses a part (raw deflate, as zip stores it).
+
+    :param blob (bytes): the part.
+    :param compression_level (int): the zlib level.
+
+    :return: the crc32 of the part, the compression method and the compressed part.
+    """
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+
+    return (
+        zlib.crc32(blob),
+        ZIP_DEFLATED,
+        compressor.compress(blob) + compressor.flush(),
+    )
+
+
+def _store(blob: bytes) -> Tuple[int, int, bytes]:
+    """
+    Returns a part stored without compression.
+
+    :param blob (bytes): the part.
+
+    :return: the crc32 of the part, the compression method and the part.
+    """
+    return zlib.crc32(blob), ZIP_STORED, blob
+
+
+def write_package(
+    parts: Dict[str, bytes],
+    file: str | IO[bytes],
+    compression_level: int | None = None,
+    reproducible: bool | None = None,
+) -> None:
+    """
+    Writes the parts to a zip package, in the order of the dict.
+
+    :param parts (Dict[str, bytes]): the name of each part in the zip and its content.
+    :param file (str | IO[bytes]): the path or the file.
+    :param compression_level (int | None): the zlib level (0 to 9), the one of the
+        settings if None.
+    :param reproducible (bool | None): if True, the parts are sorted by name and have
+        a fixed date, the mode of the settings if None.
+    """
+    if compression_level is None:
+        compression_level = compression_level_from_settings()
+
+    if reproducible is None:
+        reproducible = reproducible_from_settings()
+
+    if (
+        sum(len(blob) for blob in parts.values()) > MAX_ZIP_BYTES
+        or len(parts) > MAX_ZIP_ENTRIES
+    ):
+        raise ValueError("the presentation is too big to be saved (more than 4 GB)")
+
+    if reproducible:
+        # "[Content_Types].xml" is still the first part ("[" comes before the letters)
+        parts = dict(sorted(parts.items()))
+        date, time_of_day = REPRODUCIBLE_DATE, REPRODUCIBLE_TIME
+
+    else:
+        date, time_of_day = _dos_date_time(time.time())
+
+    # the compression of the big parts starts on the pool before the others are written
+    compressed_parts = []
+
+    for name, blob in parts.items():
+        if compression_level == 0 or name.lower().endswith(COMPRESSED_EXTENSIONS):
+            compressed_parts.append(_store(blob))
+
+        elif len(blob) >= PARALLEL_MIN_BYTES:
+            compressed_parts.append(_executor.submit(_compress, blob, compression_level))
+
+        else:
+            compressed_parts.append(_compress(blob, compression_level))
+
+    if isinstance(file, str):
+        with open(file, "wb") as package_file:
+            _write_zip(package_file, parts, compressed_parts, date, time_of_day)
+
+    else:
+        _write_zip(file, parts, compressed_parts, date, time_of_day)
+
+
+def _write_zip(
+    package_file: IO[bytes],
+    parts: Dict[str, bytes],
+    compressed_parts: List,
+    date: int,
+    time_of_day: int,
+) -> None:
+    """
+    Writes the local headers and data of the parts and the central directory.
+
+    :param package_file (IO[bytes]): the file.
+    :param parts (Dict[str, bytes]): the parts.
+    :param compressed_parts (List): the result of the compression of each part
+        (or its future).
+    :param date (int): the date of the parts, on the zip format.
+    :param time_of_day (int): the time of the parts, on the zip format.
+    """
+    start = package_file.tell()
+    central_directory = []
+
+    for (name, blob), compressed_part in zip(parts.items(), compressed_parts):
+        if not isinstance(compressed_part, tuple):
+            compressed_part = compressed_part.result()
+
+        crc, method, data = compressed_part
+
+        encoded_name = name.encode("utf-8")
+        flags = UTF8_FLAG if not name.isascii() else 0
+        offset = package_file.tell() - start
+
+        if offset > MAX_ZIP_BYTES:
+            raise ValueError("the presentation is too big to be saved (more than 4 GB)")
+
+        package_file.write(
+            struct.pack(
+                "<IHHHHHIIIHH",
+                0x04034B50,
+                ZIP_VERSION,
+                flags,
+                method,
+                time_of_day,
+                date,
+                crc,
+                len(data),
+                len(blob),
+                len(encoded_name),
+                0,
+            )
+        )
+        package_file.write(encoded_name)
+        package_file.write(data)
+
+        central_directory.append(
+            struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50,
+                ZIP_VERSION,
+                ZIP_VERSION,
+                flags,
+                method,
+                time_of_day,
+                date,
+                crc,
+                len(data),
+                len(blob),
+                len(encoded_name),
+                0,
+                0,
+                0,
+                0,
+                0,
+                offset,
+            )
+            + encoded_name
+        )
+
+    central_directory_offset = package_file.tell() - start
+    central_directory_data = b"".join(central_directory)
+
+    package_file.write(central_directory_data)
+    package_file.write(
+        struct.pack(
+            "<IHHHHIIH",
+            0x06054B50,
+            0,
+            0,
+            len(central_directory),
+            len(central_directory),
+            len(central_directory_data),
+            central_directory_offset,
+            0,
+        )
+    )
@@ -0,0 +1,117 @@
+"""
+This module contains the pagination of the lyrics.
+
+A strophe is one slide, but a strophe with more lines than the lyric textbox can show
+overflows the slide. The pagination splits these strophes, at line boundaries, into
+continuation slides with about the same number of lines each.
+
+The number of lines of a slide comes from the line spacing of the style (the lines of
+the slides have an exact spacing, see create_pptx.add_song_slides).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Tuple
+
+from app.autofit import EMPTY_PARAGRAPH_HEIGHT_PT, TEXTBOX_HEIGHT_PT
+
+if TYPE_CHECKING:
+    from app.create_pptx import SlidesConfig
+
+# the number of paginated lyrics kept in memory
+CACHE_SIZE = 256
+
+# the lyrics are paginated by the threads of the batches at the same time
+_paginated_lyrics: "OrderedDict[Tuple, List[str]]" = OrderedDict()
+_paginated_lyrics_lock = threading.Lock()
+
+
+def lines_per_slide(slides_config: "SlidesConfig") -> int:
+    """
+    Returns how many lines of text fit in the lyric textbox.
+
+    :param slides_config (SlidesConfig): the configuration of the slides.
+
+    :return (int): the number of lines, at least 1.
+    """
+    # the same line spacing set on the paragraphs of the slides
+    line_height = slides_config.text_font_line_spacing_PT * 2
+
+    free_height = (
+        TEXTBOX_HEIGHT_PT
+        - EMPTY_PARAGRAPH_HEIGHT_PT
+        - slides_config.text_font_space_before_PT
+        - slides_config.text_font_space_after_PT
+    )
+
+    if line_height <= 0:
+        return max(1, int(free_height // max(slides_config.text_font_size_PT, 1)))
+
+    return max(1, int(free_height // line_height))
+
+
+def _split_strophe(strophe: str, max_lines: int) -> List[str]:
+    """
+    Splits a strophe in parts with at most max_lines lines each,
+    the lines are shared equally between the parts.
+
+    :param strophe (str): the strophe, its lines are separated by "\\n".
+    :param max_lines (int): the maximum number of lines of a part.
+
+    :return (List[str]): the parts.
+    """
+    lines = strophe.split("\n")
+
+    if len(lines) <= max_lines:
+        return [strophe]
+
+    parts_count = -(-len(lines) // max_lines)
+    part_size, bigger_parts = divmod(len(lines), parts_count)
+
+    parts = []
+    start = 0
+
+    for part in range(parts_count):
+        end = start + part_size + (1 if part < bigger_parts else 0)
+        parts.append("\n".join(lines[start:end]))
+        start = end
+
+    return parts
+
+
+def paginate_lyric(music_lyric: List[str], slides_config: "SlidesConfig") -> List[str]:
+    """
+    Splits the strophes that overflow the slide into continuation slides.
+    The first item (the title slide) is never split.
+
+    :param music_lyric (List[str]): the lyric, each item is a slide.
+    :param slides_config (SlidesConfig): the configuration of the slides.
+
+    :return (List[str]): the lyric with the long strophes split.
+    """
+    max_lines = lines_per_slide(slides_config)
+
+    lyric_hash = hashlib.sha1("\x00".join(music_lyric).encode("utf-8")).hexdigest()
+
+    # the style only changes the result through the number of lines of a slide
+    cache_key = (lyric_hash, max_lines)
+
+    with _paginated_lyrics_lock:
+        if cache_key in _paginated_lyrics:
+            _paginated_lyrics.move_to_end(cache_key)
+            return list(_paginated_lyrics[cache_key])
+
+    paginated_lyric = music_lyric[:1]
+
+    for strophe in music_lyric[1:]:
+        paginated_lyric.extend(_split_strophe(strophe, max_lines))
+
+    with _paginated_lyrics_lock:
+        _paginated_lyrics[cache_key] = paginated_lyric
+        _paginated_lyrics.move_to_end(cache_key)
+
+        while len(_paginated_lyrics) > CACHE_SIZE:
+            _paginated_lyrics.popitem(last=False)
+
+    return list(paginated_lyric)
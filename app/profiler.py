@@ -0,0 +1,82 @@
+"""
+This module contains the profile_operation context manager.
+
+It profiles an operation (a confirm, a page many batch or a restyle) and writes the result
+to the destination folder, so it can be attached when reporting slowness.
+
+pyinstrument (a sampling profiler) is used when installed, its result is written as a
+speedscope JSON file (open it on https://www.speedscope.app to see the flamegraph).
+Without it, cProfile is used and the result is written as a .prof file
+(open it with snakeviz or flameprof).
+"""
+
+import cProfile
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+def _profile_file_path(output_folder: str, operation: str, extension: str) -> str:
+    """
+    Returns the path of the profile file of an operation.
+
+    :param output_folder (str): the folder where the file is written.
+    :param operation (str): the name of the operation (page_one, page_many, restyle...).
+    :param extension (str): the extension of the file.
+
+    :return: the path of the file.
+    """
+    file_name = f"profile {operation} {time.strftime('%Y-%m-%d %H-%M-%S')}{extension}"
+
+    return os.path.join(output_folder, file_name)
+
+
+@contextmanager
+def profile_operation(
+    output_folder: str, operation: str, enabled: bool = True
+) -> Iterator[None]:
+    """
+    Profiles the code inside the with block on the current thread.
+
+    :param output_folder (str): the folder where the profile file is written.
+    :param operation (str): the name of the operation, used on the file name.
+    :param enabled (bool): if False, the code runs without profiling.
+    """
+    if not enabled:
+        yield
+        return
+
+    output_folder = output_folder or os.getcwd()
+    os.makedirs(output_folder, exist_ok=True)
+
+    try:
+        from pyinstrument import Profiler  # pylint: disable=import-outside-toplevel
+        from pyinstrument.renderers import (  # pylint: disable=import-outside-toplevel
+            SpeedscopeRenderer,
+        )
+
+    except ImportError:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(_profile_file_path(output_folder, operation, ".prof"))
+
+        return
+
+    sampling_profiler = Profiler(interval=0.001)
+    sampling_profiler.start()
+    try:
+        yield
+    finally:
+        sampling_profiler.stop()
+
+        with open(
+            _profile_file_path(output_folder, operation, ".speedscope.json"),
+            "w",
+            encoding="utf-8",
+        ) as profile_file:
+            profile_file.write(sampling_profiler.output(renderer=SpeedscopeRenderer()))
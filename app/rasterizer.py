@@ -0,0 +1,378 @@
+"""
+This module contains the slide rasterizer used by the previews of the app.
+
+It draws the title slide and the lyric slides with Pillow, following the same layout
+create_pptx.add_song_slides uses on the presentation (it's an approximation: PowerPoint
+is the one that really renders the presentation, but the fonts, sizes, colors,
+alignment, line spacing and background are the same).
+
+The fonts and the resized backgrounds are cached and the slides are drawn in a pool
+of threads, so the previews are ready a few milliseconds after a change.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import TYPE_CHECKING, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.autofit import (
+    EMPTY_PARAGRAPH_HEIGHT_PT,
+    find_font_file,
+    fit_font_sizes,
+)
+from app.pagination import paginate_lyric
+
+if TYPE_CHECKING:
+    from app.create_pptx import SlidesConfig
+
+# the width of the previews in pixels (the height is 9/16 of it)
+PREVIEW_WIDTH = 320
+
+SLIDE_WIDTH_PT = 16 * 72
+SLIDE_HEIGHT_PT = 9 * 72
+
+# the insets of the lyric textbox, in points
+TEXTBOX_INSET_X_PT = 7.2
+TEXTBOX_INSET_Y_PT = 3.6
+
+_executor = ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="Rasterizer"
+)
+
+
+@lru_cache(maxsize=64)
+def _font(font_name: str, bold: bool, size_px: int) -> ImageFont.ImageFont:
+    """
+    Loads a font at a size in pixels.
+
+    :param font_name (str): the name of the font.
+    :param bold (bool): if the font is bold.
+    :param size_px (int): the size in pixels.
+
+    :return: the font, the default font of PIL if it isn't installed.
+    """
+    size_px = max(size_px, 1)
+    font_path = find_font_file(font_name, bold)
+
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size_px)
+
+        except OSError:
+            pass
+
+    return ImageFont.load_default(size_px)
+
+
+@lru_cache(maxsize=8)
+def _background(
+    background_path: str, modified_time: float, size: Tuple[int, int]
+) -> Image.Image:
+    """
+    Loads the background image resized to the size of the preview.
+
+    :param background_path (str): the path of the image.
+    :param modified_time (float): the modification time of the file (part of the cache key).
+    :param size (Tuple[int, int]): the size of the preview.
+
+    :raises OSError: if the image can't be read, or it changed while it was read.
+
+    :return: the resized image.
+    """
+    with Image.open(background_path) as image:
+        resized_image = image.convert("RGB").resize(size, Image.Resampling.BILINEAR)
+
+    # the image read isn't cached with the modification time of the old file
+    if os.path.getmtime(background_path) != modified_time:
+        raise OSError(f"{background_path} changed while it was read")
+
+    return resized_image
+
+
+def _slide_base(
+    slides_config: "SlidesConfig",
+    background_path: str | None,
+    opacity: float,
+    size: Tuple[int, int],
+) -> Image.Image:
+    """
+    Creates the empty slide: the background color with the background image over it.
+
+    :param slides_config (SlidesConfig): the configuration of the slides.
+    :param background_path (str | None): the path of the background image.
+    :param opacity (float): the opacity of the background image (0 to 1).
+    :param size (Tuple[int, int]): the size of the preview.
+
+    :return: the image of the slide.
+    """
+    slide = Image.new("RGB", size, tuple(slides_config.background_color_RGB))
+
+    if background_path:
+        try:
+            background = _background(
+                background_path, os.path.getmtime(background_path), size
+            )
+            slide = Image.blend(slide, background, opacity)
+
+        except OSError:
+            pass
+
+    return slide
+
+
+def _draw_lines(
+    draw: ImageDraw.ImageDraw,
+    lines: List[str],
+    font: ImageFont.ImageFont,
+    box: Tuple[float, float, float],
+    line_height: float,
+    alignment: int,
+    color: Tuple[int, int, int],
+) -> None:
+    """
+    Draws lines of text in a box.
+
+    :param draw (ImageDraw): the draw of the slide.
+    :param lines (List[str]): the lines.
+    :param font (ImageFont): the font.
+    :param box (Tuple[float, float, float]): the left, top and width of the box in pixels.
+    :param line_height (float): the distance between two lines in pixels.
+    :param alignment (int): the alignment (1 left, 2 center, 3 right, as PP_PARAGRAPH_ALIGNMENT).
+    :param color (Tuple[int, int, int]): the color of the text.
+    """
+    left, top, width = box
+
+    for line_number, line in enumerate(lines):
+        line_width = draw.textlength(line, font=font)
+
+        if alignment == 2:
+            x = left + (width - line_width) / 2
+        elif alignment == 3:
+            x = left + width - line_width
+        else:
+            x = left
+
+        draw.text((x, top + line_number * line_height), line, fill=color, font=font)
+
+
+def _encode(slide: Image.Image) -> bytes:
+    """
+    Encodes the slide as PNG.
+
+    :param slide (Image): the slide.
+
+    :return (bytes): the PNG.
+    """
+    buffer = BytesIO()
+    slide.save(buffer, format="PNG", compress_level=1)
+
+    return buffer.getvalue()
+
+
+def render_title_slide(
+    music_title: str,
+    music_singer: str,
+    slides_config: "SlidesConfig",
+    method: str = "page_insert_manually",
+    background_path: str | None = None,
+    opacity: float = 1.0,
+    width: int = PREVIEW_WIDTH,
+) -> bytes:
+    """
+    Draws the title slide of a song.
+
+    :param music_title (str): The title of the song.
+    :param music_singer (str): The singer of the song.
+    :param slides_config (SlidesConfig): The configuration of the slides.
+    :param method (str): The method used to insert the lyrics (it changes the title position).
+    :param background_path (str | None): The path of the background image.
+    :param opacity (float): The opacity of the background image (0 to 1).
+    :param width (int): The width of the preview in pixels.
+
+    :return (bytes): the slide as PNG.
+    """
+    scale = width / SLIDE_WIDTH_PT
+    size = (width, round(SLIDE_HEIGHT_PT * scale))
+
+    slide = _slide_base(slides_config, background_path, opacity, size)
+    draw = ImageDraw.Draw(slide)
+
+    # the same boxes of the title and subtitle placeholders of create_pptx
+    box_width = size[0] / 2
+    box_height = size[1] / 5
+    box_left = (size[0] - box_width) / 2 if method == "page_insert_manually" else 0
+    title_top = (size[1] - box_height) / 4
+
+    for text, font_name, font_size, bold, color, top in (
+        (
+            music_title.upper(),
+            slides_config.title_font_name,
+            slides_config.title_font_size_PT,
+            slides_config.title_font_isbold,
+            slides_config.title_font_color_RGB,
+            title_top,
+        ),
+        (
+            music_singer.upper(),
+            slides_config.subtitle_font_name,
+            slides_config.subtitle_font_size_PT,
+            slides_config.subtitle_font_isbold,
+            slides_config.subtitle_font_color_RGB,
+            title_top + box_height,
+        ),
+    ):
+        font = _font(font_name, bold, round(font_size * scale))
+
+        # the placeholders center the text vertically
+        _draw_lines(
+            draw,
+            [text],
+            font,
+            (box_left, top + (box_height - font_size * scale) / 2, box_width),
+            font_size * scale,
+            2,
+            tuple(color),  # type: ignore
+        )
+
+    return _encode(slide)
+
+
+def render_lyric_slide(
+    strophe: str,
+    font_size: int,
+    slides_config: "SlidesConfig",
+    background_path: str | None = None,
+    opacity: float = 1.0,
+    width: int = PREVIEW_WIDTH,
+) -> bytes:
+    """
+    Draws a lyric slide.
+
+    :param strophe (str): The strophe, its lines are separated by "\\n".
+    :param font_size (int): The size of the text in points.
+    :param slides_config (SlidesConfig): The configuration of the slides.
+    :param background_path (str | None): The path of the background image.
+    :param opacity (float): The opacity of the background image (0 to 1).
+    :param width (int): The width of the preview in pixels.
+
+    :return (bytes): the slide as PNG.
+    """
+    scale = width / SLIDE_WIDTH_PT
+    size = (width, round(SLIDE_HEIGHT_PT * scale))
+
+    slide = _slide_base(slides_config, background_path, opacity, size)
+    draw = ImageDraw.Draw(slide)
+
+    font = _font(
+        slides_config.text_font_name,
+        slides_config.text_font_isbold,
+        round(font_size * scale),
+    )
+
+    # the same exact line spacing of the paragraph of create_pptx
+    line_height = (
+        slides_config.text_font_line_spacing_PT
+        * 2
+        * font_size
+        / slides_config.text_font_size_PT
+    )
+
+    top = (
+        TEXTBOX_INSET_Y_PT
+        + EMPTY_PARAGRAPH_HEIGHT_PT
+        + slides_config.text_font_space_before_PT
+        # the text is at the bottom of the line (the line spacing is above it)
+        + line_height
+        - font_size
+    )
+
+    _draw_lines(
+        draw,
+        strophe.upper().split("\n"),
+        font,
+        (
+            TEXTBOX_INSET_X_PT * scale,
+            top * scale,
+            (SLIDE_WIDTH_PT - 2 * TEXTBOX_INSET_X_PT) * scale,
+        ),
+        line_height * scale,
+        int(slides_config.text_font_alignment),
+        tuple(slides_config.text_font_color_RGB),  # type: ignore
+    )
+
+    return _encode(slide)
+
+
+def render_previews(
+    music_title: str,
+    music_singer: str,
+    music_lyric: List[str],
+    slides_config: "SlidesConfig",
+    method: str = "page_insert_manually",
+    background_path: str | None = None,
+    opacity: float = 1.0,
+    width: int = PREVIEW_WIDTH,
+) -> "Future[List[bytes]]":
+    """
+    Draws all the slides of a song on the pool of threads.
+    The params are the same as create_slides (the first item of the lyric is the title slide).
+
+    :return (Future[List[bytes]]): the slides as PNG, in order.
+    """
+    music_lyric = paginate_lyric(music_lyric, slides_config)
+
+    font_sizes = (
+        [0] + fit_font_sizes(music_lyric[1:], slides_config)
+        if slides_config.text_font_autofit
+        else [slides_config.text_font_size_PT] * len(music_lyric)
+    )
+
+    slide_futures = [
+        _executor.submit(
+            render_title_slide,
+            music_title,
+            music_singer,
+            slides_config,
+            method,
+            background_path,
+            opacity,
+            width,
+        )
+    ] + [
+        _executor.submit(
+            render_lyric_slide,
+            strophe,
+            font_sizes[i],
+            slides_config,
+            background_path,
+            opacity,
+            width,
+        )
+        for i, strophe in enumerate(music_lyric)
+        if i > 0
+    ]
+
+    previews: "Future[List[bytes]]" = Future()
+    remaining = [len(slide_futures)]
+    remaining_lock = threading.Lock()
+
+    def slide_done(_: Future) -> None:
+        with remaining_lock:
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+
+        if finished:
+            try:
+                previews.set_result([future.result() for future in slide_futures])
+
+            except Exception as error:  # pylint: disable=broad-except
+                previews.set_exception(error)
+
+    for future in slide_futures:
+        future.add_done_callback(slide_done)
+
+    return previews
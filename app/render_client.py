@@ -0,0 +1,161 @@
+"""
+This module contains the RenderClient class.
+
+The client sends jobs to the local render daemon (see app.render_daemon) and polls their
+state. It only uses the standard library, so the app doesn't import python-pptx or PIL
+when the presentations are created by the daemon.
+"""
+
+import base64
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Tuple
+
+# the seconds waited for the daemon to answer if it's running
+HEALTH_TIMEOUT = 0.3
+REQUEST_TIMEOUT = 10.0
+
+# the seconds the answer of the daemon (running or not) is reused, it's asked on the
+# GUI thread when a page is confirmed
+AVAILABILITY_TTL = 30.0
+
+# the url of each daemon asked and when it was asked, with its answer
+_availability: Dict[str, Tuple[float, bool]] = {}
+
+
+class RenderDaemonError(Exception):
+    """
+    The daemon couldn't be reached or refused the job.
+    """
+
+
+def encode_image(image: bytes | None) -> str:
+    """
+    Encodes an image to be sent in a job.
+
+    :param image (bytes | None): the image.
+
+    :return (str): the image as base64, "" if there is no image.
+    """
+    return base64.b64encode(image).decode("ascii") if image else ""
+
+
+class RenderClient:
+    """
+    This class represents the connection to the render daemon.
+    """
+
+    def __init__(self, url: str) -> None:
+        """
+        Creates the client.
+
+        :param url (str): the url of the daemon (e.g. http://127.0.0.1:8765).
+        """
+        self.url = url.rstrip("/")
+
+    def _request(
+        self, path: str, body: Dict | None = None, timeout: float = REQUEST_TIMEOUT
+    ) -> Any:
+        """
+        Sends a request to the daemon.
+
+        :param path (str): the path of the API.
+        :param body (Dict | None): the JSON body, the request is a GET if None.
+        :param timeout (float): the seconds waited for the answer.
+
+        :raises RenderDaemonError: if the daemon can't be reached or returns an error.
+
+        :return: the JSON answer.
+        """
+        request = urllib.request.Request(
+            self.url + path,
+            data=json.dumps(body).encode("utf-8") if body is not None else None,
+            headers={"Content-Type": "application/json"},
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+
+        except urllib.error.HTTPError as error:
+            try:
+                message = json.loads(error.read()).get("error", str(error))
+
+            except ValueError:
+                message = str(error)
+
+            raise RenderDaemonError(message) from error
+
+        except (urllib.error.URLError, OSError, ValueError) as error:
+            raise RenderDaemonError(str(error)) from error
+
+    def is_available(self) -> bool:
+        """
+        Returns if the daemon is running.
+
+        :return (bool): True if the daemon answered.
+        """
+        try:
+            return self._request("/health", timeout=HEALTH_TIMEOUT)["status"] == "ok"
+
+        except (RenderDaemonError, KeyError, TypeError):
+            return False
+
+    def submit(self, job: Dict) -> str:
+        """
+        Queues a job on the daemon.
+
+        :param job (Dict): the job, see app.render_daemon.
+
+        :raises RenderDaemonError: if the job wasn't queued.
+
+        :return (str): the id of the job.
+        """
+        return self._request("/jobs", job)["id"]
+
+    def job(self, job_id: str) -> Dict:
+        """
+        Returns the state of a job (state, progress, total, result and error).
+
+        :param job_id (str): the id of the job.
+
+        :raises RenderDaemonError: if the daemon can't be reached.
+
+        :return: the job.
+        """
+        return self._request(f"/jobs/{job_id}")
+
+
+def render_client_from_settings() -> RenderClient | None:
+    """
+    Returns the client of the daemon set in the settings (RENDER_DAEMON_URL),
+    if it's running (the answer is reused for AVAILABILITY_TTL seconds).
+
+    :return (RenderClient | None): the client, None if the presentations must be
+        created by the app itself.
+    """
+    url = os.getenv("RENDER_DAEMON_URL")
+
+    if not url:
+        return None
+
+    client = RenderClient(url)
+
+    checked_at, available = _availability.get(url, (0.0, False))
+
+    if not checked_at or time.monotonic() - checked_at > AVAILABILITY_TTL:
+        available = client.is_available()
+        _availability[url] = (time.monotonic(), available)
+
+    return client if available else None
+
+
+def forget_availability() -> None:
+    """
+    Forgets the answers of the daemons (e.g. the daemon stopped answering), the next
+    render_client_from_settings asks again.
+    """
+    _availability.clear()
@@ -0,0 +1,646 @@
+"""
+This module contains the local render daemon.
+
+The daemon is a long-lived process that creates the presentations for the app (or for
+scripts): python-pptx, PIL, lyricsgenius, the fonts, the glyph widths, the paginated
+lyrics and the manifests of the folders are loaded once and stay warm between jobs,
+and many operators can send jobs to the same daemon.
+
+It listens only on localhost, with a small HTTP/JSON API:
+
+    POST /jobs        {"kind": "render" | "batch" | "restyle", ...}  -> {"id": ...}
+    GET  /jobs/<id>   the state, progress and result of a job
+    GET  /jobs        the last jobs
+    GET  /health      {"status": "ok", "queued": ...}
+
+The jobs are kept in an SQLite queue (settings/render_daemon.sqlite3) and run one at a
+time, in order. If the daemon stops, the jobs queued (and the one running) are run when
+it starts again.
+
+Run it from the folder of the app with:
+
+    python -m app.render_daemon [--port 8765]
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from app.create_pptx import SlidesConfig, create_slides
+from app.render_manifest import RenderManifest
+from app.restyle import restyle_deck
+from app.search_music_lyric import search_lyrics
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+JOBS_FILE_NAME = "render_daemon.sqlite3"
+
+JOB_KINDS = ("render", "batch", "restyle")
+
+# the biggest request accepted (the background image is sent in the request)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, position);
+"""
+
+
+class JobError(Exception):
+    """
+    The error of a job that can't be run (invalid payload, song not found...).
+    """
+
+
+class JobStore:
+    """
+    This class represents the persistent queue of jobs.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Opens (or creates) the queue. The jobs that were running when the daemon stopped
+        are queued again.
+
+        :param path (str | None): the path of the database, the settings folder by default.
+        """
+        self.path = path or os.path.join(os.getcwd(), "settings", JOBS_FILE_NAME)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # the requests are handled on their own threads, the connection is shared
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(SCHEMA)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET state = 'queued' WHERE state = 'running'"
+            )
+
+    def add(self, kind: str, payload: Dict, total: int) -> str:
+        """
+        Queues a job.
+
+        :param kind (str): the kind of the job.
+        :param payload (Dict): the inputs of the job.
+        :param total (int): the number of steps of the job (for the progress).
+
+        :return (str): the id of the job.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO jobs (id, position, kind, payload, state, total, created, "
+                "updated) VALUES (?, (SELECT IFNULL(MAX(position), 0) + 1 FROM jobs), "
+                "?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), total, now, now),
+            )
+
+        return job_id
+
+    def next_queued(self) -> Tuple[str, str, Dict] | None:
+        """
+        Takes the oldest queued job and marks it as running.
+
+        :return: the id, kind and payload of the job, None if the queue is empty.
+        """
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT id, kind, payload FROM jobs WHERE state = 'queued' "
+                "ORDER BY position LIMIT 1"
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE jobs SET state = 'running', updated = ? WHERE id = ?",
+                (time.time(), row[0]),
+            )
+
+        return row[0], row[1], json.loads(row[2])
+
+    def update(self, job_id: str, **values: Any) -> None:
+        """
+        Changes the state, progress, result or error of a job.
+
+        :param job_id (str): the id of the job.
+        :param values: the columns changed (the result is saved as JSON).
+        """
+        if "result" in values:
+            values["result"] = json.dumps(values["result"])
+
+        values["updated"] = time.time()
+
+        columns = ", ".join(f"{column} = ?" for column in values)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?", (*values.values(), job_id)
+            )
+
+    def get(self, job_id: str) -> Dict | None:
+        """
+        Returns a job, without its payload.
+
+        :param job_id (str): the id of the job.
+
+        :return: the job, None if there is no job with this id.
+        """
+        jobs = self._select("WHERE id = ?", (job_id,))
+
+        return jobs[0] if jobs else None
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """
+        Returns the last jobs queued, without their payloads.
+
+        :param limit (int): the maximum number of jobs.
+
+        :return: the jobs, the newest first.
+        """
+        return self._select("ORDER BY position DESC LIMIT ?", (limit,))
+
+    def queued_count(self) -> int:
+        """
+        Returns the number of jobs waiting to run.
+
+        :return (int): the number of jobs.
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = 'queued'"
+            ).fetchone()[0]
+
+    def _select(self, condition: str, parameters: Tuple) -> List[Dict]:
+        """
+        Returns the jobs that match the condition.
+
+        :param condition (str): the end of the query (WHERE, ORDER BY...).
+        :param parameters (Tuple): the parameters of the condition.
+
+        :return: the jobs.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, kind, state, progress, total, result, error, created, "
+                f"updated FROM jobs {condition}",
+                parameters,
+            ).fetchall()
+
+        return [
+            {
+                "id": row[0],
+                "kind": row[1],
+                "state": row[2],
+                "progress": row[3],
+                "total": row[4],
+                "result": json.loads(row[5]) if row[5] else None,
+                "error": row[6],
+                "created": row[7],
+                "updated": row[8],
+            }
+            for row in rows
+        ]
+
+
+def _decode_image(payload: Dict, key: str) -> BytesIO | None:
+    """
+    Returns an image sent in the payload (as base64).
+
+    :param payload (Dict): the payload.
+    :param key (str): the key of the image.
+
+    :return: the image, None if it wasn't sent.
+    """
+    if not payload.get(key):
+        return None
+
+    return BytesIO(base64.b64decode(payload[key]))
+
+
+def _slides_config(payload: Dict) -> SlidesConfig:
+    """
+    Returns the style sent in the payload.
+
+    :param payload (Dict): the payload.
+
+    :raises JobError: if the style is invalid.
+
+    :return (SlidesConfig): the style.
+    """
+    try:
+        return SlidesConfig(**payload.get("slides_config", {}))
+
+    except TypeError as error:
+        raise JobError(f"invalid slides_config: {error}") from error
+
+
+class RenderService:
+    """
+    This class runs the jobs of the queue, one at a time, on its own thread.
+    """
+
+    def __init__(self, store: JobStore) -> None:
+        """
+        Creates the service and starts its thread.
+
+        :param store (JobStore): the queue of jobs.
+        """
+        self.store = store
+
+        # the manifests stay loaded between the jobs of the same folder
+        self._manifests: Dict[str, RenderManifest] = {}
+
+        self._wake_up = threading.Event()
+
+        self._thread = threading.Thread(
+            target=self._run, name="RenderService", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, payload: Dict) -> str:
+        """
+        Validates and queues a job.
+
+        :param payload (Dict): the job, "kind" is its kind.
+
+        :raises JobError: if the job is invalid.
+
+        :return (str): the id of the job.
+        """
+        kind = payload.get("kind")
+
+        if kind not in JOB_KINDS:
+            raise JobError(f"kind must be one of {', '.join(JOB_KINDS)}")
+
+        if not payload.get("folder"):
+            raise JobError("folder is required")
+
+        if kind == "render":
+            if not payload.get("music") and not payload.get("singer"):
+                raise JobError("music or singer is required")
+            total = 1
+
+        elif kind == "batch":
+            total = len(payload.get("songs") or [])
+
+            if not total:
+                raise JobError("songs is required")
+
+        else:
+            total = len(payload.get("paths") or [])
+
+            if not total:
+                raise JobError("paths is required")
+
+        _slides_config(payload)
+
+        job_id = self.store.add(kind, payload, total)
+
+        self._wake_up.set()
+
+        return job_id
+
+    def _run(self) -> None:
+        """
+        Runs the queued jobs, waiting for new ones when the queue is empty.
+        """
+        while True:
+            job = self.store.next_queued()
+
+            if job is None:
+                self._wake_up.wait()
+                self._wake_up.clear()
+                continue
+
+            job_id, kind, payload = job
+
+            def progress(done: int, job_id: str = job_id) -> None:
+                self.store.update(job_id, progress=done)
+
+            try:
+                result = getattr(self, f"_run_{kind}")(payload, progress)
+
+            except Exception as error:  # pylint: disable=broad-except
+                self.store.update(job_id, state="failed", error=str(error))
+
+            else:
+                self.store.update(job_id, state="done", result=result)
+
+    def _manifest(self, folder: str) -> RenderManifest:
+        """
+        Returns the manifest of a folder, it's loaded only once.
+
+        :param folder (str): the folder.
+
+        :return (RenderManifest): the manifest.
+        """
+        if folder not in self._manifests:
+            self._manifests[folder] = RenderManifest(folder)
+
+        manifest = self._manifests[folder]
+        manifest.reused = 0
+
+        return manifest
+
+    def _render_song(
+        self,
+        music: str,
+        singer: str,
+        payload: Dict,
+        slides_config: SlidesConfig,
+        manifest: RenderManifest,
+        lyric: List[str] | None = None,
+    ) -> Dict:
+        """
+        Creates the presentation of a song, searching its lyric if it wasn't given.
+
+        :param music (str): the name of the music.
+        :param singer (str): the name of the singer.
+        :param payload (Dict): the payload of the job.
+        :param slides_config (SlidesConfig): the style.
+        :param manifest (RenderManifest): the manifest of the folder.
+        :param lyric (List[str] | None): the lyric, each item is a slide.
+
+        :raises JobError: if the song wasn't found.
+
+        :return: the song and the file created.
+        """
+        genius_image_link = ""
+
+        if lyric is None:
+            found = search_lyrics(
+                music, singer, payload.get("genius_key") or os.getenv("GENIUS_API_KEY")
+            )
+
+            if found is None:
+                raise JobError(f"no lyrics found for {music} - {singer}")
+
+            music, singer, lyric, genius_image_link = found
+
+        reused = manifest.reused
+
+        _, file_name, folder = create_slides(
+            widget=None,
+            music_title=music,
+            music_singer=singer,
+            music_lyric=lyric,
+            slides_config=slides_config,
+            FILES_FOLDER=payload["folder"],
+            method=payload.get("method", "page_one"),
+            genius_image_link=genius_image_link,
+            image=_decode_image(payload, "image"),
+            background_image=_decode_image(payload, "background_image"),
+            manifest=manifest,
+        )
+
+        return {
+            "music": music,
+            "singer": singer,
+            "file_name": file_name,
+            "folder": folder,
+            "reused": manifest.reused > reused,
+        }
+
+    def _run_render(self, payload: Dict, progress: Callable[[int], None]) -> Dict:
+        """
+        Creates the presentation of one song.
+
+        payload: music, singer, folder, slides_config and optionally lyric (if not
+        given, it's searched on Genius), method, genius_key, image and background_image.
+
+        :param payload (Dict): the payload of the job.
+        :param progress (Callable): receives the number of steps done.
+
+        :return: the song and the file created.
+        """
+        manifest = self._manifest(payload["folder"])
+
+        try:
+            result = self._render_song(
+                payload.get("music", ""),
+                payload.get("singer", ""),
+                payload,
+                _slides_config(payload),
+                manifest,
+                payload.get("lyric"),
+            )
+
+        finally:
+            manifest.save()
+
+        progress(1)
+
+        return result
+
+    def _run_batch(self, payload: Dict, progress: Callable[[int], None]) -> Dict:
+        """
+        Creates the presentations of many songs, a song that fails doesn't stop the others.
+
+        payload: songs ([music, singer] pairs), folder, slides_config and optionally
+        method, genius_key and background_image.
+
+        :param payload (Dict): the payload of the job.
+        :param progress (Callable): receives the number of songs done.
+
+        :return: the files created, the number of presentations kept and the failures.
+        """
+        manifest = self._manifest(payload["folder"])
+        slides_config = _slides_config(payload)
+
+        created, failed = [], []
+
+        for done, (music, singer) in enumerate(payload["songs"], 1):
+            try:
+                created.append(
+                    self._render_song(music, singer, payload, slides_config, manifest)
+                )
+
+            except Exception as error:  # pylint: disable=broad-except
+                failed.append([music, singer, str(error)])
+
+            progress(done)
+
+        manifest.save()
+
+        return {"created": created, "reused": manifest.reused, "failed": failed}
+
+    def _run_restyle(self, payload: Dict, progress: Callable[[int], None]) -> Dict:
+        """
+        Changes the style of presentations created by the app (see app.restyle).
+
+        payload: paths (of the presentations), folder and slides_config.
+
+        :param payload (Dict): the payload of the job.
+        :param progress (Callable): receives the number of presentations done.
+
+        :return: the number of presentations kept and the failures.
+        """
+        manifest = self._manifest(payload["folder"])
+        slides_config = _slides_config(payload)
+
+        failed = []
+
+        for done, path in enumerate(payload["paths"], 1):
+            try:
+                restyle_deck(path, payload["folder"], slides_config, manifest)
+
+            except Exception as error:  # pylint: disable=broad-except
+                failed.append([path, str(error)])
+
+            progress(done)
+
+        manifest.save()
+
+        return {"reused": manifest.reused, "failed": failed}
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    This class handles the requests of the API.
+    """
+
+    # set by serve
+    service: RenderService
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=W0622
+        # the requests of the status polling would flood the terminal
+        pass
+
+    def _send_json(self, status: HTTPStatus, body: Any) -> None:
+        """
+        Sends a JSON response.
+
+        :param status (HTTPStatus): the status of the response.
+        :param body (Any): the body of the response.
+        """
+        data = json.dumps(body).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:  # pylint: disable=C0103
+        """
+        Returns the health of the daemon, a job or the last jobs.
+        """
+        store = self.service.store
+
+        if self.path == "/health":
+            self._send_json(
+                HTTPStatus.OK, {"status": "ok", "queued": store.queued_count()}
+            )
+
+        elif self.path == "/jobs":
+            self._send_json(HTTPStatus.OK, store.recent())
+
+        elif match := re.fullmatch(r"/jobs/([0-9a-f]{32})", self.path):
+            job = store.get(match.group(1))
+
+            if job is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "job not found"})
+            else:
+                self._send_json(HTTPStatus.OK, job)
+
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self) -> None:  # pylint: disable=C0103
+        """
+        Queues a job.
+        """
+        if self.path != "/jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+
+        if length > MAX_REQUEST_BYTES:
+            self._send_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request too large"}
+            )
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length))
+
+            if not isinstance(payload, dict):
+                raise JobError("the job must be a JSON object")
+
+            job_id = self.service.submit(payload)
+
+        except (ValueError, JobError) as error:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+            return
+
+        self._send_json(HTTPStatus.ACCEPTED, {"id": job_id})
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """
+    Starts the daemon and handles the requests until it's stopped (Ctrl+C).
+
+    :param host (str): the address listened, only localhost by default.
+    :param port (int): the port listened.
+    """
+    load_dotenv(os.path.join(os.getcwd(), "settings", ".env"))
+
+    RenderRequestHandler.service = RenderService(JobStore())
+
+    with ThreadingHTTPServer((host, port), RenderRequestHandler) as server:
+        print(f"Render daemon listening on http://{host}:{port}")
+
+        try:
+            server.serve_forever()
+
+        except KeyboardInterrupt:
+            pass
+
+
+def main() -> None:
+    """
+    Parses the command line and starts the daemon.
+    """
+    parser = argparse.ArgumentParser(description="Music PPTX Creator render daemon")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    arguments = parser.parse_args()
+
+    serve(arguments.host, arguments.port)
+
+
+if __name__ == "__main__":
+    main()
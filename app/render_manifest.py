@@ -0,0 +1,223 @@
+"""
+This module contains the RenderManifest class.
+
+The manifest is a JSON file in the output folder that records, for each presentation created,
+a fingerprint (hash) of everything used to create it: the strophes, the slides config,
+the background image, the song art url... When a presentation is created again with
+the same fingerprint and the file is still there, it doesn't need to be created again.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import fields
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from app.create_pptx import SlidesConfig
+
+MANIFEST_FILE_NAME = ".music_pptx_manifest.json"
+
+# change it when create_slides changes the presentations it creates,
+# so the presentations created by the old version are created again
+RENDERER_VERSION = 2
+
+
+def _hash_bytes(data: bytes | BytesIO | None) -> str:
+    """
+    Returns the hash of an image (or "" if there is no image).
+
+    :param data (bytes | BytesIO | None): the image.
+
+    :return: the sha256 of the image.
+    """
+    if data is None:
+        return ""
+
+    if isinstance(data, BytesIO):
+        data = data.getvalue()
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def _config_dict(slides_config: "SlidesConfig") -> Dict:
+    """
+    Returns the fields of the slides config.
+    Not asdict, it can't copy the alignment enum (it's saved as its int value).
+
+    :param slides_config (SlidesConfig): the slides config.
+
+    :return: the fields and their values.
+    """
+    return {
+        config_field.name: getattr(slides_config, config_field.name)
+        for config_field in fields(slides_config)
+    }
+
+
+def deck_fingerprint(
+    music_title: str,
+    music_singer: str,
+    music_lyric: List[str],
+    slides_config: "SlidesConfig",
+    method: str,
+    genius_image_link: str = "",
+    image: bytes | BytesIO | None = None,
+    background_image: bytes | BytesIO | None = None,
+) -> str:
+    """
+    Returns the fingerprint of the inputs of a presentation, the params are the same as
+    create_slides.
+
+    :return: the fingerprint (sha256).
+    """
+    # the template pool imports python-pptx, this module is imported at startup
+    from app.template_pool import (  # pylint: disable=import-outside-toplevel
+        template_signature,
+    )
+
+    inputs = {
+        "renderer_version": RENDERER_VERSION,
+        "music_title": music_title,
+        "music_singer": music_singer,
+        "music_lyric": music_lyric,
+        "slides_config": _config_dict(slides_config),
+        "template": template_signature(slides_config.template_name),
+        "method": method,
+        "genius_image_link": genius_image_link,
+        "image": _hash_bytes(image),
+        "background_image": _hash_bytes(background_image),
+    }
+
+    serialized_inputs = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+
+    return hashlib.sha256(serialized_inputs.encode("utf-8")).hexdigest()
+
+
+def restyle_fingerprint(source_path: str | None, slides_config: "SlidesConfig") -> str:
+    """
+    Returns the fingerprint of a presentation restyled in place (see app.restyle):
+    the presentation it was restyled from and the new style.
+
+    :param source_path (str | None): the path of the presentation restyled, None if
+        the restyled presentation replaced it (only the style is in the fingerprint,
+        the manifest already checks the file wasn't changed since it was restyled).
+    :param slides_config (SlidesConfig): the new style.
+
+    :return: the fingerprint (sha256).
+    """
+    source_digest = ""
+
+    if source_path is not None:
+        source_hash = hashlib.sha256()
+
+        with open(source_path, "rb") as source_file:
+            for chunk in iter(lambda: source_file.read(1 << 20), b""):
+                source_hash.update(chunk)
+
+        source_digest = source_hash.hexdigest()
+
+    inputs = {
+        "renderer_version": RENDERER_VERSION,
+        "restyled_from": source_digest,
+        "slides_config": _config_dict(slides_config),
+    }
+
+    serialized_inputs = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+
+    return hashlib.sha256(serialized_inputs.encode("utf-8")).hexdigest()
+
+
+class RenderManifest:
+    """
+    This class represents the manifest of an output folder.
+    """
+
+    def __init__(self, folder: str) -> None:
+        """
+        Loads the manifest of the folder (an empty one if there is none or it's invalid).
+
+        :param folder (str): the output folder.
+        """
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_FILE_NAME)
+
+        # the number of presentations that weren't created again
+        self.reused = 0
+
+        self.entries: Dict[str, Dict] = {}
+
+        # the presentations can be recorded by the thread that copies them (see app.output_writer)
+        self._lock = threading.Lock()
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as manifest_file:
+                self.entries = json.load(manifest_file)["decks"]
+
+        except (OSError, ValueError, KeyError, TypeError):
+            self.entries = {}
+
+    def is_current(self, file_name: str, fingerprint: str) -> bool:
+        """
+        Returns if the presentation in the folder was created with the same fingerprint
+        and wasn't changed since then.
+
+        :param file_name (str): the name of the presentation file.
+        :param fingerprint (str): the fingerprint of the new inputs.
+
+        :return (bool): True if the presentation doesn't need to be created again.
+        """
+        with self._lock:
+            entry = self.entries.get(file_name)
+
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return False
+
+        try:
+            file_stat = os.stat(os.path.join(self.folder, file_name))
+
+        except OSError:
+            return False
+
+        return file_stat.st_size == entry.get("size") and int(
+            file_stat.st_mtime
+        ) == entry.get("mtime")
+
+    def record(self, file_name: str, fingerprint: str) -> None:
+        """
+        Records the fingerprint of a presentation that was just created.
+
+        :param file_name (str): the name of the presentation file.
+        :param fingerprint (str): the fingerprint of its inputs.
+        """
+        try:
+            file_stat = os.stat(os.path.join(self.folder, file_name))
+
+        except OSError:
+            return
+
+        with self._lock:
+            self.entries[file_name] = {
+                "fingerprint": fingerprint,
+                "size": file_stat.st_size,
+                "mtime": int(file_stat.st_mtime),
+            }
+
+    def save(self) -> None:
+        """
+        Writes the manifest to the folder (it's replaced only after being fully written).
+        """
+        temporary_path = self.path + ".tmp"
+
+        try:
+            with self._lock, open(
+                temporary_path, "w", encoding="utf-8"
+            ) as manifest_file:
+                json.dump({"version": 1, "decks": self.entries}, manifest_file)
+
+            os.replace(temporary_path, self.path)
+
+        except OSError:
+            pass
@@ -0,0 +1,353 @@
+"""
+This module contains the in-place restyle of the presentations created by the app.
+
+Instead of extracting the texts and images of a presentation and creating it again,
+only the XML of its slides is changed: the background color and the fonts (name, size,
+bold, color), alignment and spacing of the title, subtitle and lyric paragraphs.
+Every other part of the package (images, layouts, theme...) is streamed to the new file
+as it is, so restyling a presentation costs about one copy of its file.
+
+A presentation that can't be restyled this way (its strophes don't fit the slides of the
+new style, so they must be paginated again, or the new style uses a template) is left
+to create_slides.
+"""
+
+import os
+import re
+import shutil
+import zipfile
+from io import BytesIO
+from typing import Dict, List, Literal, Tuple
+
+from lxml.etree import _Element
+from pptx.dml.color import RGBColor
+from pptx.dml.fill import FillFormat
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.opc.oxml import serialize_part_xml
+from pptx.oxml import parse_xml
+from pptx.text.text import Font, _Paragraph
+from pptx.util import Pt
+from PySide6.QtWidgets import QWidget
+
+from app.autofit import fit_font_sizes
+from app.create_pptx import SlidesConfig, create_slides, extract_presentation_infos
+from app.output_writer import write_atomically
+from app.pagination import lines_per_slide
+from app.render_manifest import RenderManifest, restyle_fingerprint
+
+SLIDE_PART_NAME = re.compile(r"^ppt/slides/slide\d+\.xml$")
+
+# the placeholders of the title slide
+TITLE_PLACEHOLDERS = (PP_PLACEHOLDER.CENTER_TITLE, PP_PLACEHOLDER.TITLE)
+SUBTITLE_PLACEHOLDERS = (PP_PLACEHOLDER.SUBTITLE,)
+
+
+def _set_font(
+    font: Font, size_PT: int, bold: bool, color_RGB: Tuple, name: str
+) -> None:
+    """
+    Sets the font of a paragraph or run.
+
+    :param font (Font): the font.
+    :param size_PT (int): the size in points.
+    :param bold (bool): if the font is bold.
+    :param color_RGB (Tuple): the color in RGB.
+    :param name (str): the name of the font.
+    """
+    font.size = Pt(size_PT)
+    font.bold = bold
+    font.color.rgb = RGBColor(*color_RGB)
+    font.name = name
+
+
+def _paragraph_fonts(paragraph: _Element) -> List[Font]:
+    """
+    Returns the fonts of a paragraph: its default one and the ones of its runs
+    that have their own (e.g. the runs edited on PowerPoint).
+
+    :param paragraph (_Element): the a:p element.
+
+    :return: the fonts.
+    """
+    return [_Paragraph(paragraph, None).font] + [
+        Font(run.rPr) for run in paragraph.r_lst if run.rPr is not None
+    ]
+
+
+def _text_paragraphs(shape: _Element) -> List[_Element]:
+    """
+    Returns the paragraphs of a shape that have text.
+
+    :param shape (_Element): the p:sp element.
+
+    :return: the a:p elements.
+    """
+    if shape.txBody is None:
+        return []
+
+    return [paragraph for paragraph in shape.txBody.p_lst if paragraph.r_lst]
+
+
+def _lyric_text(shape: _Element) -> str:
+    """
+    Returns the strophe of a lyric textbox.
+
+    :param shape (_Element): the p:sp element of the textbox.
+
+    :return (str): the strophe, its lines are separated by "\\n".
+    """
+    return "\n".join(
+        _Paragraph(paragraph, None).text.replace("\x0b", "\n")
+        for paragraph in _text_paragraphs(shape)
+    )
+
+
+def _restyle_slide(
+    slide: _Element,
+    slides_config: SlidesConfig,
+    lyric_shapes: List[_Element],
+    text_font_size_PT: int,
+) -> None:
+    """
+    Changes the style of a slide, the same way create_pptx.add_song_slides styles it.
+
+    :param slide (_Element): the p:sld element.
+    :param slides_config (SlidesConfig): the new style.
+    :param lyric_shapes (List[_Element]): the lyric textboxes of the slide.
+    :param text_font_size_PT (int): the size of the lyric text in points.
+    """
+    fill = FillFormat.from_fill_parent(slide.cSld.get_or_add_bgPr())
+    fill.solid()
+    fill.fore_color.rgb = RGBColor(*slides_config.background_color_RGB)
+
+    for shape in slide.xpath("./p:cSld/p:spTree/p:sp"):
+        if not shape.has_ph_elm:
+            continue
+
+        if shape.ph_type in TITLE_PLACEHOLDERS:
+            font_style = (
+                slides_config.title_font_size_PT,
+                slides_config.title_font_isbold,
+                slides_config.title_font_color_RGB,
+                slides_config.title_font_name,
+            )
+
+        elif shape.ph_type in SUBTITLE_PLACEHOLDERS:
+            font_style = (
+                slides_config.subtitle_font_size_PT,
+                slides_config.subtitle_font_isbold,
+                slides_config.subtitle_font_color_RGB,
+                slides_config.subtitle_font_name,
+            )
+
+        else:
+            continue
+
+        for paragraph in _text_paragraphs(shape):
+            for font in _paragraph_fonts(paragraph):
+                _set_font(font, *font_style)
+
+    for shape in lyric_shapes:
+        for paragraph in _text_paragraphs(shape):
+            paragraph_proxy = _Paragraph(paragraph, None)
+            paragraph_proxy.alignment = slides_config.text_font_alignment
+            paragraph_proxy.line_spacing = Pt(
+                slides_config.text_font_line_spacing_PT
+                * 2
+                * text_font_size_PT
+                / slides_config.text_font_size_PT
+            )
+            paragraph_proxy.space_before = Pt(slides_config.text_font_space_before_PT)
+            paragraph_proxy.space_after = Pt(slides_config.text_font_space_after_PT)
+
+            for font in _paragraph_fonts(paragraph):
+                _set_font(
+                    font,
+                    text_font_size_PT,
+                    slides_config.text_font_isbold,
+                    slides_config.text_font_color_RGB,
+                    slides_config.text_font_name,
+                )
+
+
+def restyle_presentation(
+    source_path: str, folder: str, file_name: str, slides_config: SlidesConfig
+) -> bool:
+    """
+    Writes the presentation with the new style to the folder, changing only the XML
+    of its slides (the file with the same name is only replaced when the new one is complete).
+
+    :param source_path (str): the path of the presentation.
+    :param folder (str): the destination folder.
+    :param file_name (str): the name of the file in the destination folder.
+    :param slides_config (SlidesConfig): the new style.
+
+    :return (bool): False if the presentation must be created again instead
+        (nothing is written), True if it was restyled.
+    """
+    # the master and layouts of a template aren't copied to the slides XML
+    if slides_config.template_name:
+        return False
+
+    max_lines = lines_per_slide(slides_config)
+
+    with zipfile.ZipFile(source_path) as source:
+        slides: Dict[str, Tuple[_Element, List[_Element]]] = {}
+
+        for part_name in source.namelist():
+            if not SLIDE_PART_NAME.match(part_name):
+                continue
+
+            slide = parse_xml(source.read(part_name))
+
+            lyric_shapes = [
+                shape
+                for shape in slide.xpath("./p:cSld/p:spTree/p:sp")
+                if shape.is_textbox and _text_paragraphs(shape)
+            ]
+
+            # a strophe longer than the slides of the new style must be split again
+            if any(
+                len(_lyric_text(shape).split("\n")) > max_lines
+                for shape in lyric_shapes
+            ):
+                return False
+
+            slides[part_name] = (slide, lyric_shapes)
+
+        if not slides:
+            return False
+
+        # the size of the lyric of each slide (the largest that fits if autofit is on)
+        lyric_slides = [name for name, (_, shapes) in slides.items() if shapes]
+
+        fitted_sizes = (
+            fit_font_sizes(
+                [
+                    "\n".join(_lyric_text(shape) for shape in slides[name][1])
+                    for name in lyric_slides
+                ],
+                slides_config,
+            )
+            if slides_config.text_font_autofit
+            else [slides_config.text_font_size_PT] * len(lyric_slides)
+        )
+
+        text_font_sizes = dict(zip(lyric_slides, fitted_sizes))
+
+        restyled_parts: Dict[str, bytes] = {}
+
+        for part_name, (slide, lyric_shapes) in slides.items():
+            _restyle_slide(
+                slide,
+                slides_config,
+                lyric_shapes,
+                text_font_sizes.get(part_name, slides_config.text_font_size_PT),
+            )
+            restyled_parts[part_name] = serialize_part_xml(slide)
+
+    def write_package(temporary_path: str) -> None:
+        """
+        Writes the package with the restyled slides, the other parts are only copied.
+
+        :param temporary_path (str): the path of the new package.
+        """
+        # the source is opened again and closed before the new package replaces the old
+        # file (it can be the same file and Windows can't replace an open file)
+        with zipfile.ZipFile(source_path) as source, zipfile.ZipFile(
+            temporary_path, "w"
+        ) as restyled:
+            for part_info in source.infolist():
+                if part_info.filename in restyled_parts:
+                    restyled.writestr(part_info, restyled_parts[part_info.filename])
+                    continue
+
+                with source.open(part_info) as part, restyled.open(
+                    part_info, "w"
+                ) as restyled_part:
+                    shutil.copyfileobj(part, restyled_part)
+
+    write_atomically(write_package, folder, file_name)
+
+    return True
+
+
+def restyle_deck(
+    source_path: str,
+    folder: str,
+    slides_config: SlidesConfig,
+    manifest: RenderManifest,
+    widget: QWidget | None = None,
+    language: Literal["pt", "en"] = "pt",
+) -> None:
+    """
+    Changes the style of a presentation created by the app: it's restyled in place and
+    only created again when that isn't possible. The presentation is kept if it was
+    already restyled from the same file with the same style.
+
+    :param source_path (str): the path of the presentation.
+    :param folder (str): the destination folder.
+    :param slides_config (SlidesConfig): the new style.
+    :param manifest (RenderManifest): the manifest of the destination folder.
+    :param widget (QWidget | None): the label that shows the status.
+    :param language (Literal["pt", "en"]): the language of the status.
+    """
+    file_name = os.path.basename(source_path)
+
+    # restyled in place, the new presentation replaces its source: the hash of the
+    # source would change on every run, so the style is applied again every time
+    in_place = os.path.normcase(os.path.abspath(source_path)) == os.path.normcase(
+        os.path.abspath(os.path.join(folder, file_name))
+    )
+
+    fingerprint = restyle_fingerprint(None if in_place else source_path, slides_config)
+
+    if manifest.is_current(file_name, fingerprint):
+        manifest.reused += 1
+        return
+
+    if restyle_presentation(source_path, folder, file_name, slides_config):
+        manifest.record(file_name, fingerprint)
+
+        if widget is not None:
+            widget.setText(  # type: ignore
+                f'Arquivo: "{file_name}" concluído com sucesso!'
+                if language == "pt"
+                else f'File: "{file_name}" completed!'
+            )
+
+        return
+
+    # the strophes don't fit the slides of the new style (or it uses a template),
+    # it's created again
+    title, subtitle, lyric, image, background_image = extract_presentation_infos(
+        presentation_path=source_path
+    )
+
+    _, created_file_name, _ = create_slides(
+        widget=widget,
+        music_title=title,
+        music_singer=subtitle,
+        music_lyric=lyric,
+        slides_config=slides_config,
+        FILES_FOLDER=folder,
+        # the images are added to the slides as files
+        image=BytesIO(image) if image else None,
+        background_image=BytesIO(background_image) if background_image else None,
+        language=language,
+        manifest=manifest,
+    )
+
+    # the file is named by its title and singer: when it replaced the source, the next
+    # restyle in place with the same style keeps it (otherwise the source is still
+    # there and create_slides recorded the new file itself)
+    try:
+        replaced_source = in_place and os.path.samefile(
+            source_path, os.path.join(folder, created_file_name)
+        )
+
+    except OSError:
+        replaced_source = False
+
+    if replaced_source:
+        manifest.record(created_file_name, fingerprint)
@@ -4,11 +4,17 @@ It uses the lyricsgenius library to search for lyrics on Genius.
 """
 
 import re
-from typing import Literal, Tuple
+from functools import lru_cache
+from typing import Dict, Literal, Tuple
 import lyricsgenius
 
 from PySide6.QtWidgets import QWidget, QMessageBox
 
+from app.lookup import LyricsLookup
+from app.lyric_library import lyric_library
+from app.song_index import song_index
+from app.tracing import tracer
+
 
 def remove_square_brackets(text: str) -> str:
     """
@@ -22,6 +28,174 @@ def remove_square_brackets(text: str) -> str:
     return re.sub(r"\[.*?\]\n", "", text)
 
 
+DEFAULT_GENIUS_KEY = "bxl6Q4NJ3YPaoo5xE7aBegmbEr4JLExbRyGvbcXO0Jh1JXf3Rno60Su9xkz6pPro"
+
+
+@lru_cache(maxsize=4)
+def genius_client(genius_key: str | None = None) -> lyricsgenius.Genius:
+    """
+    Returns the Genius client of the API key (it's created only once).
+
+    :param genius_key (str | None): the API key, the default key if None.
+
+    :return (Genius): the client.
+    """
+    return lyricsgenius.Genius(
+        genius_key or DEFAULT_GENIUS_KEY, timeout=10, sleep_time=1
+    )
+
+
+def find_song(music: str, singer: str, genius_key: str | None = None) -> Dict | None:
+    """
+    Searches for the song on Genius.
+
+    :param music (str): The name of the music to search for.
+    :param singer (str): The name of the singer to search for.
+    :param genius_key (str | None): The API key.
+
+    :return: the first result of the search (title, primary_artist, id...),
+        None if nothing was found.
+    """
+    with tracer.span("genius_search"):
+        search = genius_client(genius_key).search(f"{music} {singer}")
+
+    try:
+        return search["hits"][0]["result"]
+
+    except IndexError:
+        return None
+
+
+def fetch_lyric(song_id: int, genius_key: str | None = None) -> list[str]:
+    """
+    Downloads the lyric of a song found by find_song and splits it in strophes.
+
+    :param song_id (int): The id of the song on Genius.
+    :param genius_key (str | None): The API key.
+
+    :raises: Exception if the blocks of the lyric can't be divided.
+
+    :return (list[str]): the strophes, the first item is a blank (the title slide).
+    """
+    with tracer.span("lyrics_fetch"):
+        music_lyric = genius_client(genius_key).lyrics(song_id).split("\n\n")  # type: ignore
+
+    music_items = range(len(music_lyric))
+
+    for i in music_items:
+        if re.search(r"(you might also like|embed|\d{2}embed)", music_lyric[i].lower()):
+            music_lyric[i] = re.sub(
+                r"(you might also like|embed|\d{2}embed)",
+                lambda x: "\n" if x.group() == "you might also like" else "",
+                music_lyric[i].lower(),
+            )
+
+            if i < len(music_lyric):
+                result = music_lyric[i].split("\n\n")
+
+                bloc1 = result[0]
+
+                if len(result) > 1:
+                    bloc2 = result[1]
+                else:
+                    bloc2 = ""
+
+                music_lyric.remove(music_lyric[i])
+                music_lyric.insert(i, bloc1)
+
+                if bloc2:
+                    music_lyric.insert(i + 1, bloc2)
+
+        # if its the first paragraph and it has a line break
+        # and it has a number its a header of the song so it needs to be removed
+        # before the line break
+        if (
+            i == 0
+            and "\n" in music_lyric[i]
+            and bool(re.search(r"\d", music_lyric[i])) is True
+        ):
+            music_lyric[i] = music_lyric[i].split("\n", 1)[1]
+
+    for i, letra in enumerate(music_lyric):
+        music_lyric[i] = remove_square_brackets(letra)
+
+    # remove the [refrao] [1 verso] etc
+    music_lyric = [linha for linha in music_lyric if not linha.startswith("[")]
+    music_lyric = [linha for linha in music_lyric if not linha.endswith("]")]
+
+    # the first item is a blank because its ignored on create_slides function
+    music_lyric.insert(0, "")
+
+    return music_lyric
+
+
+def find_known_song(
+    music: str, singer: str, genius_key: str | None = None
+) -> Dict | None:
+    """
+    Searches for the song on Genius, unless it was found before (the songs found are
+    saved on the song index with their Genius id, see app.song_index).
+
+    :param music (str): The name of the music to search for.
+    :param singer (str): The name of the singer to search for.
+    :param genius_key (str | None): The API key.
+
+    :return: the result of the search (see find_song), None if nothing was found.
+    """
+    entry = song_index.find(music, singer)
+
+    if entry is not None and entry.song_id is not None:
+        return entry.search_result()
+
+    return find_song(music, singer, genius_key)
+
+
+# the searches and lyrics already downloaded, and the prefetches of page one
+lyrics_lookup = LyricsLookup(find_known_song, fetch_lyric)
+
+
+def search_lyrics(
+    music: str, singer: str, genius_key: str | None = None
+) -> Tuple[str, str, list[str], str] | None:
+    """
+    Searches for lyrics on Genius without asking anything to the user
+    (the song found is used even if its name doesn't match the typed one).
+    Used where there is no window, like the render daemon.
+
+    :param music (str): The name of the music to search for.
+    :param singer (str): The name of the singer to search for.
+    :param genius_key (str | None): The API key.
+
+    :return: the found music, singer, lyric and image url, None if nothing was found.
+    """
+    # the songs imported to the lyric library aren't searched on Genius
+    library_song = lyric_library.find(music, singer)
+
+    if library_song is not None:
+        return library_song.music, library_song.singer, library_song.lyric, ""
+
+    result = lyrics_lookup.find_song(music, singer, genius_key)
+
+    if result is None:
+        return None
+
+    music_lyric = lyrics_lookup.fetch_lyric(result["id"], genius_key)
+
+    song_index.add_song(
+        result["title"],
+        result["primary_artist"]["name"],
+        result["id"],
+        result["song_art_image_thumbnail_url"],
+    )
+
+    return (
+        result["title"],
+        result["primary_artist"]["name"],
+        music_lyric,
+        result["song_art_image_thumbnail_url"],
+    )
+
+
 def search_lyrics_on_genius(
     window: QWidget,
     music: str,
@@ -43,22 +217,15 @@ def search_lyrics_on_genius(
     :return found_lyrics (list[str]): The list of found lyrics.
     :return image (str): The URL of the found image, or None if no lyrics are found.
     """
+    # the songs imported to the lyric library aren't searched on Genius
+    library_song = lyric_library.find(music, singer)
 
-    api_key = genius_key
-    if not genius_key:
-        api_key = "bxl6Q4NJ3YPaoo5xE7aBegmbEr4JLExbRyGvbcXO0Jh1JXf3Rno60Su9xkz6pPro"
-
-    genius = lyricsgenius.Genius(api_key, timeout=10, sleep_time=1)
+    if library_song is not None:
+        return library_song.music, library_song.singer, library_song.lyric, ""
 
-    try:
-        search = genius.search(f"{music} {singer}")
+    result = lyrics_lookup.find_song(music, singer, genius_key)
 
-        result = search["hits"][0]["result"]
-        found_music = result["title"]
-        found_singer = result["primary_artist"]["name"]
-        image = result["song_art_image_thumbnail_url"]
-
-    except IndexError:
+    if result is None:
         msg_box = QMessageBox()
         msg_box.setIcon(msg_box.Icon.Critical)
         msg_box.information(
@@ -72,6 +239,10 @@ def search_lyrics_on_genius(
         )
         return None
 
+    found_music = result["title"]
+    found_singer = result["primary_artist"]["name"]
+    image = result["song_art_image_thumbnail_url"]
+
     if found_music != music or found_singer != singer:
         msg_box = QMessageBox()
 
@@ -97,68 +268,24 @@ def search_lyrics_on_genius(
         if response == QMessageBox.StandardButton.No:
             return None
 
-    music_lyric = genius.lyrics(result["id"]).split("\n\n")  # type: ignore
-
-    music_items = range(len(music_lyric))
-
-    for i in music_items:
-        if re.search(r"(you might also like|embed|\d{2}embed)", music_lyric[i].lower()):
-            music_lyric[i] = re.sub(
-                r"(you might also like|embed|\d{2}embed)",
-                lambda x: "\n" if x.group() == "you might also like" else "",
-                music_lyric[i].lower(),
-            )
-
-            try:
-                if i < len(music_lyric):
-                    result = music_lyric[i].split("\n\n")
-
-                    bloc1 = result[0]
-
-                    if len(result) > 1:
-                        bloc2 = result[1]
-                    else:
-                        bloc2 = ""
-
-                    music_lyric.remove(music_lyric[i])
-                    music_lyric.insert(i, bloc1)
-
-                    if bloc2:
-                        music_lyric.insert(i + 1, bloc2)
-
-            except Exception as exc:
-                msg_box = QMessageBox()
-                msg_box.setIcon(msg_box.Icon.Critical)
-                msg_box.information(
-                    window,
-                    "Erro" if language == "pt" else "Error",
-                    (
-                        f"Erro na divisão dos blocos: {str(exc)}"
-                        if language == "pt"
-                        else f"Error in block division: {str(exc)}"
-                    ),
-                )
-
-                return None
-
-        # if its the first paragraph and it has a line break
-        # and it has a number its a header of the song so it needs to be removed
-        # before the line break
-        if (
-            i == 0
-            and "\n" in music_lyric[i]
-            and bool(re.search(r"\d", music_lyric[i])) is True
-        ):
-            music_lyric[i] = music_lyric[i].split("\n", 1)[1]
+    try:
+        music_lyric = lyrics_lookup.fetch_lyric(result["id"], genius_key)
 
-    for i, letra in enumerate(music_lyric):
-        music_lyric[i] = remove_square_brackets(letra)
+    except Exception as exc:  # pylint: disable=broad-except
+        msg_box = QMessageBox()
+        msg_box.setIcon(msg_box.Icon.Critical)
+        msg_box.information(
+            window,
+            "Erro" if language == "pt" else "Error",
+            (
+                f"Erro na divisão dos blocos: {str(exc)}"
+                if language == "pt"
+                else f"Error in block division: {str(exc)}"
+            ),
+        )
 
-    # remove the [refrao] [1 verso] etc
-    music_lyric = [linha for linha in music_lyric if not linha.startswith("[")]
-    music_lyric = [linha for linha in music_lyric if not linha.endswith("]")]
+        return None
 
-    # the first item is a blank because its ignored on create_slides function
-    music_lyric.insert(0, "")
+    song_index.add_song(found_music, found_singer, result["id"], image)
 
     return found_music, found_singer, music_lyric, image
@@ -0,0 +1,180 @@
+"""
+This module contains the SetlistDeck class.
+
+A setlist is a single presentation with all the songs of a page many batch, in order.
+Each song is appended to the presentation as soon as its lyric is found. The slides are
+written by app.ooxml_writer, so each finished slide is only kept as its XML (a few KB),
+not as the python-pptx tree of the whole presentation, until the setlist is saved.
+The background image is added to the package only once and shared by every slide,
+the writer reuses the image part when the same image is added again.
+"""
+
+import os
+import time
+import uuid
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+from lxml import etree
+from pptx.oxml.ns import qn
+
+from app.create_pptx import (
+    SlidesConfig,
+    _download_song_image,
+    _format_filename,
+    _paginate,
+)
+from app.ooxml_writer import add_song, new_deck
+from app.output_writer import save_atomically
+from app.tracing import tracer
+
+# the extension of the presentation.xml where PowerPoint saves the sections
+SECTIONS_EXTENSION_URI = "{521415D9-36F7-43E2-AB2F-B90AF26B5E84}"
+P14_NAMESPACE = "http://schemas.microsoft.com/office/powerpoint/2010/main"
+
+
+class SetlistDeck:
+    """
+    This class represents the single presentation created with many songs.
+    """
+
+    def __init__(
+        self,
+        slides_config: SlidesConfig,
+        folder: str,
+        background_image: bytes | BytesIO | None = None,
+        sections: bool = False,
+    ) -> None:
+        """
+        Creates the empty setlist.
+
+        :param slides_config (SlidesConfig): the configuration of the slides.
+        :param folder (str): the folder where the setlist is saved.
+        :param background_image (bytes | BytesIO | None): the background image of all the slides.
+        :param sections (bool): if True, each song is in its own section of the presentation.
+        """
+        self.slides_config = slides_config
+        self.folder = folder
+        self.sections = sections
+
+        if isinstance(background_image, bytes):
+            background_image = BytesIO(background_image)
+
+        self.background_image = background_image
+
+        self.deck = new_deck(slides_config.template_name)
+
+        # the name of each song and the ids of its slides, used to create the sections
+        self.songs: List[Tuple[str, List[str]]] = []
+
+    def add_song(
+        self,
+        music_title: str,
+        music_singer: str,
+        music_lyric: List[str],
+        method: str = "page_many",
+        genius_image_link: str = "",
+    ) -> None:
+        """
+        Appends the slides of a song to the end of the setlist.
+
+        :param music_title (str): The title of the song.
+        :param music_singer (str): The singer of the song.
+        :param music_lyric (list[str]): The lyric of the song, each item is a strophe.
+        :param method (str): The method used to insert the lyrics.
+        :param genius_image_link (str): The api genius music image link.
+        """
+        with tracer.span("build_slides"):
+            pages, text_font_sizes = _paginate(music_lyric, self.slides_config)
+
+            slide_ids = add_song(
+                self.deck,
+                music_title,
+                music_singer,
+                pages,
+                text_font_sizes,
+                self.slides_config,
+                method,
+                (
+                    _download_song_image(music_title, genius_image_link)
+                    if method in ("page_one", "page_many")
+                    else ""
+                ),
+                background_image=self.background_image,
+            )
+
+        self.songs.append(
+            (
+                f"{music_title} - {music_singer}" if music_singer else music_title,
+                [str(slide_id) for slide_id in slide_ids],
+            )
+        )
+
+    def save(self) -> str:
+        """
+        Saves the setlist on its folder, named with the current date and time.
+
+        :return (str): the name of the file saved.
+        """
+        parts = self.deck.finish()
+
+        if self.sections:
+            self._add_sections(parts)
+
+        file_name = _format_filename(
+            f"Setlist {time.strftime('%Y-%m-%d %Hh%M')} ({len(self.songs)}).pptx"
+        )
+
+        with tracer.span("save"):
+            os.makedirs(self.folder, exist_ok=True)
+            save_atomically(parts, self.folder, file_name)
+
+        return file_name
+
+    def _add_sections(self, parts: Dict[str, bytes]) -> None:
+        """
+        Adds a section for each song (shown by PowerPoint on the slides list).
+
+        :param parts (Dict[str, bytes]): the parts of the setlist, its presentation part
+            is written again with the sections.
+        """
+        presentation_name = self.deck.template.presentation_name
+        presentation_element = etree.fromstring(parts[presentation_name])
+
+        extension_list = presentation_element.find(qn("p:extLst"))
+
+        if extension_list is None:
+            # the extLst has to be the last element of the presentation
+            extension_list = etree.SubElement(presentation_element, qn("p:extLst"))
+
+        for extension in extension_list.findall(qn("p:ext")):
+            if extension.get("uri") == SECTIONS_EXTENSION_URI:
+                extension_list.remove(extension)
+
+        extension = etree.SubElement(
+            extension_list, qn("p:ext"), uri=SECTIONS_EXTENSION_URI
+        )
+
+        section_list = etree.SubElement(
+            extension, f"{{{P14_NAMESPACE}}}sectionLst", nsmap={"p14": P14_NAMESPACE}
+        )
+
+        for position, (song_name, slide_ids) in enumerate(self.songs):
+            # the same setlist always has the same ids (the output is reproducible)
+            section_id = uuid.uuid5(uuid.NAMESPACE_URL, f"{position}:{song_name}")
+
+            section = etree.SubElement(
+                section_list,
+                f"{{{P14_NAMESPACE}}}section",
+                name=song_name,
+                id="{" + str(section_id).upper() + "}",
+            )
+
+            slide_id_list = etree.SubElement(section, f"{{{P14_NAMESPACE}}}sldIdLst")
+
+            for slide_id in slide_ids:
+                etree.SubElement(slide_id_list, f"{{{P14_NAMESPACE}}}sldId", id=slide_id)
+
+        parts[presentation_name] = etree.tostring(
+            presentation_element, encoding="UTF-8", standalone=True
+        )
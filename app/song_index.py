@@ -0,0 +1,364 @@
+"""
+This module contains the SongIndex class, the prefix index of the known songs.
+
+The songs found on Genius and the songs of the imported CSVs are saved in an append-only
+JSONL file in the settings folder (settings/song_index.jsonl) and kept in memory in two
+sorted lists, one of the music names and one of the singers. The suggestions of a prefix
+are found with a binary search (bisect), so they take a few microseconds even with
+hundreds of thousands of songs. The comparison ignores the case, the accents and the
+extra spaces.
+
+The songs found on Genius keep their Genius id, so a song chosen from the suggestions is
+not searched again (see search_music_lyric.find_known_song).
+
+The file is read on a thread when the application starts (load_in_background), the
+suggestions are empty until it's read.
+"""
+
+import bisect
+import json
+import os
+import threading
+import unicodedata
+from dataclasses import asdict, dataclass
+from typing import Collection, Dict, Iterable, List, Set, Tuple
+
+from app.csv_import import normalize_text, song_key
+
+INDEX_FILE_NAME = "song_index.jsonl"
+
+# the number of suggestions of a prefix
+MAX_SUGGESTIONS = 10
+
+# up to this many songs added together are inserted one by one in the sorted lists,
+# more than it are sorted with them
+BISECT_MAX_ITEMS = 32
+
+# the file is rewritten without the repeated songs when it has this many more lines
+# than songs
+COMPACT_AFTER_LINES = 1000
+
+
+def default_index_path() -> str:
+    """
+    Returns the path of the index in the settings folder.
+
+    :return (str): the path of the index.
+    """
+    return os.path.join(os.getcwd(), "settings", INDEX_FILE_NAME)
+
+
+def fold_text(text: str) -> str:
+    """
+    Returns the text compared by the index: without accents, extra spaces and case.
+
+    :param text (str): the text.
+
+    :return (str): the folded text.
+    """
+    return "".join(
+        character
+        for character in unicodedata.normalize("NFD", normalize_text(text).casefold())
+        if not unicodedata.combining(character)
+    )
+
+
+@dataclass(frozen=True)
+class SongEntry:
+    """
+    This class represents a song of the index.
+
+    :param music: The name of the music.
+
+    :param singer: The name of the singer.
+
+    :param song_id: The id of the song on Genius, None if it was never searched.
+
+    :param image: The url of the song image on Genius.
+    """
+
+    music: str
+    singer: str
+    song_id: int | None = None
+    image: str = ""
+
+    def search_result(self) -> Dict:
+        """
+        Returns the song as a Genius search result (see search_music_lyric.find_song).
+
+        :return (Dict): the result.
+        """
+        return {
+            "id": self.song_id,
+            "title": self.music,
+            "primary_artist": {"name": self.singer},
+            "song_art_image_thumbnail_url": self.image,
+        }
+
+
+class SongIndex:
+    """
+    This class keeps the known songs and finds the ones that start with a prefix.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        :param path (str | None): The path of the index file, the settings folder by
+            default.
+        """
+        self.path = path or default_index_path()
+
+        self._entries: Dict[Tuple[str, str], SongEntry] = {}
+
+        # (folded music, key of the entry) and (folded singer, singer), sorted
+        self._musics: List[Tuple[str, Tuple[str, str]]] = []
+        self._singers: List[Tuple[str, str]] = []
+        self._singers_set: Set[Tuple[str, str]] = set()
+
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._load_thread: threading.Thread | None = None
+
+    def load_in_background(self) -> None:
+        """
+        Starts reading the index file on a thread, if it wasn't read yet.
+        """
+        with self._lock:
+            if self._load_thread is None:
+                self._load_thread = threading.Thread(
+                    target=self._load, name="SongIndex", daemon=True
+                )
+                self._load_thread.start()
+
+    def _ensure_loaded(self) -> None:
+        """
+        Waits for the index file to be read (it's read now if it wasn't started).
+        """
+        self.load_in_background()
+        self._loaded.wait()
+
+    def _load(self) -> None:
+        """
+        Reads the index file and sorts the songs.
+        """
+        entries: Dict[Tuple[str, str], SongEntry] = {}
+        line_count = 0
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as index_file:
+                for line in index_file:
+                    line_count += 1
+
+                    # a line cut by a crash is ignored
+                    try:
+                        entry = SongEntry(**json.loads(line))
+
+                    except (ValueError, TypeError):
+                        continue
+
+                    key = song_key(entry.music, entry.singer)
+
+                    # a song found on Genius isn't replaced by the same song of a CSV
+                    if entry.song_id is not None or key not in entries:
+                        entries[key] = entry
+
+        except OSError:
+            pass
+
+        with self._lock:
+            self._entries = entries
+
+            self._musics = sorted(
+                (fold_text(entry.music), key) for key, entry in self._entries.items()
+            )
+            self._singers_set = {
+                (fold_text(entry.singer), entry.singer)
+                for entry in self._entries.values()
+                if entry.singer
+            }
+            self._singers = sorted(self._singers_set)
+
+            if line_count > len(self._entries) + COMPACT_AFTER_LINES:
+                self._compact()
+
+        self._loaded.set()
+
+    def _compact(self) -> None:
+        """
+        Rewrites the index file with one line per song.
+        """
+        temporary_path = self.path + ".tmp"
+
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as index_file:
+                for entry in self._entries.values():
+                    index_file.write(json.dumps(asdict(entry)) + "\n")
+
+            os.replace(temporary_path, self.path)
+
+        except OSError:
+            pass
+
+    def add_song(
+        self, music: str, singer: str, song_id: int | None = None, image: str = ""
+    ) -> None:
+        """
+        Adds a song to the index (and to its file).
+
+        :param music (str): the name of the music.
+        :param singer (str): the name of the singer.
+        :param song_id (int | None): the id of the song on Genius.
+        :param image (str): the url of the song image on Genius.
+        """
+        self.add_songs([SongEntry(music, singer, song_id, image)])
+
+    def add_songs(self, songs: Iterable[SongEntry]) -> None:
+        """
+        Adds songs to the index (and to its file), the songs already known are ignored
+        (unless the new one has the Genius id).
+
+        :param songs (Iterable[SongEntry]): the songs.
+        """
+        self._ensure_loaded()
+
+        lines = []
+        new_musics, new_singers = [], set()
+
+        with self._lock:
+            for entry in songs:
+                entry = SongEntry(
+                    normalize_text(entry.music),
+                    normalize_text(entry.singer),
+                    entry.song_id,
+                    entry.image,
+                )
+
+                if not entry.music:
+                    continue
+
+                key = song_key(entry.music, entry.singer)
+                known_entry = self._entries.get(key)
+
+                if known_entry == entry or (
+                    known_entry is not None and entry.song_id is None
+                ):
+                    continue
+
+                if known_entry is None:
+                    new_musics.append((fold_text(entry.music), key))
+
+                if entry.singer:
+                    new_singers.add((fold_text(entry.singer), entry.singer))
+
+                self._entries[key] = entry
+                lines.append(json.dumps(asdict(entry)) + "\n")
+
+            new_singers.difference_update(self._singers_set)
+            self._singers_set.update(new_singers)
+
+            self._insert_sorted(self._musics, new_musics)
+            self._insert_sorted(self._singers, new_singers)
+
+            if lines:
+                try:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+                    with open(self.path, "a", encoding="utf-8") as index_file:
+                        index_file.writelines(lines)
+
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _insert_sorted(items: List, new_items: Collection) -> None:
+        """
+        Inserts items in a sorted list of the index, keeping it sorted.
+
+        :param items (List): the sorted list (_musics or _singers).
+        :param new_items (Collection): the items to insert.
+        """
+        # a few items are inserted in their places, many are sorted together
+        # (e.g. a chunk of a CSV)
+        if len(new_items) <= BISECT_MAX_ITEMS:
+            for item in new_items:
+                bisect.insort(items, item)
+
+        else:
+            items.extend(new_items)
+            items.sort()
+
+    def find(self, music: str, singer: str) -> SongEntry | None:
+        """
+        Returns the song with this music and singer (see csv_import.song_key).
+
+        :param music (str): the name of the music.
+        :param singer (str): the name of the singer.
+
+        :return (SongEntry | None): the song, None if it isn't in the index.
+        """
+        self._ensure_loaded()
+
+        with self._lock:
+            return self._entries.get(song_key(music, singer))
+
+    def suggest_songs(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[SongEntry]:
+        """
+        Returns the songs whose music starts with the prefix.
+        Empty while the index file is being read (it never waits).
+
+        :param prefix (str): the typed text.
+        :param limit (int): the maximum number of songs.
+
+        :return (List[SongEntry]): the songs, in alphabetical order.
+        """
+        prefix = fold_text(prefix)
+
+        if not prefix or not self._loaded.is_set():
+            return []
+
+        with self._lock:
+            position = bisect.bisect_left(self._musics, (prefix,))
+            songs = []
+
+            for folded_music, key in self._musics[position : position + limit]:
+                if not folded_music.startswith(prefix):
+                    break
+
+                songs.append(self._entries[key])
+
+            return songs
+
+    def suggest_singers(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[str]:
+        """
+        Returns the singers whose name starts with the prefix.
+        Empty while the index file is being read (it never waits).
+
+        :param prefix (str): the typed text.
+        :param limit (int): the maximum number of singers.
+
+        :return (List[str]): the singers, in alphabetical order.
+        """
+        prefix = fold_text(prefix)
+
+        if not prefix or not self._loaded.is_set():
+            return []
+
+        with self._lock:
+            position = bisect.bisect_left(self._singers, (prefix,))
+
+            return [
+                singer
+                for folded_singer, singer in self._singers[position : position + limit]
+                if folded_singer.startswith(prefix)
+            ]
+
+    def __len__(self) -> int:
+        """
+        :return (int): the number of songs.
+        """
+        with self._lock:
+            return len(self._entries)
+
+
+# the index of the application, shared by the pages and the searches
+song_index = SongIndex()
@@ -0,0 +1,228 @@
+"""
+This module contains the TemplatePool class.
+
+Creating a presentation with Presentation() unzips and parses the whole template
+(the default one of python-pptx has a master, 11 layouts and a theme) before any slide
+is added. The pool parses each template once per process and hands out clones of it:
+only the presentation part (the list of slides) and the core properties are copied,
+the master, layouts, theme and other parts are shared by all the clones, as they are
+only read when the slides are added and saved.
+
+Besides the default template, a presentation can use a master saved by the user as
+a .pptx in "app/slides styles" (its slides are ignored, only its master, layouts and
+theme are used).
+"""
+
+import copy
+import os
+import threading
+from typing import Dict, Tuple
+
+from pptx import Presentation
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.parts.coreprops import CorePropertiesPart
+from pptx.parts.presentation import PresentationPart
+from pptx.presentation import Presentation as PresentationType
+from pptx.slide import SlideLayout
+
+TEMPLATES_FOLDER = os.path.join("app", "slides styles")
+
+# the placeholders a blank layout can have (they are only shown if filled)
+BLANK_PLACEHOLDERS = (
+    PP_PLACEHOLDER.DATE,
+    PP_PLACEHOLDER.FOOTER,
+    PP_PLACEHOLDER.SLIDE_NUMBER,
+)
+
+
+def template_path(template_name: str) -> str:
+    """
+    Returns the path of a template saved by the user.
+
+    :param template_name (str): the name of the template, with or without ".pptx".
+
+    :return (str): the path, "" for the default template.
+    """
+    if not template_name:
+        return ""
+
+    if not template_name.lower().endswith(".pptx"):
+        template_name += ".pptx"
+
+    return os.path.join(os.getcwd(), TEMPLATES_FOLDER, template_name)
+
+
+def template_signature(template_name: str) -> str:
+    """
+    Returns a value that changes when the template file changes
+    (part of the fingerprint of the presentations that use it).
+
+    :param template_name (str): the name of the template.
+
+    :return (str): the modification time and size of the file, "" for the default template.
+    """
+    path = template_path(template_name)
+
+    if not path:
+        return ""
+
+    try:
+        template_stat = os.stat(path)
+
+    except OSError:
+        return ""
+
+    return f"{template_stat.st_mtime_ns}:{template_stat.st_size}"
+
+
+def song_layouts(presentation: PresentationType) -> Tuple[SlideLayout, SlideLayout]:
+    """
+    Returns the layouts used by the slides of a song: the title slide needs a title and
+    a subtitle (the placeholder 1), the lyric slides are blank.
+    On the default template they are the layouts 0 and 6.
+
+    :param presentation (PresentationType): the presentation.
+
+    :return: the title layout and the lyric layout.
+    """
+    layouts = list(presentation.slide_layouts)
+
+    title_layout = blank_layout = None
+
+    for layout in layouts:
+        placeholders = [
+            (placeholder.placeholder_format.type, placeholder.placeholder_format.idx)
+            for placeholder in layout.placeholders
+        ]
+
+        if title_layout is None and any(
+            placeholder_type in (PP_PLACEHOLDER.CENTER_TITLE, PP_PLACEHOLDER.TITLE)
+            for placeholder_type, _ in placeholders
+        ) and any(idx == 1 for _, idx in placeholders):
+            title_layout = layout
+
+        elif blank_layout is None and all(
+            placeholder_type in BLANK_PLACEHOLDERS
+            for placeholder_type, _ in placeholders
+        ):
+            blank_layout = layout
+
+    return (
+        title_layout or layouts[0],
+        blank_layout or layouts[min(6, len(layouts) - 1)],
+    )
+
+
+class _Template:
+    """
+    A parsed template and the parts shared by its clones.
+    """
+
+    def __init__(self, path: str, signature: Tuple[int, int]) -> None:
+        """
+        Parses the template.
+
+        :param path (str): the path of the template, "" for the default one.
+        :param signature (Tuple[int, int]): the modification time and size of the file.
+        """
+        self.presentation = Presentation(path or None)
+        self.signature = signature
+
+        if path:
+            self._remove_slides()
+
+        # deepcopy doesn't copy the objects already in its memo, so every part except
+        # the ones changed by a new presentation is shared
+        self.shared_parts = {
+            id(part): part
+            for part in self.presentation.part.package.iter_parts()
+            if not isinstance(part, (PresentationPart, CorePropertiesPart))
+        }
+
+    def _remove_slides(self) -> None:
+        """
+        Removes the slides of a template saved by the user, only its master is used.
+        The slide parts are no longer related to the presentation, so they aren't saved.
+        """
+        presentation_part = self.presentation.part
+        slide_id_list = presentation_part._element.get_or_add_sldIdLst()
+
+        for slide_id in list(slide_id_list):
+            slide_id_list.remove(slide_id)
+            presentation_part.drop_rel(slide_id.rId)
+
+    def clone(self) -> PresentationType:
+        """
+        Returns a new empty presentation with the template.
+
+        :return (PresentationType): the presentation.
+        """
+        # the memo is changed by deepcopy, each clone uses its own copy
+        return copy.deepcopy(self.presentation, dict(self.shared_parts))
+
+
+class TemplatePool:
+    """
+    This class keeps the parsed templates and creates the presentations from them.
+    A template saved by the user is parsed again when its file changes.
+    """
+
+    def __init__(self) -> None:
+        """
+        Creates the empty pool, the templates are parsed on their first use.
+        """
+        self._templates: Dict[str, _Template] = {}
+        self._lock = threading.Lock()
+
+    def _template(self, template_name: str) -> _Template:
+        """
+        Returns the parsed template, parsing it if needed.
+
+        :param template_name (str): the name of the template, "" for the default one.
+
+        :return (_Template): the template (the default one if the file doesn't exist).
+        """
+        path = template_path(template_name)
+        signature = (0, 0)
+
+        if path:
+            try:
+                template_stat = os.stat(path)
+                signature = (template_stat.st_mtime_ns, template_stat.st_size)
+
+            # the template was deleted, the default one is used
+            except OSError:
+                path = ""
+
+        template = self._templates.get(path)
+
+        if template is not None and template.signature == signature:
+            return template
+
+        with self._lock:
+            template = self._templates.get(path)
+
+            if template is None or template.signature != signature:
+                template = _Template(path, signature)
+                self._templates[path] = template
+
+        return template
+
+    def new_presentation(self, template_name: str = "") -> PresentationType:
+        """
+        Creates an empty presentation.
+
+        :param template_name (str): the name of a .pptx in "app/slides styles"
+            whose master is used, "" for the default template of python-pptx.
+
+        :return (PresentationType): the presentation.
+        """
+        template = self._template(template_name)
+
+        # the lazy properties of python-pptx are cached on the first access,
+        # so the template is cloned by one thread at a time
+        with self._lock:
+            return template.clone()
+
+
+template_pool = TemplatePool()
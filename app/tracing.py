@@ -0,0 +1,194 @@
+"""
+This module contains the timing instrumentation used to find where a slide creation spends its time.
+
+Each song processed gets a timing record made of named spans (genius search, lyrics fetch,
+thumbnail download, slides build and save), the records are appended to a rotating JSONL log.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+LOG_FOLDER = os.path.join(os.getcwd(), "settings", "logs")
+LOG_FILE_NAME = "timings.jsonl"
+MAX_LOG_BYTES = 1_000_000
+MAX_LOG_BACKUPS = 3
+
+
+class Tracer:
+    """
+    This class collects the timing spans of the song that is being processed on each thread.
+
+    A record is started with begin, the spans are accumulated while it is open and end
+    finishes it, writing it to the JSONL log. Spans opened without a record are ignored.
+    """
+
+    def __init__(
+        self,
+        log_folder: str = LOG_FOLDER,
+        max_bytes: int = MAX_LOG_BYTES,
+        backups: int = MAX_LOG_BACKUPS,
+    ) -> None:
+        """
+        Creates the tracer.
+
+        :param log_folder (str): the folder where the JSONL log is written.
+        :param max_bytes (int): the size that makes the log rotate.
+        :param backups (int): how many rotated logs are kept.
+        """
+        self.log_folder = log_folder
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def begin(self, **infos: str) -> None:
+        """
+        Starts the timing record of the current thread.
+
+        :param infos (str): the infos saved with the record (music, singer, method...).
+        """
+        self._local.record = {
+            "started_at": time.time(),
+            **infos,
+            "stages": {},
+        }
+        self._local.stack = []
+        self._local.start = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Measures the time spent inside the with block and adds it to the current record.
+        The same span name can be used many times, its durations are summed.
+        The time of a span opened inside another one is not counted on the outer span,
+        so the stages of a record never overlap.
+
+        :param name (str): the name of the stage.
+        """
+        record = getattr(self._local, "record", None)
+
+        if record is None:
+            yield
+            return
+
+        # each item is the time spent on the children of an open span
+        stack = self._local.stack
+        stack.append(0.0)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children_time = stack.pop()
+
+            stages = record["stages"]
+            stages[name] = stages.get(name, 0.0) + elapsed - children_time
+
+            if stack:
+                stack[-1] += elapsed
+
+    def annotate(self, **infos: str | int | float | bool) -> None:
+        """
+        Adds infos to the current record, if there is one.
+
+        :param infos: the infos to add.
+        """
+        record = getattr(self._local, "record", None)
+
+        if record is not None:
+            record.update(infos)
+
+    def end(self, status: str = "ok") -> Dict | None:
+        """
+        Finishes the current record and writes it to the log.
+
+        :param status (str): the result of the operation ("ok", "not_found", "error"...).
+
+        :return: the finished record or None if no record was started.
+        """
+        record = getattr(self._local, "record", None)
+
+        if record is None:
+            return None
+
+        record["status"] = status
+        record["total"] = round(time.perf_counter() - self._local.start, 4)
+        record["stages"] = {
+            name: round(seconds, 4) for name, seconds in record["stages"].items()
+        }
+
+        self._local.record = None
+
+        self._write(record)
+
+        return record
+
+    def _write(self, record: Dict) -> None:
+        """
+        Appends the record to the JSONL log, rotating it when its too big.
+        A failure to write the log never stops the slides creation.
+
+        :param record (Dict): the record to write.
+        """
+        log_path = os.path.join(self.log_folder, LOG_FILE_NAME)
+
+        with self._write_lock:
+            try:
+                os.makedirs(self.log_folder, exist_ok=True)
+
+                if (
+                    os.path.exists(log_path)
+                    and os.path.getsize(log_path) >= self.max_bytes
+                ):
+                    self._rotate(log_path)
+
+                with open(log_path, "a", encoding="utf-8") as log:
+                    log.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            except OSError:
+                pass
+
+    def _rotate(self, log_path: str) -> None:
+        """
+        Rotates the log: timings.jsonl -> timings.jsonl.1 -> timings.jsonl.2 ...
+
+        :param log_path (str): the path of the current log.
+        """
+        oldest = f"{log_path}.{self.backups}"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{log_path}.{i}"):
+                os.replace(f"{log_path}.{i}", f"{log_path}.{i + 1}")
+
+        os.replace(log_path, f"{log_path}.1")
+
+
+def summarize_records(records: List[Dict]) -> Dict[str, float]:
+    """
+    Sums the time of each stage of the records.
+
+    :param records (List[Dict]): the timing records.
+
+    :return: the total seconds spent on each stage, including the "total" key.
+    """
+    summary: Dict[str, float] = {}
+
+    for record in records:
+        for name, seconds in record["stages"].items():
+            summary[name] = summary.get(name, 0.0) + seconds
+
+        summary["total"] = summary.get("total", 0.0) + record["total"]
+
+    return summary
+
+
+# the instance shared by the whole application
+tracer = Tracer()
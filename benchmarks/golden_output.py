@@ -0,0 +1,505 @@
+"""
+This module contains the golden output harness of the renderers.
+
+It renders a corpus of songs with the styles of "app/slides styles" (and a few more),
+with and without images, through create_slides with the python-pptx backend (the
+reference, the slides the app always created) and through the faster paths:
+    - ooxml: the "ooxml" backend of create_slides (app.ooxml_writer);
+    - restyle: a presentation created with the default style, restyled in place to the
+      style (app.restyle), when the restyle can be done.
+
+The lyrics are recorded in benchmarks/fixtures/golden_songs.json (in the format
+search_lyrics returns), so it runs offline.
+
+The presentations aren't compared byte by byte: the XML of each slide is canonicalized
+(the ids and names of the shapes, the relationship ids and the names of the parts are
+ignored, the images are compared by their hash) and the core properties (timestamps)
+aren't compared. Each difference is reported by kind (text, fonts, colours, geometry,
+media, paragraphs, structure) and the exit status is 1 if any case diverges.
+
+Run it from the project folder:
+    python -m benchmarks.golden_output
+    python -m benchmarks.golden_output --paths ooxml --verbose
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import sys
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from io import BytesIO
+from itertools import product
+from typing import Dict, Iterator, List, Tuple
+
+from lxml import etree
+from PIL import Image
+from pptx.enum.text import PP_PARAGRAPH_ALIGNMENT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from app.create_pptx import SlidesConfig, create_slides
+from app.restyle import restyle_presentation
+from app.template_pool import TEMPLATES_FOLDER
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "golden_songs.json")
+
+PATHS = ("ooxml", "restyle")
+
+METHODS = ("page_one", "page_insert_manually")
+
+RELATIONSHIPS_NAMESPACE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+)
+
+# the attributes that only identify a shape, they change with the order it was added
+SHAPE_IDENTIFIERS = ("id", "name")
+
+# the kind of a difference, by the element or attribute where it is
+TEXT_TAGS = ("t", "br", "fld")
+FONT_TAGS = ("latin", "ea", "cs", "sym")
+FONT_ATTRIBUTES = ("sz", "b", "i", "u", "strike", "baseline", "cap", "spc", "kern")
+COLOUR_TAGS = ("srgbClr", "schemeClr", "sysClr", "prstClr", "scrgbClr", "hslClr")
+GEOMETRY_TAGS = ("off", "ext", "xfrm", "sldSz")
+GEOMETRY_ATTRIBUTES = ("lIns", "tIns", "rIns", "bIns", "wrap", "anchor")
+PARAGRAPH_TAGS = ("pPr", "lnSpc", "spcBef", "spcAft", "spcPts", "spcPct")
+
+
+@dataclass
+class CaseResult:
+    """
+    The comparison of a presentation with its reference.
+
+    :param name: the song, style, images and method of the case.
+    :param path: the path compared with the reference.
+    :param differences: each difference (kind, key, reference value, path value).
+    :param skipped: why the path couldn't render the case, "" if it did.
+    """
+
+    name: str
+    path: str
+    differences: List[Tuple[str, str, str, str]] = field(default_factory=list)
+    skipped: str = ""
+
+
+def load_songs(path: str = FIXTURES_PATH) -> List[Dict]:
+    """
+    Loads the recorded songs.
+
+    :param path (str): the fixtures file.
+
+    :return: the songs (music, singer and lyric, the first strophe is the title slide).
+    """
+    with open(path, encoding="utf-8") as fixtures_file:
+        return json.load(fixtures_file)
+
+
+def load_styles() -> Dict[str, SlidesConfig]:
+    """
+    Loads the styles of "app/slides styles" and adds the default one and a style with
+    the options the saved styles don't use (autofit, bold, left alignment).
+
+    :return: the styles by name.
+    """
+    styles = {
+        "default": SlidesConfig(),
+        "autofit": SlidesConfig(
+            background_color_RGB=(16, 32, 64),
+            title_font_isbold=True,
+            text_font_isbold=True,
+            text_font_alignment=PP_PARAGRAPH_ALIGNMENT.LEFT,
+            text_font_space_before_PT=6,
+            text_font_space_after_PT=3,
+            text_font_autofit=True,
+        ),
+    }
+
+    for file_name in sorted(os.listdir(TEMPLATES_FOLDER)):
+        if file_name.lower().endswith(".json"):
+            style_path = os.path.join(TEMPLATES_FOLDER, file_name)
+
+            with open(style_path, encoding="utf-8") as style_file:
+                styles[file_name[:-5]] = SlidesConfig(**json.load(style_file))
+
+    return styles
+
+
+def _image(size: Tuple[int, int], image_format: str, color: Tuple) -> bytes:
+    """
+    Creates a gradient image (always the same bytes).
+
+    :param size (Tuple[int, int]): the width and height.
+    :param image_format (str): the PIL format.
+    :param color (Tuple): the color at the right side.
+
+    :return (bytes): the image.
+    """
+    gradient = Image.linear_gradient("L").rotate(90).resize(size)
+    image = Image.merge(
+        "RGB",
+        [
+            gradient.point(lambda value, channel=channel: value * channel // 255)
+            for channel in color
+        ],
+    )
+
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+
+    return buffer.getvalue()
+
+
+def load_images() -> Dict[str, Tuple[bytes | None, bytes | None]]:
+    """
+    :return: the song image and the background image of each case, by name.
+    """
+    return {
+        "no images": (None, None),
+        "images": (
+            _image((300, 200), "JPEG", (200, 120, 40)),
+            _image((320, 180), "PNG", (40, 80, 160)),
+        ),
+    }
+
+
+def _relationships(
+    package: zipfile.ZipFile, part_name: str
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Returns the relationships of a part.
+
+    :param package (ZipFile): the presentation.
+    :param part_name (str): the name of the part.
+
+    :return: the type and the name of the target of each relationship, by id.
+    """
+    folder, file_name = posixpath.split(part_name)
+    rels_name = posixpath.join(folder, "_rels", file_name + ".rels")
+
+    if rels_name not in package.namelist():
+        return {}
+
+    return {
+        relationship.get("Id"): (
+            relationship.get("Type"),
+            posixpath.normpath(posixpath.join(folder, relationship.get("Target"))),
+        )
+        for relationship in etree.fromstring(package.read(rels_name))
+    }
+
+
+def _target(package: zipfile.ZipFile, relationship_type: str, target_name: str) -> str:
+    """
+    Returns what a relationship points to, without the name of the part.
+
+    :param package (ZipFile): the presentation.
+    :param relationship_type (str): the type of the relationship.
+    :param target_name (str): the name of the target part.
+
+    :return (str): the hash of an image, the type of the relationship for other parts.
+    """
+    if relationship_type == RT.IMAGE:
+        return "sha256:" + hashlib.sha256(package.read(target_name)).hexdigest()
+
+    return posixpath.basename(relationship_type)
+
+
+def _canonical_xml(
+    package: zipfile.ZipFile, part_name: str, prefix: str
+) -> Iterator[Tuple[str, str]]:
+    """
+    Flattens the XML of a part to keys (the path of each element and attribute) and
+    values, without the identifiers of the shapes, with the images as their hash.
+
+    :param package (ZipFile): the presentation.
+    :param part_name (str): the name of the part.
+    :param prefix (str): the start of the keys.
+
+    :return: the keys and values.
+    """
+    relationships = _relationships(package, part_name)
+
+    def canonical(element: etree._Element, path: str) -> Iterator[Tuple[str, str]]:
+        counts: Dict[str, int] = {}
+
+        for child in element:
+            # comments and processing instructions
+            if not isinstance(child.tag, str):
+                continue
+
+            tag = etree.QName(child).localname
+            child_path = f"{path}/{tag}[{counts.get(tag, 0)}]"
+            counts[tag] = counts.get(tag, 0) + 1
+
+            yield child_path, child.text or ""
+
+            for name, value in child.attrib.items():
+                attribute = etree.QName(name)
+
+                if tag == "cNvPr" and attribute.localname in SHAPE_IDENTIFIERS:
+                    continue
+
+                if (
+                    attribute.namespace == RELATIONSHIPS_NAMESPACE
+                    and value in relationships
+                ):
+                    value = _target(package, *relationships[value])
+
+                yield f"{child_path}@{attribute.localname}", value
+
+            yield from canonical(child, child_path)
+
+    yield from canonical(etree.fromstring(package.read(part_name)), prefix)
+
+
+def canonical_presentation(path: str) -> Dict[str, str]:
+    """
+    Canonicalizes a presentation: the size of the slides, and the XML and layout of each
+    slide (see _canonical_xml).
+
+    :param path (str): the path of the presentation.
+
+    :return: the canonical keys and values.
+    """
+    entries: Dict[str, str] = {}
+
+    with zipfile.ZipFile(path) as package:
+        presentation_name = next(
+            target_name
+            for relationship_type, target_name in _relationships(package, "").values()
+            if relationship_type == RT.OFFICE_DOCUMENT
+        )
+        presentation = etree.fromstring(package.read(presentation_name))
+        presentation_relationships = _relationships(package, presentation_name)
+
+        for size in presentation.iter("{*}sldSz"):
+            entries["sldSz@cx"] = size.get("cx", "")
+            entries["sldSz@cy"] = size.get("cy", "")
+
+        slide_ids = list(presentation.iter("{*}sldId"))
+        entries["slides"] = str(len(slide_ids))
+
+        for number, slide_id in enumerate(slide_ids, 1):
+            _, slide_name = presentation_relationships[
+                slide_id.get(f"{{{RELATIONSHIPS_NAMESPACE}}}id")
+            ]
+
+            # the layout is compared by its name, not by the name of its part
+            for relationship_type, target_name in _relationships(
+                package, slide_name
+            ).values():
+                if relationship_type == RT.SLIDE_LAYOUT:
+                    layout = etree.fromstring(package.read(target_name))
+                    entries[f"slide {number}/layout"] = next(
+                        (data.get("name", "") for data in layout.iter("{*}cSld")), ""
+                    )
+
+            entries.update(_canonical_xml(package, slide_name, f"slide {number}"))
+
+    return entries
+
+
+def _kind(key: str) -> str:
+    """
+    Returns the kind of a difference.
+
+    :param key (str): the canonical key.
+
+    :return (str): text, fonts, colours, geometry, media, paragraphs or structure.
+    """
+    element, _, attribute = key.rpartition("/")[2].partition("@")
+    tag = element.split("[")[0]
+
+    if attribute in ("embed", "link"):
+        return "media"
+
+    if tag in TEXT_TAGS:
+        return "text"
+
+    if tag in FONT_TAGS or attribute in FONT_ATTRIBUTES:
+        return "fonts"
+
+    if tag in COLOUR_TAGS:
+        return "colours"
+
+    if tag in GEOMETRY_TAGS or attribute in GEOMETRY_ATTRIBUTES:
+        return "geometry"
+
+    if tag in PARAGRAPH_TAGS:
+        return "paragraphs"
+
+    return "structure"
+
+
+def compare(reference_path: str, path: str) -> List[Tuple[str, str, str, str]]:
+    """
+    Compares a presentation with its reference.
+
+    :param reference_path (str): the presentation of the reference.
+    :param path (str): the presentation compared.
+
+    :return: each difference (kind, key, reference value, value), "<missing>" if the
+        key is only in one of them.
+    """
+    reference = canonical_presentation(reference_path)
+    other = canonical_presentation(path)
+
+    return [
+        (
+            _kind(key),
+            key,
+            reference.get(key, "<missing>"),
+            other.get(key, "<missing>"),
+        )
+        for key in sorted(reference.keys() | other.keys())
+        if reference.get(key) != other.get(key)
+    ]
+
+
+def _render(
+    folder: str,
+    song: Dict,
+    slides_config: SlidesConfig,
+    method: str,
+    images: Tuple[bytes | None, bytes | None],
+    backend: str = "python-pptx",
+) -> str:
+    """
+    Renders a song with create_slides.
+
+    :return (str): the path of the presentation.
+    """
+    image, background_image = images
+
+    _, file_name, _ = create_slides(
+        None,
+        song["music"],
+        song["singer"],
+        list(song["lyric"]),
+        slides_config,
+        folder,
+        method,
+        image=BytesIO(image) if image else None,
+        background_image=BytesIO(background_image) if background_image else None,
+        backend=backend,  # type: ignore
+    )
+
+    return os.path.join(folder, file_name)
+
+
+def run_cases(paths: Tuple[str, ...]) -> Iterator[CaseResult]:
+    """
+    Renders every case through the reference and the paths and compares them.
+
+    :param paths (Tuple[str, ...]): the paths compared (see PATHS).
+
+    :return: the result of each case and path.
+    """
+    songs = load_songs()
+    styles = load_styles()
+    images_cases = load_images()
+
+    with tempfile.TemporaryDirectory(prefix="golden_output_") as temporary_folder:
+        folders = {
+            name: os.path.join(temporary_folder, name)
+            for name in ("reference", "source") + paths
+        }
+
+        for folder in folders.values():
+            os.makedirs(folder)
+
+        for song, (style_name, slides_config), (images_name, images), method in product(
+            songs, styles.items(), images_cases.items(), METHODS
+        ):
+            name = f"{song['music']} / {style_name} / {images_name} / {method}"
+
+            reference_path = _render(
+                folders["reference"], song, slides_config, method, images
+            )
+
+            for path in paths:
+                result = CaseResult(name, path)
+
+                if path == "ooxml":
+                    path_file = _render(
+                        folders[path], song, slides_config, method, images, "ooxml"
+                    )
+
+                else:
+                    # a presentation of the default style is restyled
+                    source_path = _render(
+                        folders["source"], song, SlidesConfig(), method, images
+                    )
+                    file_name = os.path.basename(source_path)
+                    path_file = os.path.join(folders[path], file_name)
+
+                    if not restyle_presentation(
+                        source_path, folders[path], file_name, slides_config
+                    ):
+                        result.skipped = "left to create_slides"
+                        yield result
+                        continue
+
+                result.differences = compare(reference_path, path_file)
+                yield result
+
+
+def main() -> None:
+    """
+    Runs the harness, prints the differences and exits with 1 if any case diverges.
+    """
+    parser = argparse.ArgumentParser(
+        description="Music PPTX Creator golden output harness"
+    )
+    parser.add_argument(
+        "--paths",
+        nargs="+",
+        choices=PATHS,
+        default=list(PATHS),
+        help="the paths compared with the reference",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print every difference of each case"
+    )
+    args = parser.parse_args()
+
+    totals = {path: {"cases": 0, "divergent": 0, "skipped": 0} for path in args.paths}
+
+    for result in run_cases(tuple(args.paths)):
+        total = totals[result.path]
+        total["cases"] += 1
+
+        if result.skipped:
+            total["skipped"] += 1
+            continue
+
+        if not result.differences:
+            continue
+
+        total["divergent"] += 1
+
+        kinds = sorted({kind for kind, *_ in result.differences})
+        print(
+            f"[{result.path}] {result.name}: {len(result.differences)} differences "
+            f"({', '.join(kinds)})"
+        )
+
+        for kind, key, reference_value, value in result.differences[
+            : None if args.verbose else 5
+        ]:
+            print(f"    {kind}: {key}: {reference_value!r} != {value!r}")
+
+    for path, total in totals.items():
+        print(
+            f"{path:>8}: {total['cases']} cases, {total['divergent']} divergent, "
+            f"{total['skipped']} skipped"
+        )
+
+    if any(total["divergent"] for total in totals.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
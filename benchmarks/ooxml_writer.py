@@ -0,0 +1,128 @@
+"""
+This module contains the benchmark of the backends of create_slides.
+
+It builds the presentation of a song with many slides (with a background image) with
+the python-pptx objects (add_song_slides) and with the XML written directly
+(app.ooxml_writer), and measures the time to build it and to build and save it
+(both are saved by app.package_writer, so the difference is only the slides).
+
+Run it from the project folder:
+    python -m benchmarks.ooxml_writer --slides 100 --runs 20
+"""
+
+import argparse
+import statistics
+import time
+from io import BytesIO
+from typing import Callable, List
+
+from PIL import Image
+
+from app.create_pptx import SlidesConfig, add_song_slides
+from app.ooxml_writer import render_song, save_parts
+from app.optimize_pptx import save_presentation
+from app.pagination import paginate_lyric
+from app.template_pool import template_pool
+
+STROPHE = "\n".join(f"verse {verse} of the strophe" for verse in range(1, 5))
+
+
+def background_image() -> bytes:
+    """
+    Creates a small PNG (the time to compress the images isn't part of the backends).
+
+    :return (bytes): the image.
+    """
+    buffer = BytesIO()
+    Image.new("RGB", (160, 90), (30, 60, 90)).save(buffer, format="PNG")
+
+    return buffer.getvalue()
+
+
+def measure(build: Callable[[], None], runs: int) -> List[float]:
+    """
+    Measures the time of each build.
+
+    :param build (Callable): builds (and saves) the presentation.
+    :param runs (int): the number of builds.
+
+    :return: the seconds of each build.
+    """
+    times = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        build()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Music PPTX Creator slides backends benchmark"
+    )
+    parser.add_argument("--slides", type=int, default=100, help="slides of the song")
+    parser.add_argument("--runs", type=int, default=20, help="builds per case")
+    args = parser.parse_args()
+
+    slides_config = SlidesConfig()
+    lyric = ["Song title"] + [STROPHE] * (args.slides - 1)
+    image = background_image()
+
+    def python_pptx(save: bool) -> None:
+        presentation = template_pool.new_presentation()
+        add_song_slides(
+            presentation,
+            lyric[0],
+            "Singer",
+            lyric,
+            slides_config,
+            "page_one",
+            background_image=BytesIO(image),
+        )
+
+        if save:
+            save_presentation(presentation, BytesIO())
+
+    def ooxml(save: bool) -> None:
+        pages = paginate_lyric(lyric, slides_config)
+        parts = render_song(
+            lyric[0],
+            "Singer",
+            pages,
+            [slides_config.text_font_size_PT] * len(pages),
+            slides_config,
+            "page_one",
+            background_image=image,
+        )
+
+        if save:
+            save_parts(parts, BytesIO())
+
+    # the first build parses the template, it isn't part of the results
+    python_pptx(False)
+    ooxml(False)
+
+    for save in (False, True):
+        print(f"{args.slides} slides, " + ("build + save:" if save else "build:"))
+
+        medians = []
+
+        for name, build in (("python-pptx", python_pptx), ("ooxml", ooxml)):
+            times = measure(lambda build=build: build(save), args.runs)
+            medians.append(statistics.median(times))
+
+            print(
+                f"  {name:>11}: median {medians[-1] * 1000:.1f} ms, "
+                f"best {min(times) * 1000:.1f} ms"
+            )
+
+        print(f"  {'speedup':>11}: {medians[0] / medians[1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+This module contains the save benchmark of the presentations.
+
+It builds a big setlist (many songs on the same presentation, with a background image)
+and measures the time to save it with Presentation.save (zipfile, one core, the images
+compressed again) and with app.optimize_pptx.save_presentation (app.package_writer:
+the images stored, the other parts compressed on a pool of threads) at a few levels.
+The same songs are also saved as the parts of a setlist (app.setlist, written by
+app.ooxml_writer), as the app saves the setlists.
+
+Run it from the project folder:
+    python -m benchmarks.package_writer --songs 30 --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import time
+from io import BytesIO
+from typing import Callable, List
+
+from PIL import Image
+
+from app.create_pptx import SlidesConfig, add_song_slides
+from app.ooxml_writer import save_parts
+from app.optimize_pptx import save_presentation
+from app.setlist import SetlistDeck
+from app.template_pool import template_pool
+
+LYRIC = ["Song title"] + [
+    "\n".join(f"verse {verse} of the strophe {strophe}" for verse in range(1, 5))
+    for strophe in range(1, 9)
+]
+
+
+def background_image() -> BytesIO:
+    """
+    Creates a noisy PNG of 1920x1080 (it's barely compressible, like a photo).
+
+    :return (BytesIO): the image.
+    """
+    image = Image.frombytes("RGB", (1920, 1080), os.urandom(1920 * 1080 * 3))
+
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    buffer.seek(0)
+
+    return buffer
+
+
+def measure(save: Callable[[BytesIO], None], runs: int) -> List[float]:
+    """
+    Measures the time of each save.
+
+    :param save (Callable): saves the presentation to the buffer.
+    :param runs (int): the number of saves.
+
+    :return: the seconds of each save.
+    """
+    times = []
+
+    for _ in range(runs):
+        buffer = BytesIO()
+
+        start = time.perf_counter()
+        save(buffer)
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(description="Music PPTX Creator save benchmark")
+    parser.add_argument("--songs", type=int, default=30, help="songs on the setlist")
+    parser.add_argument("--runs", type=int, default=5, help="saves per case")
+    args = parser.parse_args()
+
+    slides_config = SlidesConfig()
+    image = background_image()
+
+    # the setlist only keeps the XML of its slides, the python-pptx presentation with
+    # the same songs is built here
+    presentation = template_pool.new_presentation(slides_config.template_name)
+    setlist = SetlistDeck(slides_config, "", image)
+
+    for song in range(args.songs):
+        add_song_slides(
+            presentation,
+            f"{LYRIC[0]} {song}",
+            "Singer",
+            LYRIC,
+            slides_config,
+            "page_many",
+            background_image=image,
+        )
+        setlist.add_song(f"{LYRIC[0]} {song}", "Singer", LYRIC)
+
+    setlist_parts = setlist.deck.finish()
+
+    print(f"{len(presentation.slides)} slides:")
+
+    cases = (
+        [("Presentation.save", presentation.save)]
+        + [
+            (
+                f"package writer {level}",
+                lambda buffer, level=level: save_presentation(
+                    presentation, buffer, level
+                ),
+            )
+            for level in (1, 6, 9)
+        ]
+        + [
+            ("setlist parts", lambda buffer: save_parts(setlist_parts, buffer))
+        ]
+    )
+
+    for name, save in cases:
+        times = measure(save, args.runs)
+
+        buffer = BytesIO()
+        save(buffer)
+
+        print(
+            f"  {name:>18}: median {statistics.median(times) * 1000:.0f} ms, "
+            f"best {min(times) * 1000:.0f} ms, {len(buffer.getvalue()) / 1024:.0f} KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+This module contains the song index benchmark.
+
+It fills an index (app.song_index) with many random songs, measures the time to read its
+file when the application starts and the time of the suggestions of each prefix typed,
+letter by letter, as the user types the names on page one and page many.
+
+Run it from the project folder:
+    python -m benchmarks.song_index --songs 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from app.song_index import SongEntry, SongIndex
+
+
+def random_name(generator: random.Random) -> str:
+    """
+    Creates a random name of two to four words.
+
+    :param generator (Random): the random generator.
+
+    :return (str): the name.
+    """
+    letters = string.ascii_lowercase + "áéç"
+
+    return " ".join(
+        "".join(generator.choices(letters, k=generator.randint(3, 9)))
+        for _ in range(generator.randint(2, 4))
+    ).title()
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Music PPTX Creator song index benchmark"
+    )
+    parser.add_argument("--songs", type=int, default=100_000, help="songs of the index")
+    parser.add_argument("--queries", type=int, default=500, help="names typed")
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    singers = [random_name(generator) for _ in range(max(args.songs // 20, 1))]
+    songs = [
+        SongEntry(random_name(generator), generator.choice(singers), song_id)
+        for song_id in range(args.songs)
+    ]
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "song_index.jsonl")
+
+        start = time.perf_counter()
+        SongIndex(path).add_songs(songs)
+        print(f"{args.songs} songs added in {time.perf_counter() - start:.2f} s")
+
+        index = SongIndex(path)
+
+        start = time.perf_counter()
+        index.load_in_background()
+        index.find("", "")
+        print(f"index file read in {time.perf_counter() - start:.2f} s")
+
+        times = []
+
+        for song in generator.sample(songs, min(args.queries, len(songs))):
+            for length in range(1, len(song.music) + 1):
+                start = time.perf_counter()
+                index.suggest_songs(song.music[:length])
+                times.append(time.perf_counter() - start)
+
+        times.sort()
+
+        print(
+            f"suggestions of {len(times)} prefixes: "
+            f"median {statistics.median(times) * 1e6:.1f} us, "
+            f"p99 {times[int(len(times) * 0.99)] * 1e6:.1f} us, "
+            f"max {times[-1] * 1e6:.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
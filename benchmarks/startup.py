@@ -0,0 +1,102 @@
+"""
+This module contains the startup benchmark of the application.
+
+It starts the application on new python processes (cold start, nothing imported yet)
+and measures the time until the main window is shown. It fails (exit status 1) if a
+heavy module (python-pptx, PIL, requests, lyricsgenius) was imported at startup.
+
+Run it from the project folder:
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# the time the window should take to appear on a cold start
+TARGET_SECONDS = 1.0
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+
+import sys
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+
+from main import MusicPPTXCreator
+
+application = QApplication(sys.argv)
+music_pptx_creator_app = MusicPPTXCreator(application)
+music_pptx_creator_app.show()
+
+def window_shown():
+    print(time.perf_counter() - start)
+    heavy_modules = ("pptx", "PIL", "requests", "lyricsgenius")
+    print(",".join(module for module in heavy_modules if module in sys.modules))
+    application.quit()
+
+# runs when the event loop has painted the window
+QTimer.singleShot(0, window_shown)
+application.exec()
+"""
+
+
+def measure_startup() -> tuple[float, str]:
+    """
+    Starts the application in a new process and measures the time to show the window.
+
+    :return: the seconds until the window was shown and the heavy modules imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    lines = result.stdout.splitlines()
+
+    return float(lines[0]), lines[1] if len(lines) > 1 else ""
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(description="Music PPTX Creator startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts")
+    args = parser.parse_args()
+
+    times = []
+    heavy_imported = set()
+
+    for run in range(1, args.runs + 1):
+        seconds, heavy_modules = measure_startup()
+        times.append(seconds)
+        heavy_imported.update(filter(None, heavy_modules.split(",")))
+
+        print(
+            f"run {run}: {seconds * 1000:.0f} ms"
+            + (f" (imported at startup: {heavy_modules})" if heavy_modules else "")
+        )
+
+    median = statistics.median(times)
+
+    print(
+        f"median: {median * 1000:.0f} ms, best: {min(times) * 1000:.0f} ms, "
+        f"target: {TARGET_SECONDS * 1000:.0f} ms -> "
+        + ("OK" if median < TARGET_SECONDS else "SLOW")
+    )
+
+    # the heavy modules must only be imported when they are used
+    if heavy_imported:
+        sys.exit(
+            f"FAIL: imported at startup: {','.join(sorted(heavy_imported))} "
+            "(import them inside the functions that use them)"
+        )
+
+
+if __name__ == "__main__":
+    main()
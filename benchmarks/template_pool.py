@@ -0,0 +1,111 @@
+"""
+This module contains the template pool benchmark.
+
+It measures the time to create the presentation of a song with Presentation()
+(the template is unzipped and parsed for every song) and with the template pool
+(the template is parsed once and cloned): only the empty presentation, and the whole deck
+(the empty presentation, the slides of a song and the save).
+
+Run it from the project folder:
+    python -m benchmarks.template_pool --decks 200
+    python -m benchmarks.template_pool --template "my master"
+"""
+
+import argparse
+import statistics
+import time
+from io import BytesIO
+from typing import Callable, List
+
+from pptx import Presentation
+from pptx.presentation import Presentation as PresentationType
+
+from app.create_pptx import SlidesConfig, add_song_slides
+from app.template_pool import template_path, template_pool
+
+LYRIC = ["Song title"] + [
+    "\n".join(f"verse {verse} of the strophe {strophe}" for verse in range(1, 5))
+    for strophe in range(1, 9)
+]
+
+
+def measure(
+    new_presentation: Callable[[], PresentationType], decks: int, whole_deck: bool
+) -> List[float]:
+    """
+    Measures the time to create each deck.
+
+    :param new_presentation (Callable): creates the empty presentation.
+    :param decks (int): the number of decks created.
+    :param whole_deck (bool): if True, the slides are added and the deck is saved.
+
+    :return: the seconds of each deck.
+    """
+    slides_config = SlidesConfig()
+    times = []
+
+    for _ in range(decks):
+        start = time.perf_counter()
+
+        presentation = new_presentation()
+
+        if whole_deck:
+            add_song_slides(
+                presentation,
+                LYRIC[0],
+                "Singer",
+                LYRIC,
+                slides_config,
+                "page_insert_manually",
+            )
+            presentation.save(BytesIO())
+
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Music PPTX Creator template pool benchmark"
+    )
+    parser.add_argument("--decks", type=int, default=200, help="decks created per case")
+    parser.add_argument(
+        "--template",
+        default="",
+        help='a .pptx in "app/slides styles" (the default template if not given)',
+    )
+    args = parser.parse_args()
+
+    path = template_path(args.template) or None
+
+    # the first clone parses the template, it isn't part of the results
+    template_pool.new_presentation(args.template)
+
+    cases = (
+        ("Presentation()", lambda: Presentation(path)),
+        ("template pool", lambda: template_pool.new_presentation(args.template)),
+    )
+
+    for whole_deck in (False, True):
+        print("whole deck (9 slides + save):" if whole_deck else "empty presentation:")
+
+        medians = []
+
+        for name, new_presentation in cases:
+            times = measure(new_presentation, args.decks, whole_deck)
+            medians.append(statistics.median(times))
+
+            print(
+                f"  {name:>15}: median {medians[-1] * 1000:.2f} ms, "
+                f"best {min(times) * 1000:.2f} ms"
+            )
+
+        print(f"  {'speedup':>15}: {medians[0] / medians[1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
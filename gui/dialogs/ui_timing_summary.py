@@ -0,0 +1,204 @@
+"""
+This module contains the code for the UITimingSummary class.
+
+It's used to show the time spent on each stage of each song at the end of a page many batch.
+"""
+
+from typing import Dict, List, Literal
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import (
+    QWidget,
+    QDialog,
+    QVBoxLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QPushButton,
+)
+
+from app.tracing import summarize_records
+
+# the stages in the order they happen, the stages not listed here are shown after them
+STAGES = [
+    "genius_search",
+    "lyrics_fetch",
+    "thumbnail_download",
+    "build_slides",
+    "save",
+]
+
+STAGES_NAMES = {
+    "pt": {
+        "genius_search": "Busca Genius",
+        "lyrics_fetch": "Letra",
+        "thumbnail_download": "Imagem",
+        "build_slides": "Slides",
+        "save": "Salvar",
+        "total": "Total",
+    },
+    "en": {
+        "genius_search": "Genius Search",
+        "lyrics_fetch": "Lyrics",
+        "thumbnail_download": "Thumbnail",
+        "build_slides": "Slides",
+        "save": "Save",
+        "total": "Total",
+    },
+}
+
+
+class UITimingSummary(QDialog):
+    """
+    This class is used to create the dialog with the timing table of a batch.
+    """
+
+    def __init__(
+        self,
+        timing_records: List[Dict],
+        language: Literal["pt", "en"] = "pt",
+        parent: QWidget | None = None,
+        reused: int = 0,
+    ) -> None:
+        """
+        Creates the timing summary dialog.
+
+        :param timing_records (List[Dict]): the timing records of the batch (see app.tracing).
+        :param language (Literal["pt", "en"]): the language to use.
+        :param parent (QWidget, optional): the parent widget.
+        :param reused (int): the number of unchanged presentations that were kept.
+        """
+        super().__init__(parent)
+
+        self.language = language
+        self.timing_records = timing_records
+        self.reused = reused
+
+        self.setObjectName("TimingSummary")
+        self.setMinimumSize(700, 350)
+
+        self.stages = STAGES + sorted(
+            {
+                stage
+                for record in timing_records
+                for stage in record["stages"]
+                if stage not in STAGES
+            }
+        )
+
+        # creates the vertical layout
+        self.vertical_layout = QVBoxLayout(self)
+        self.vertical_layout.setObjectName("vertical_layout")
+
+        # creates the title label
+        self.title_label = QLabel(self)
+        self.title_label.setObjectName("title_label")
+
+        self.vertical_layout.addWidget(self.title_label)
+
+        # creates the table, one row for each song plus the total row
+        self.table = QTableWidget(len(timing_records) + 1, len(self.stages) + 2, self)
+        self.table.setObjectName("table")
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+
+        self.vertical_layout.addWidget(self.table)
+
+        # creates the close button
+        self.close_button = QPushButton(self)
+        self.close_button.setObjectName("close_button")
+        self.close_button.clicked.connect(self.close)
+
+        self.vertical_layout.addWidget(self.close_button)
+
+        self._fill_table()
+
+        self.retranslate_ui()
+
+    def retranslate_ui(self) -> None:
+        """
+        Changes the text of the widgets.
+        """
+        names = STAGES_NAMES[self.language]
+
+        if self.language == "pt":
+            self.setWindowTitle("Tempo de cada etapa")
+
+            self.title_label.setText(
+                QCoreApplication.translate(
+                    "TimingSummary",
+                    "Tempo gasto em cada etapa (segundos):",
+                    None,
+                )
+                + (
+                    f"\n{self.reused} apresentações sem mudanças foram mantidas (=)"
+                    if self.reused
+                    else ""
+                )
+            )
+
+            headers = ["Música"]
+
+            self.close_button.setText("Fechar")
+
+        else:
+            self.setWindowTitle("Time of each stage")
+
+            self.title_label.setText(
+                QCoreApplication.translate(
+                    "TimingSummary",
+                    "Time spent on each stage (seconds):",
+                    None,
+                )
+                + (
+                    f"\n{self.reused} unchanged presentations were kept (=)"
+                    if self.reused
+                    else ""
+                )
+            )
+
+            headers = ["Music"]
+
+            self.close_button.setText("Close")
+
+        headers += [names.get(stage, stage) for stage in self.stages]
+        headers.append(names["total"])
+
+        self.table.setHorizontalHeaderLabels(headers)
+
+    def _fill_table(self) -> None:
+        """
+        Fills the table with the timing records and the total of each stage.
+        """
+        for row, record in enumerate(self.timing_records):
+            song = f"{record.get('music', '')} - {record.get('singer', '')}"
+
+            if record.get("status") != "ok":
+                song += " (X)"
+
+            elif record.get("reused"):
+                song += " (=)"
+
+            self._fill_row(row, song, {**record["stages"], "total": record["total"]})
+
+        self._fill_row(
+            len(self.timing_records), "TOTAL", summarize_records(self.timing_records)
+        )
+
+    def _fill_row(self, row: int, song: str, seconds: Dict[str, float]) -> None:
+        """
+        Fills a row of the table.
+
+        :param row (int): the row.
+        :param song (str): the text of the first column.
+        :param seconds (Dict[str, float]): the seconds of each stage.
+        """
+        self.table.setItem(row, 0, QTableWidgetItem(song))
+
+        for column, stage in enumerate(self.stages + ["total"], start=1):
+            self.table.setItem(
+                row, column, QTableWidgetItem(f"{seconds.get(stage, 0.0):.2f}")
+            )
@@ -20,6 +20,7 @@ from PySide6.QtWidgets import (
 )
 
 from gui.widgets.image_label import ImageLabel
+from gui.widgets.preview_strip import PreviewStrip
 from gui.widgets.slider import TransparencySlider
 from gui.widgets.text_edit import TextEdit
 from language_manager import LanguageManager
@@ -187,14 +188,20 @@ class PageInsertManually(QWidget):
             """
         )
 
-        self.grid_layout.addWidget(self.open_destiny_folder_button, 7, 0)
+        # creates the previews of the slides
+        self.preview_strip = PreviewStrip(self.frame)
+        self.preview_strip.setObjectName("preview_strip")
+
+        self.grid_layout.addWidget(self.preview_strip, 7, 0, 1, 2)
+
+        self.grid_layout.addWidget(self.open_destiny_folder_button, 8, 0)
 
         # creates confirm button
         self.confirm_button = QPushButton(self.frame)
         self.confirm_button.setObjectName("confirm_button")
         self.confirm_button.setMaximumHeight(30)
 
-        self.grid_layout.addWidget(self.confirm_button, 7, 1)
+        self.grid_layout.addWidget(self.confirm_button, 8, 1)
 
         self.vertical_layout.addWidget(
             self.frame,
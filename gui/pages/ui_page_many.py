@@ -16,6 +16,7 @@ from PySide6.QtWidgets import (
     QSizePolicy,
     QLabel,
     QPushButton,
+    QCheckBox,
 )
 
 
@@ -177,6 +178,23 @@ class PageMany(QWidget):
 
         self.grid_layout.addWidget(self.set_transparency_button, 6, 1)
 
+        # creates setlist check box (all the songs in a single presentation)
+        self.setlist_checkbox = QCheckBox(self.frame)
+        self.setlist_checkbox.setObjectName("setlist_checkbox")
+        self.setlist_checkbox.setMaximumHeight(30)
+
+        self.grid_layout.addWidget(self.setlist_checkbox, 7, 0)
+
+        # creates sections check box (one section for each song of the setlist)
+        self.sections_checkbox = QCheckBox(self.frame)
+        self.sections_checkbox.setObjectName("sections_checkbox")
+        self.sections_checkbox.setMaximumHeight(30)
+        self.sections_checkbox.setEnabled(False)
+
+        self.setlist_checkbox.toggled.connect(self.sections_checkbox.setEnabled)
+
+        self.grid_layout.addWidget(self.sections_checkbox, 7, 1)
+
         # creates open destiny folder button
         self.open_destiny_folder_button = QPushButton(self.frame)
         self.open_destiny_folder_button.setObjectName("open_destiny_folder_button")
@@ -188,14 +206,14 @@ class PageMany(QWidget):
             """
         )
 
-        self.grid_layout.addWidget(self.open_destiny_folder_button, 7, 0)
+        self.grid_layout.addWidget(self.open_destiny_folder_button, 8, 0)
 
         # creates confirm button
         self.confirm_button = QPushButton(self.frame)
         self.confirm_button.setObjectName("confirm_button")
         self.confirm_button.setMaximumHeight(30)
 
-        self.grid_layout.addWidget(self.confirm_button, 7, 1)
+        self.grid_layout.addWidget(self.confirm_button, 8, 1)
 
         self.vertical_layout.addWidget(
             self.frame,
@@ -308,6 +326,26 @@ class PageMany(QWidget):
                 )
             )
 
+            self.setlist_checkbox.setText(
+                QCoreApplication.translate(
+                    "PagesWidget", "Criar uma única apresentação (setlist)", None
+                )
+            )
+
+            self.setlist_checkbox.setToolTip(
+                "Todas as músicas são colocadas, em ordem, em uma só apresentação"
+            )
+
+            self.sections_checkbox.setText(
+                QCoreApplication.translate(
+                    "PagesWidget", "Separar as músicas em seções", None
+                )
+            )
+
+            self.sections_checkbox.setToolTip(
+                "Cada música fica em uma seção da apresentação, com o nome da música"
+            )
+
             self.open_destiny_folder_button.setText(
                 QCoreApplication.translate(
                     "PagesWidget", "Abrir pasta de destino", None
@@ -390,6 +428,26 @@ class PageMany(QWidget):
                 QCoreApplication.translate("PagesWidget", "Confirm Transparency", None)
             )
 
+            self.setlist_checkbox.setText(
+                QCoreApplication.translate(
+                    "PagesWidget", "Create a single presentation (setlist)", None
+                )
+            )
+
+            self.setlist_checkbox.setToolTip(
+                "All the songs are placed, in order, in a single presentation"
+            )
+
+            self.sections_checkbox.setText(
+                QCoreApplication.translate(
+                    "PagesWidget", "Split the songs in sections", None
+                )
+            )
+
+            self.sections_checkbox.setToolTip(
+                "Each song is in a section of the presentation, named after the song"
+            )
+
             self.open_destiny_folder_button.setText(
                 QCoreApplication.translate(
                     "PagesWidget", "Open Destination Folder", None
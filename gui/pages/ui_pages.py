@@ -3,23 +3,25 @@ This module contains the code for the pages widget.
 including its pages and its functions.
 """
 
-import csv
 import json
 from glob import glob
+from io import BytesIO
 import os
 import time
-from threading import Thread
-from typing import TYPE_CHECKING, Callable, List, Literal
+from threading import Event, Thread
+from typing import TYPE_CHECKING, Callable, Dict, List, Literal, Tuple
 
 from PySide6.QtCore import (
     QMetaObject,
     QCoreApplication,
+    QEvent,
     QObject,
     QPoint,
     Signal,
     QThread,
+    QTimer,
 )
-from PySide6.QtGui import Qt
+from PySide6.QtGui import QTextCursor, Qt
 from PySide6.QtWidgets import (
     QMainWindow,
     QApplication,
@@ -28,24 +30,46 @@ from PySide6.QtWidgets import (
     QFileDialog,
     QProgressDialog,
     QMessageBox,
-    QHeaderView,
     QLabel,
     QPushButton,
 )
 
 from dotenv import load_dotenv
 
-from app.create_pptx import create_slides, SlidesConfig
-from app.search_music_lyric import search_lyrics_on_genius
+from app.batch_journal import BatchJob, BatchJournal
+from app.csv_import import CsvImportReport, iter_csv_songs, normalize_text, song_key
+from app.lyric_library import lyric_library
+from app.output_writer import OutputWriter
+from app.profiler import profile_operation
+from app.render_client import (
+    RenderClient,
+    RenderDaemonError,
+    encode_image,
+    forget_availability,
+    render_client_from_settings,
+)
+from app.render_manifest import RenderManifest
+from app.song_index import SongEntry, song_index
+from app.tracing import tracer
+from gui.dialogs.ui_timing_summary import UITimingSummary
 from gui.pages.ui_page_insert_manually import PageInsertManually
 from gui.pages.ui_page_many import PageMany
 from gui.pages.ui_page_one import PageOne
 from gui.widgets.slider import TransparencySlider
+from gui.widgets.song_completer import SongCompleter
 from language_manager import LanguageManager
 
 if TYPE_CHECKING:
+    from app.setlist import SetlistDeck
     from gui.widgets.menu_bar import MenuBar
 
+# the interval between two status requests of the jobs sent to the render daemon
+DAEMON_POLL_INTERVAL_MS = 300
+
+# the time the music and singer of page one must stay unchanged before the song
+# is looked up in the background
+PREFETCH_DELAY_MS = 500
+
 
 class UiPagesWidget(object):
     """
@@ -73,6 +97,18 @@ class UiPagesWidget(object):
         self.worker_thread = None
         self.progress_dialog = None
 
+        self.csv_import_worker: WorkerCsvImport | None = None
+        self.csv_import_thread: QThread | None = None
+
+        # the jobs sent to the render daemon, with the client that sent them and the page
+        self.daemon_jobs: Dict[
+            str, Tuple[RenderClient, PageOne | PageMany | PageInsertManually]
+        ] = {}
+
+        self.daemon_poll_timer = QTimer(pages_widget)
+        self.daemon_poll_timer.setInterval(DAEMON_POLL_INTERVAL_MS)
+        self.daemon_poll_timer.timeout.connect(self._poll_daemon_jobs)
+
         self.language_manager = language_manager
         self.language_manager.language_changed.connect(self.retranslate_ui)
 
@@ -104,79 +140,209 @@ class UiPagesWidget(object):
 
         self.page_one.open_destiny_folder_button.clicked.connect(self._open_folder)
 
-        self.page_one.confirm_button.clicked.connect(
-            lambda: self._confirm(
-                self.page_one.confirm_button,
-                self.page_one,
-                self.page_one.music_line_edit.text(),
-                self.page_one.singer_line_edit.text(),
-            )
+        self.page_one.confirm_button.clicked.connect(self._confirm_page_one)
+
+        # the song is looked up while the user is still typing (see app.lookup),
+        # each change restarts the timer
+        self.prefetch_timer = QTimer(pages_widget)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self._prefetch_page_one)
+
+        self.page_one.music_line_edit.textChanged.connect(
+            lambda: self.prefetch_timer.start()
         )
+        self.page_one.singer_line_edit.textChanged.connect(
+            lambda: self.prefetch_timer.start()
+        )
+
+        # the songs and singers already known are suggested while typing (see
+        # app.song_index), the index is read on a thread
+        song_index.load_in_background()
+
+        self.page_one_music_completer = SongCompleter(self.page_one.music_line_edit)
+        self.page_one_music_completer.chosen.connect(self._choose_page_one_song)
+        self.page_one.music_line_edit.textEdited.connect(
+            self.page_one_music_completer.suggest_songs
+        )
+
+        self.page_one_singer_completer = SongCompleter(self.page_one.singer_line_edit)
+        self.page_one_singer_completer.chosen.connect(
+            lambda _, singer: self.page_one.singer_line_edit.setText(singer)
+        )
+        self.page_one.singer_line_edit.textEdited.connect(
+            self.page_one_singer_completer.suggest_singers
+        )
+
+        # the completer of page many is created with the page (see _create_page_many)
+        self.page_many_completer: SongCompleter | None = None
 
-        # PAGE MANY
+        # PAGE MANY and PAGE INSERT MANUALLY
         # /////////////////////////////////////////////////////////////////////////////
-        self.page_many = PageMany(self.language_manager)  # QWidget()
+        # they are only created when used for the first time (see the page_many and
+        # page_insert_manually properties), so the application starts faster
+        self._page_many: PageMany | None = None
+        self._page_insert_manually: PageInsertManually | None = None
 
-        self.pages_widget.addWidget(self.page_many)
+        # END
+        # //////////////////////////////////////////////////////////////////////////////////////////
+        self.retranslate_ui()
 
-        self.page_many.input_method_combobox.currentTextChanged.connect(
+        QMetaObject.connectSlotsByName(self.pages_widget)
+
+    @property
+    def page_many(self) -> PageMany:
+        """
+        The page many, created when used for the first time.
+        """
+        if self._page_many is None:
+            self._page_many = self._create_page_many()
+
+        return self._page_many
+
+    @property
+    def page_insert_manually(self) -> PageInsertManually:
+        """
+        The page insert manually, created when used for the first time.
+        """
+        if self._page_insert_manually is None:
+            self._page_insert_manually = self._create_page_insert_manually()
+
+        return self._page_insert_manually
+
+    def _create_page_many(self) -> PageMany:
+        """
+        Creates the page many and connects its signals.
+
+        :return (PageMany): the page many.
+        """
+        page_many = PageMany(self.language_manager)  # QWidget()
+
+        # the page is created with the portuguese texts
+        if self.menu_bar.get_selected_language() != "pt":
+            page_many.retranslate_ui(self.menu_bar.get_selected_language())
+
+        self.pages_widget.addWidget(page_many)
+
+        page_many.input_method_combobox.currentTextChanged.connect(
             lambda: self._input_method_changed(
-                self.page_many.input_method_combobox.currentIndex()
+                page_many.input_method_combobox.currentIndex()
             )
         )
-        self.page_many.confirm_csv.clicked.connect(self._confirm_csv)
+        page_many.confirm_csv.clicked.connect(self._confirm_csv)
 
         # set the transparency button function that will update the opacity
         # while blocking the confirm_button, background_image and set_transparency_button
-        self.page_many.set_transparency_button.clicked.connect(
+        page_many.set_transparency_button.clicked.connect(
             lambda: self._update_opacity_threading(
-                self.page_many.transparency_slider,
-                self.page_many.statusbar_label,
+                page_many.transparency_slider,
+                page_many.statusbar_label,
                 [
-                    self.page_many.confirm_button,
-                    self.page_many.background_image,
-                    self.page_many.set_transparency_button,
+                    page_many.confirm_button,
+                    page_many.background_image,
+                    page_many.set_transparency_button,
                 ],
             )
         )
 
-        self.page_many.open_destiny_folder_button.clicked.connect(self._open_folder)
+        page_many.open_destiny_folder_button.clicked.connect(self._open_folder)
+
+        page_many.confirm_button.clicked.connect(self._confirm_page_many)
+
+        # the known songs are suggested on the line being typed
+        self.page_many_completer = SongCompleter(page_many.text_edit)
+        self.page_many_completer.chosen.connect(self._choose_page_many_song)
+
+        page_many.text_edit.completer = self.page_many_completer
+        page_many.text_edit.line_typed.connect(self._suggest_page_many_song)
 
-        self.page_many.confirm_button.clicked.connect(self._confirm_page_many)
+        return page_many
 
-        # PAGE INSERT MANUALLY
-        # //////////////////////////////////////////////////////////////////////////////////
-        self.page_insert_manually = PageInsertManually(self.language_manager)
+    def _create_page_insert_manually(self) -> PageInsertManually:
+        """
+        Creates the page insert manually and connects its signals.
+
+        :return (PageInsertManually): the page insert manually.
+        """
+        page_insert_manually = PageInsertManually(self.language_manager)
 
-        self.pages_widget.addWidget(self.page_insert_manually)
+        # the page is created with the portuguese texts
+        if self.menu_bar.get_selected_language() != "pt":
+            page_insert_manually.retranslate_ui(self.menu_bar.get_selected_language())
+
+        self.pages_widget.addWidget(page_insert_manually)
 
         # set the transparency button function that will update the opacity
         # while blocking the confirm_button, background_image and set_transparency_button
-        self.page_insert_manually.set_transparency_button.clicked.connect(
+        page_insert_manually.set_transparency_button.clicked.connect(
             lambda: self._update_opacity_threading(
-                self.page_insert_manually.transparency_slider,
-                self.page_insert_manually.statusbar_label,
+                page_insert_manually.transparency_slider,
+                page_insert_manually.statusbar_label,
                 [
-                    self.page_insert_manually.confirm_button,
-                    self.page_insert_manually.background_image,
-                    self.page_insert_manually.set_transparency_button,
+                    page_insert_manually.confirm_button,
+                    page_insert_manually.background_image,
+                    page_insert_manually.set_transparency_button,
                 ],
             )
         )
 
-        self.page_insert_manually.open_destiny_folder_button.clicked.connect(
+        page_insert_manually.open_destiny_folder_button.clicked.connect(
             self._open_folder
         )
 
-        self.page_insert_manually.confirm_button.clicked.connect(
+        page_insert_manually.confirm_button.clicked.connect(
             self._confirm_page_insert_manually
         )
 
-        # END
-        # //////////////////////////////////////////////////////////////////////////////////////////
-        self.retranslate_ui()
+        # the previews are updated when anything shown on the slides changes
+        for changed_signal in (
+            page_insert_manually.music_line_edit.textChanged,
+            page_insert_manually.singer_line_edit.textChanged,
+            page_insert_manually.text_edit.textChanged,
+            page_insert_manually.transparency_slider.valueChanged,
+            page_insert_manually.background_image.image_changed,
+            self.menu_bar.slide_style_group.triggered,
+        ):
+            changed_signal.connect(
+                lambda *_: self._update_insert_manually_previews(page_insert_manually)
+            )
 
-        QMetaObject.connectSlotsByName(self.pages_widget)
+        return page_insert_manually
+
+    def _update_insert_manually_previews(
+        self, page_insert_manually: PageInsertManually
+    ) -> None:
+        """
+        Asks the preview strip of page insert manually for new previews.
+
+        :param page_insert_manually (PageInsertManually): the page insert manually.
+        """
+
+        def render_previews():
+            # pylint: disable=import-outside-toplevel
+            from app.create_pptx import SlidesConfig
+            from app.rasterizer import render_previews
+
+            lyrics_text = page_insert_manually.text_edit.toPlainText().strip()
+
+            if not lyrics_text:
+                return None
+
+            background_path = page_insert_manually.background_image.img_path
+
+            return render_previews(
+                page_insert_manually.music_line_edit.text(),
+                page_insert_manually.singer_line_edit.text(),
+                [""] + lyrics_text.split("\n\n"),
+                SlidesConfig(
+                    **self.get_slides_config(self.menu_bar.get_selected_style())
+                ),
+                page_insert_manually.objectName(),
+                str(background_path) if background_path else None,
+                page_insert_manually.transparency_slider.value() / 100.0,
+            )
+
+        page_insert_manually.preview_strip.request_update(render_previews)
 
     def retranslate_ui(self, language: Literal["pt", "en"] = "pt") -> None:
         """
@@ -227,11 +393,14 @@ class UiPagesWidget(object):
     def _confirm_csv(self) -> None:
         """
         Confirms the csv file.
+        The file is read in a separate thread and its songs are shown as they are read.
         """
 
         if not self.page_many.input_method_combobox.currentIndex() == 0:
             return
 
+        self._stop_csv_import()
+
         self.page_many.treeview.clear()
 
         csv_file = QFileDialog.getOpenFileName(
@@ -239,16 +408,110 @@ class UiPagesWidget(object):
         )
 
         if csv_file[0]:
-            with open(csv_file[0], "r", encoding="utf-8") as file:
-                csv_reader = csv.reader(file)
-                self.page_many.treeview.add_values(list(csv_reader))
+            self.csv_import_worker = WorkerCsvImport(csv_file[0])
+            self.csv_import_thread = QThread()
+
+            self.csv_import_worker.moveToThread(self.csv_import_thread)
 
-            self.page_many.treeview.header().setSectionResizeMode(
-                QHeaderView.ResizeMode.ResizeToContents
+            self.csv_import_worker.rows_ready.connect(
+                self.page_many.treeview.add_values
             )
+            self.csv_import_worker.finished.connect(self._on_csv_import_finished)
+            self.csv_import_thread.started.connect(self.csv_import_worker.run)
+
+            self.page_many.statusbar_label.setText(
+                "Lendo o CSV..."
+                if self.menu_bar.get_selected_language() == "pt"
+                else "Reading the CSV..."
+            )
+
+            self.csv_import_thread.start()
 
         self._input_method_changed(0)
 
+    def _stop_csv_import(self) -> None:
+        """
+        Stops the CSV import that is running, if there is one.
+        """
+        if self.csv_import_thread and self.csv_import_thread.isRunning():
+            if self.csv_import_worker:
+                self.csv_import_worker.rows_ready.disconnect(
+                    self.page_many.treeview.add_values
+                )
+                self.csv_import_worker.finished.disconnect(self._on_csv_import_finished)
+                self.csv_import_worker.cancel()
+
+            self.csv_import_thread.quit()
+            self.csv_import_thread.wait()
+
+            # the chunks already emitted are still queued to the treeview (disconnect
+            # doesn't remove them), they would be added after it's cleared
+            QCoreApplication.removePostedEvents(
+                self.page_many.treeview, QEvent.Type.MetaCall
+            )
+
+    def _on_csv_import_finished(self, report: CsvImportReport) -> None:
+        """
+        Called when the CSV import is finished, shows the duplicates and invalid rows found.
+
+        :param report (CsvImportReport): the report of the import.
+        """
+        if self.csv_import_thread:
+            self.csv_import_thread.quit()
+            self.csv_import_thread.wait()
+
+        self.page_many.treeview.resize_columns()
+
+        language = self.menu_bar.get_selected_language()
+
+        self.page_many.statusbar_label.setText(
+            f"{report.imported} músicas importadas do CSV"
+            if language == "pt"
+            else f"{report.imported} songs imported from the CSV"
+        )
+
+        if not report.duplicates and not report.bad_rows and not report.extra_columns:
+            return
+
+        # only the first invalid lines are listed, the message would be too big
+        bad_lines = ", ".join(str(line) for line, _ in report.bad_rows[:20])
+        if len(report.bad_rows) > 20:
+            bad_lines += ", ..."
+
+        self._show_info_msg_box(
+            self.page_many,
+            (
+                f"Músicas importadas: {report.imported}\n"
+                f"Músicas repetidas ignoradas: {report.duplicates}\n"
+                f"Linhas inválidas ignoradas: {len(report.bad_rows)}"
+                + (
+                    f" (linhas {bad_lines})\nCada linha deve ter: nome da música, cantor"
+                    if report.bad_rows
+                    else ""
+                )
+                + (
+                    f"\nLinhas com colunas extras (ignoradas): {report.extra_columns}"
+                    if report.extra_columns
+                    else ""
+                )
+                if language == "pt"
+                else f"Songs imported: {report.imported}\n"
+                f"Repeated songs ignored: {report.duplicates}\n"
+                f"Invalid lines ignored: {len(report.bad_rows)}"
+                + (
+                    f" (lines {bad_lines})\nEach line must have: music name, singer"
+                    if report.bad_rows
+                    else ""
+                )
+                + (
+                    f"\nLines with extra columns (ignored): {report.extra_columns}"
+                    if report.extra_columns
+                    else ""
+                )
+            ),
+            language,
+        )
+
     def _update_opacity_threading(
         self,
         transparency_slider: TransparencySlider,
@@ -268,9 +531,11 @@ class UiPagesWidget(object):
         )
         self.modify_thread.start()
 
-    def _open_folder(self) -> None:
+    def _get_selected_folder(self) -> str:
         """
-        Opens the selected folder (the user has to select it in the settings of the app).
+        Returns the destination folder selected in the settings of the app.
+
+        :return (str): the selected folder, or the "files" folder if none was selected.
         """
         load_dotenv(os.path.join(os.getcwd(), "settings", ".env"))
 
@@ -279,7 +544,13 @@ class UiPagesWidget(object):
         if not selected_folder:
             selected_folder = os.path.join(os.getcwd(), "files")
 
-        os.startfile(selected_folder)
+        return selected_folder
+
+    def _open_folder(self) -> None:
+        """
+        Opens the selected folder (the user has to select it in the settings of the app).
+        """
+        os.startfile(self._get_selected_folder())
 
     def _confirm(
         self,
@@ -288,7 +559,14 @@ class UiPagesWidget(object):
         music_search: str,
         singer_search: str,
         insert_manually_lyrics: List[str] | None = None,
-    ) -> None:
+        manifest: RenderManifest | None = None,
+        journal: BatchJournal | None = None,
+        batch_job: BatchJob | None = None,
+        setlist: "SetlistDeck | None" = None,
+        output_writer: OutputWriter | None = None,
+        on_saved: Callable[[], None] | None = None,
+        on_failed: Callable[[], None] | None = None,
+    ) -> bool:
         """
         Confirms all the operation.
 
@@ -297,20 +575,39 @@ class UiPagesWidget(object):
         :param music_search (str): The music to search and create the pptx.
         :param singer_search (str): The singer to search and create the pptx.
         :param insert_manually_lyrics (str | None): The lyrics to create the pptx directly.
+        :param manifest (RenderManifest | None): The manifest of the destination folder,
+            used to keep the presentations whose inputs didn't change.
+        :param journal (BatchJournal | None): The journal of the page many batch.
+        :param batch_job (BatchJob | None): The song of the batch, if it was already
+            searched before the batch was interrupted, it isn't searched again.
+        :param setlist (SetlistDeck | None): If given, the slides are added to this
+            single presentation instead of creating a file for the song.
+        :param output_writer (OutputWriter | None): If given, the presentation is copied
+            to the destination folder on the I/O thread of the writer.
+        :param on_saved (Callable | None): Called when the presentation is in the
+            destination folder, or the song was added to the setlist (see create_slides).
+        :param on_failed (Callable | None): Called if the output writer couldn't copy
+            the presentation.
 
         :raises: QMessageBox if music or singer field is empty.
+
+        :return (bool): True if the presentation was created, False otherwise.
         """
 
-        language = self.menu_bar.get_selected_language()
+        # python-pptx, PIL, requests and lyricsgenius are only imported when the first
+        # presentation is created, so they don't slow down the application startup
+        # pylint: disable=import-outside-toplevel
+        from app.create_pptx import create_slides, SlidesConfig
+        from app.search_music_lyric import search_lyrics_on_genius
 
-        load_dotenv(os.path.join(os.getcwd(), "settings", ".env"))
+        language = self.menu_bar.get_selected_language()
 
         button.setEnabled(False)
 
-        selected_folder = os.getenv("SELECTED_FOLDER")
-
-        if not selected_folder:
-            selected_folder = os.path.join(os.getcwd(), "files")
+        # a batch uses the folder, style and background image of its journal
+        selected_folder = (
+            journal.folder if journal and journal.folder else self._get_selected_folder()
+        )
 
         genius_key = os.getenv("GENIUS_API_KEY")
 
@@ -327,14 +624,19 @@ class UiPagesWidget(object):
             )
 
             button.setEnabled(True)
-            return
+            return False
 
-        if not insert_manually_lyrics:
+        if not insert_manually_lyrics and batch_job and batch_job.search_result:
+            music, singer, lyrics, genius_image = batch_job.search_result
+
+        elif not insert_manually_lyrics:
             active_page.statusbar_label.setText(
                 "Buscando música..." if language == "pt" else "Searching music..."
             )
             QApplication.processEvents()
 
+            # the song typed on page one may already be searched in the background,
+            # the search shares it (see LyricsLookup.find_song)
             result = search_lyrics_on_genius(
                 active_page,
                 music_search,
@@ -351,10 +653,13 @@ class UiPagesWidget(object):
                 )
                 button.setEnabled(True)
 
-                return
+                return False
 
             music, singer, lyrics, genius_image = result
 
+            if journal and batch_job:
+                journal.mark(batch_job, "searched", result)
+
             # update status bar
             active_page.statusbar_label.setText(
                 f'Música "{music} - {singer}" encontrada, criando slide...'
@@ -372,12 +677,38 @@ class UiPagesWidget(object):
             )
 
         # getting the selected slide_config
-        slide_config = self.get_slides_config(self.menu_bar.get_selected_style())
+        slide_config = self.get_slides_config(
+            journal.style
+            if journal and journal.style
+            else self.menu_bar.get_selected_style()
+        )
 
         background_image_bytes = None
-        if active_page.background_image.img_path:
+        if journal:
+            if journal.background is not None:
+                background_image_bytes = BytesIO(journal.background)
+
+        elif active_page.background_image.img_path:
             background_image_bytes = active_page.background_image.image_data
 
+        created = False
+
+        if setlist is not None:
+            setlist.add_song(music, singer, lyrics, active_page.objectName(), genius_image)
+
+            if on_saved:
+                on_saved()
+
+            active_page.statusbar_label.setText(
+                f'Música "{music} - {singer}" adicionada ao setlist'
+                if language == "pt"
+                else f'Music "{music} - {singer}" added to the setlist'
+            )
+
+            button.setEnabled(True)
+
+            return True
+
         try:
             create_slides(
                 widget=active_page.statusbar_label,
@@ -390,7 +721,13 @@ class UiPagesWidget(object):
                 genius_image_link=genius_image,
                 background_image=background_image_bytes,
                 language=language,
+                manifest=manifest,
+                output_writer=output_writer,
+                on_saved=on_saved,
+                on_failed=on_failed,
             )
+            created = True
+
         except FileNotFoundError:
 
             self._show_error_msg_box(
@@ -407,6 +744,108 @@ class UiPagesWidget(object):
 
         button.setEnabled(True)
 
+        return created
+
+    def _confirm_page_one(self) -> None:
+        """
+        Confirms all the operation for page_one.
+        """
+        if self._submit_to_daemon(
+            self.page_one,
+            {
+                "kind": "render",
+                "music": self.page_one.music_line_edit.text(),
+                "singer": self.page_one.singer_line_edit.text(),
+            },
+        ):
+            return
+
+        with profile_operation(
+            self._get_selected_folder(),
+            "page_one",
+            self.menu_bar.take_profile_request(),
+        ):
+            self._confirm(
+                self.page_one.confirm_button,
+                self.page_one,
+                self.page_one.music_line_edit.text(),
+                self.page_one.singer_line_edit.text(),
+            )
+
+    def _prefetch_page_one(self) -> None:
+        """
+        Starts the lookup of the song typed on page one in the background, so the
+        confirm usually finds it in the cache (the fields didn't change for
+        PREFETCH_DELAY_MS).
+        """
+        music = self.page_one.music_line_edit.text().strip()
+        singer = self.page_one.singer_line_edit.text().strip()
+
+        # the render daemon does its own searches, and the songs of the lyric library
+        # aren't searched on Genius
+        if (
+            not music
+            or not singer
+            or os.getenv("RENDER_DAEMON_URL")
+            or lyric_library.find(music, singer) is not None
+        ):
+            return
+
+        # pylint: disable=import-outside-toplevel
+        from app.search_music_lyric import lyrics_lookup
+
+        lyrics_lookup.prefetch(music, singer, os.getenv("GENIUS_API_KEY"))
+
+    def _choose_page_one_song(self, music: str, singer: str) -> None:
+        """
+        Fills the fields of page one with the song chosen from the suggestions.
+        The song is already on the song index, so it isn't searched on Genius again.
+
+        :param music (str): the name of the music.
+        :param singer (str): the name of the singer.
+        """
+        self.page_one.music_line_edit.setText(music)
+        self.page_one.singer_line_edit.setText(singer)
+
+    def _suggest_page_many_song(self, line: str) -> None:
+        """
+        Suggests the songs (or the singers, after the comma) of the line of page many
+        being typed.
+
+        :param line (str): the text of the line before the cursor.
+        """
+        if self.page_many_completer is None:
+            return
+
+        rect = self.page_many.text_edit.cursorRect()
+
+        if "," in line:
+            self.page_many_completer.suggest_singers(line.split(",", 1)[1], rect)
+
+        else:
+            self.page_many_completer.suggest_songs(line, rect)
+
+    def _choose_page_many_song(self, music: str, singer: str) -> None:
+        """
+        Replaces the line of page many being typed by the song chosen from the
+        suggestions (only its singer, if a singer was chosen).
+
+        :param music (str): the name of the music, empty if a singer was chosen.
+        :param singer (str): the name of the singer.
+        """
+        cursor = self.page_many.text_edit.textCursor()
+
+        if not music:
+            music = cursor.block().text().split(",", 1)[0].strip()
+
+        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
+        cursor.movePosition(
+            QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor
+        )
+        cursor.insertText(f"{music}, {singer}")
+
+        self.page_many.text_edit.setTextCursor(cursor)
+
     def _confirm_page_many(self) -> None:
         """
         Confirms all the operation for page_many.
@@ -416,22 +855,31 @@ class UiPagesWidget(object):
         musics, singers = [], []
 
         if selected_method == 0:
-            for i in range(self.page_many.treeview.topLevelItemCount()):
-                item = self.page_many.treeview.topLevelItem(i)
-                if item.checkState(0) == Qt.CheckState.Checked:
-                    musics.append(item.text(1).strip())
-                    singers.append(item.text(2).strip())
+            for music, singer in self.page_many.treeview.checked_values():
+                musics.append(music.strip())
+                singers.append(singer.strip())
 
         else:
+            typed_songs = set()
+
             for line in self.page_many.text_edit.toPlainText().split("\n"):
                 if line:
                     try:
-                        singers.append(line.split(",")[1].strip())
-                        musics.append(line.split(",")[0].strip())
+                        music, singer = line.split(",")[0], line.split(",")[1]
 
                     except IndexError:
-                        musics.append(line)
-                        singers.append("")
+                        music, singer = line, ""
+
+                    music, singer = normalize_text(music), normalize_text(singer)
+
+                    # the repeated songs are searched only once
+                    if song_key(music, singer) in typed_songs:
+                        continue
+
+                    typed_songs.add(song_key(music, singer))
+
+                    musics.append(music)
+                    singers.append(singer)
 
         if len(musics) == 0:
             self._show_error_msg_box(
@@ -441,7 +889,79 @@ class UiPagesWidget(object):
             )
             return
 
-        self.setup_worker()
+        # the setlist (a single presentation) is only created by the app
+        if not self.page_many.setlist_checkbox.isChecked() and self._submit_to_daemon(
+            self.page_many,
+            {
+                "kind": "batch",
+                "songs": [list(song) for song in zip(musics, singers)],
+            },
+        ):
+            return
+
+        background_image = (
+            self.page_many.background_image.image_data
+            if self.page_many.background_image.img_path
+            else None
+        )
+
+        journal = BatchJournal.create(
+            musics,
+            singers,
+            self._get_selected_folder(),
+            self.menu_bar.get_selected_style(),
+            setlist=self.page_many.setlist_checkbox.isChecked(),
+            sections=self.page_many.sections_checkbox.isChecked(),
+            background=(
+                background_image.getvalue()
+                if isinstance(background_image, BytesIO)
+                else background_image
+            ),
+        )
+
+        self._start_batch(journal)
+
+    def _start_batch(self, journal: BatchJournal) -> None:
+        """
+        Starts the worker of page many with the songs of the batch not rendered yet.
+        The folder, style and background image are the ones of the journal (a resumed
+        batch continues as it was started).
+
+        :param journal (BatchJournal): the journal of the batch.
+        """
+        pending_jobs = journal.pending_jobs()
+
+        musics = [job.music for job in pending_jobs]
+        singers = [job.singer for job in pending_jobs]
+
+        folder = journal.folder or self._get_selected_folder()
+
+        profile_folder = folder if self.menu_bar.take_profile_request() else None
+
+        setlist = None
+
+        if journal.setlist:
+            # pylint: disable=import-outside-toplevel
+            from app.create_pptx import SlidesConfig
+            from app.setlist import SetlistDeck
+
+            setlist = SetlistDeck(
+                SlidesConfig(
+                    **self.get_slides_config(
+                        journal.style or self.menu_bar.get_selected_style()
+                    )
+                ),
+                folder,
+                journal.background,
+                journal.sections,
+            )
+
+        self.setup_worker(
+            None if setlist else RenderManifest(folder),
+            journal,
+            setlist,
+            None if setlist else OutputWriter(),
+        )
 
         if self.worker_thread and self.worker:
             self.worker_thread.started.connect(
@@ -450,11 +970,65 @@ class UiPagesWidget(object):
                     singers,
                     self.progress_dialog,
                     self.menu_bar.get_selected_language(),
+                    profile_folder,
                 )
             )
 
             self.worker_thread.start()
 
+    def offer_batch_resume(self, journal: BatchJournal) -> None:
+        """
+        Asks the user if the batch interrupted (by a crash or by closing the app)
+        should be resumed, if not, the journal is discarded.
+
+        :param journal (BatchJournal): the journal of the unfinished batch.
+        """
+        language = self.menu_bar.get_selected_language()
+
+        # the batch is only resumed as it was started
+        if (
+            not os.path.isdir(journal.folder)
+            or not self._style_exists(journal.style)
+            or journal.background_lost
+        ):
+            self._show_info_msg_box(
+                self.mainwindow,
+                (
+                    f"A criação de {len(journal.jobs)} apresentações foi interrompida, "
+                    "mas não pode continuar: a pasta de destino, o estilo dos slides "
+                    "ou a imagem de fundo usados não existem mais."
+                    if language == "pt"
+                    else f"The creation of {len(journal.jobs)} presentations was "
+                    "interrupted, but it can't be resumed: the destination folder, "
+                    "the slides style or the background image used don't exist anymore."
+                ),
+                language,
+            )
+
+            journal.finish()
+            return
+
+        answer = QMessageBox.question(
+            self.mainwindow,
+            "Continuar?" if language == "pt" else "Resume?",
+            (
+                f"A criação de {len(journal.jobs)} apresentações foi interrompida "
+                f"({journal.done_count()} concluídas).\n"
+                "Deseja continuar de onde parou?"
+                if language == "pt"
+                else f"The creation of {len(journal.jobs)} presentations was interrupted "
+                f"({journal.done_count()} completed).\n"
+                "Do you want to resume where it stopped?"
+            ),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+
+        if answer == QMessageBox.StandardButton.Yes:
+            self._start_batch(journal)
+
+        else:
+            journal.finish()
+
     def _confirm_page_insert_manually(self) -> None:
         """
         Confirms all the operation for page_insert_manually.
@@ -474,12 +1048,46 @@ class UiPagesWidget(object):
         lyrics = self.page_insert_manually.text_edit.toPlainText().strip().split("\n\n")
         lyrics.insert(0, "")
 
-        self._confirm(
-            self.page_insert_manually.confirm_button,
+        if self._submit_to_daemon(
             self.page_insert_manually,
-            self.page_insert_manually.music_line_edit.text(),
-            self.page_insert_manually.singer_line_edit.text(),
-            lyrics,
+            {
+                "kind": "render",
+                "music": self.page_insert_manually.music_line_edit.text(),
+                "singer": self.page_insert_manually.singer_line_edit.text(),
+                "lyric": lyrics,
+            },
+        ):
+            return
+
+        with profile_operation(
+            self._get_selected_folder(),
+            "page_insert_manually",
+            self.menu_bar.take_profile_request(),
+        ):
+            self._confirm(
+                self.page_insert_manually.confirm_button,
+                self.page_insert_manually,
+                self.page_insert_manually.music_line_edit.text(),
+                self.page_insert_manually.singer_line_edit.text(),
+                lyrics,
+            )
+
+    @staticmethod
+    def _style_exists(style: str) -> bool:
+        """
+        Returns if the slides style still exists (see get_slides_config).
+
+        :param style (str): the name of the style.
+
+        :return (bool): True if its configuration file exists.
+        """
+        style = {
+            "white background": "fundo branco",
+            "black background": "fundo preto",
+        }.get(style, style)
+
+        return os.path.isfile(
+            os.path.join(os.getcwd(), "app", "slides styles", style + ".json")
         )
 
     def get_slides_config(self, choosed_slide_config: str) -> dict:
@@ -571,12 +1179,182 @@ class UiPagesWidget(object):
         msg_box.exec()
         active_page.setEnabled(True)
 
-    def setup_worker(self) -> None:
+    def _submit_to_daemon(
+        self, active_page: PageOne | PageMany | PageInsertManually, job: Dict
+    ) -> bool:
+        """
+        Sends the job to the render daemon, if it's set in the settings and running.
+        The destination folder, the style and the background image of the page are
+        added to the job.
+
+        :param active_page (QWidget): The active page.
+        :param job (Dict): The job (kind, songs...), see app.render_daemon.
+
+        :return (bool): True if the daemon received the job (or refused it and the user was
+            told), False if the presentations must be created by the app.
+        """
+        language = self.menu_bar.get_selected_language()
+
+        selected_folder = self._get_selected_folder()
+
+        render_client = render_client_from_settings()
+
+        if render_client is None:
+            return False
+
+        job.update(
+            {
+                "folder": os.path.abspath(selected_folder),
+                "method": active_page.objectName(),
+                "slides_config": self.get_slides_config(
+                    self.menu_bar.get_selected_style()
+                ),
+                "background_image": encode_image(
+                    active_page.background_image.image_data
+                    if active_page.background_image.img_path
+                    else None
+                ),
+            }
+        )
+
+        try:
+            job_id = render_client.submit(job)
+
+        except RenderDaemonError as error:
+            # it may have stopped, it's asked again on the next confirm
+            forget_availability()
+
+            self._show_error_msg_box(
+                active_page,
+                (
+                    f"O serviço de renderização recusou o pedido:\n{error}"
+                    if language == "pt"
+                    else f"The render service refused the request:\n{error}"
+                ),
+                language,
+            )
+            return True
+
+        self.daemon_jobs[job_id] = (render_client, active_page)
+
+        active_page.statusbar_label.setText(
+            "Enviado ao serviço de renderização, aguardando na fila..."
+            if language == "pt"
+            else "Sent to the render service, waiting in the queue..."
+        )
+
+        self.daemon_poll_timer.start()
+
+        return True
+
+    def _poll_daemon_jobs(self) -> None:
+        """
+        Updates the status of the jobs sent to the render daemon,
+        showing the result of the ones that finished.
+        """
+        language = self.menu_bar.get_selected_language()
+
+        for job_id, (render_client, active_page) in list(self.daemon_jobs.items()):
+            try:
+                job = render_client.job(job_id)
+
+            except RenderDaemonError:
+                del self.daemon_jobs[job_id]
+                forget_availability()
+
+                active_page.statusbar_label.setText(
+                    "A conexão com o serviço de renderização foi perdida"
+                    if language == "pt"
+                    else "The connection to the render service was lost"
+                )
+                continue
+
+            if job["state"] == "queued":
+                continue
+
+            if job["state"] == "running":
+                active_page.statusbar_label.setText(
+                    f"Criando no serviço de renderização... {job['progress']}/{job['total']}"
+                    if language == "pt"
+                    else f"Creating on the render service... {job['progress']}/{job['total']}"
+                )
+                continue
+
+            del self.daemon_jobs[job_id]
+
+            if job["state"] == "failed":
+                active_page.statusbar_label.clear()
+
+                self._show_error_msg_box(active_page, job["error"], language)
+
+            elif job["kind"] == "render":
+                active_page.statusbar_label.setText(
+                    f'Arquivo: "{job["result"]["file_name"]}" concluído com sucesso!'
+                    if language == "pt"
+                    else f'File: "{job["result"]["file_name"]}" completed!'
+                )
+
+            else:
+                self._show_daemon_batch_result(active_page, job["result"], language)
+
+        if not self.daemon_jobs:
+            self.daemon_poll_timer.stop()
+
+    def _show_daemon_batch_result(
+        self,
+        active_page: PageOne | PageMany | PageInsertManually,
+        result: Dict,
+        language: Literal["pt", "en"],
+    ) -> None:
+        """
+        Shows the result of a batch created by the render daemon.
+
+        :param active_page (QWidget): The page of the batch.
+        :param result (Dict): The result of the job.
+        :param language (Literal["pt", "en"]): The language.
+        """
+        active_page.statusbar_label.setText(
+            f"{len(result['created'])} apresentações concluídas "
+            f"({result['reused']} sem mudanças foram mantidas)"
+            if language == "pt"
+            else f"{len(result['created'])} presentations completed "
+            f"({result['reused']} unchanged were kept)"
+        )
+
+        if result["failed"]:
+            self._show_error_msg_box(
+                active_page,
+                ("Não foi possível criar:\n" if language == "pt" else "Not created:\n")
+                + "\n".join(
+                    f"{music} - {singer}: {error}"
+                    for music, singer, error in result["failed"]
+                ),
+                language,
+            )
+
+    def setup_worker(
+        self,
+        manifest: RenderManifest | None = None,
+        journal: BatchJournal | None = None,
+        setlist: "SetlistDeck | None" = None,
+        output_writer: OutputWriter | None = None,
+    ) -> None:
         """
         Sets up the worker to update the progress bar for page many.
+
+        :param manifest (RenderManifest | None): The manifest of the destination folder.
+        :param journal (BatchJournal | None): The journal of the batch.
+        :param setlist (SetlistDeck | None): The single presentation of the batch.
+        :param output_writer (OutputWriter | None): The writer of the presentations.
         """
         self.worker = WorkerPageMany(
-            self._confirm, self.page_many.confirm_button, self.page_many
+            self._confirm,
+            self.page_many.confirm_button,
+            self.page_many,
+            manifest,
+            journal,
+            setlist,
+            output_writer,
         )
         self.worker_thread = QThread()
 
@@ -621,6 +1399,63 @@ class UiPagesWidget(object):
             self.worker_thread.wait()
             self.progress_dialog.close()
 
+        reused = self.worker.manifest.reused if self.worker and self.worker.manifest else 0
+
+        if self.worker and self.worker.setlist_file_name:
+            self.page_many.statusbar_label.setText(
+                f'Setlist "{self.worker.setlist_file_name}" concluído com sucesso!'
+                if self.menu_bar.get_selected_language() == "pt"
+                else f'Setlist "{self.worker.setlist_file_name}" completed!'
+            )
+
+        elif reused:
+            self.page_many.statusbar_label.setText(
+                f"{reused} apresentações sem mudanças foram mantidas"
+                if self.menu_bar.get_selected_language() == "pt"
+                else f"{reused} unchanged presentations were kept"
+            )
+
+        if self.worker and self.worker.output_writer and self.worker.output_writer.failed:
+            self._show_error_msg_box(
+                self.page_many,
+                (
+                    "Não foi possível salvar na pasta de destino:\n"
+                    if self.menu_bar.get_selected_language() == "pt"
+                    else "It was not possible to save on the destination folder:\n"
+                )
+                + "\n".join(
+                    f"{file_name}: {error}"
+                    for file_name, error in self.worker.output_writer.failed
+                ),
+                self.menu_bar.get_selected_language(),
+            )
+
+        if self.worker and self.worker.timing_records:
+            self._show_timing_summary(self.worker.timing_records, reused)
+
+    def _show_timing_summary(self, timing_records: List[Dict], reused: int = 0) -> None:
+        """
+        Shows the table with the time spent on each stage of each song of the batch.
+
+        :param timing_records (List[Dict]): the timing records of the batch.
+        :param reused (int): the number of unchanged presentations that were kept.
+        """
+        timing_summary = UITimingSummary(
+            timing_records,
+            self.menu_bar.get_selected_language(),
+            self.mainwindow,
+            reused,
+        )
+
+        # place the window in the center of the app
+        timing_summary_width = timing_summary.frameGeometry().width()
+        timing_summary.move(
+            self.mainwindow.frameGeometry().center()
+            - QPoint(timing_summary_width / 3.7, 100)  # type: ignore
+        )
+
+        timing_summary.exec()
+
 
 class WorkerPageMany(QObject):
     """Worker class for page many."""
@@ -633,6 +1468,10 @@ class WorkerPageMany(QObject):
         confirm_function: Callable,
         confirm_button: QPushButton,
         active_page: QWidget,
+        manifest: RenderManifest | None = None,
+        journal: BatchJournal | None = None,
+        setlist: "SetlistDeck | None" = None,
+        output_writer: OutputWriter | None = None,
     ) -> None:
         """
         Constructor of the worker class.
@@ -640,12 +1479,29 @@ class WorkerPageMany(QObject):
         :param confirm_function (Callable): The function executed when confirm button is clicked.
         :param confirm_button (QPushButton): The confirm button.
         :param active_page (QWidget): The active page.
+        :param manifest (RenderManifest | None): The manifest of the destination folder.
+        :param journal (BatchJournal | None): The journal of the batch, the musics given to
+            run must be its pending jobs.
+        :param setlist (SetlistDeck | None): If given, all the songs are added to it
+            and it's saved at the end.
+        :param output_writer (OutputWriter | None): If given, the presentations are
+            copied to the destination folder by its I/O thread.
         """
         super().__init__()
 
         self.confirm_function = confirm_function
         self.confirm_button = confirm_button
         self.active_page = active_page
+        self.manifest = manifest
+        self.journal = journal
+        self.setlist = setlist
+        self.output_writer = output_writer
+
+        # the name of the setlist file, after it's saved
+        self.setlist_file_name = ""
+
+        # the timing record of each song processed, shown at the end of the batch
+        self.timing_records: List[Dict] = []
 
     def run(
         self,
@@ -653,6 +1509,7 @@ class WorkerPageMany(QObject):
         singers: List[str],
         progress_dialog: QProgressDialog | None = None,
         language: Literal["pt", "en"] = "pt",
+        profile_folder: str | None = None,
     ) -> None:
         """
         Runs the worker, which will update the progress bar in a separate thread.
@@ -662,20 +1519,88 @@ class WorkerPageMany(QObject):
         :param singers (List[str]): The list of singer names.
         :param progress_dialog (QProgressDialog, optional): The progress dialog.
         :param language (Literal["pt", "en"], optional): The language. Defaults to "pt".
+        :param profile_folder (str, optional): If given, the batch is profiled
+            and the profile is written on this folder.
         """
 
         if self.canceled(progress_dialog, language):
+            if self.journal:
+                self.journal.finish()
+            if self.output_writer:
+                self.output_writer.close()
             return
 
+        with profile_operation(
+            profile_folder or "", "page_many", profile_folder is not None
+        ):
+            self._run_batch(musics, singers, progress_dialog, language)
+
+        # waits for the presentations still being copied to the destination folder
+        if self.output_writer:
+            self.output_writer.close()
+
+        if self.manifest:
+            self.manifest.save()
+
+        # the songs already added are saved even if the batch was canceled
+        if self.setlist and self.setlist.songs:
+            self.setlist_file_name = self.setlist.save()
+
+        # the batch finished or was canceled by the user, there is nothing to resume
+        if self.journal:
+            self.journal.finish()
+
+        time.sleep(1)
+
+        self.finished.emit()
+
+    def _run_batch(
+        self,
+        musics: List[str],
+        singers: List[str],
+        progress_dialog: QProgressDialog | None = None,
+        language: Literal["pt", "en"] = "pt",
+    ) -> None:
+        """
+        Executes the confirm function for each music in the list, updating the progress bar.
+
+        :param musics (List[str]): The list of music names.
+        :param singers (List[str]): The list of singer names.
+        :param progress_dialog (QProgressDialog, optional): The progress dialog.
+        :param language (Literal["pt", "en"], optional): The language. Defaults to "pt".
+        """
+        jobs = self.journal.pending_jobs() if self.journal else []
+
         for i, music in enumerate(musics):
 
             if self.canceled(progress_dialog, language):
                 break
 
-            self.confirm_function(
-                self.confirm_button, self.active_page, music, singers[i]
+            batch_job = jobs[i] if i < len(jobs) else None
+
+            tracer.begin(music=music, singer=singers[i], method="page_many")
+
+            created = self.confirm_function(
+                self.confirm_button,
+                self.active_page,
+                music,
+                singers[i],
+                manifest=self.manifest,
+                journal=self.journal,
+                batch_job=batch_job,
+                setlist=self.setlist,
+                output_writer=self.output_writer,
+                **self._journal_marks(batch_job),
             )
 
+            # the songs created are marked when their presentation is in the folder
+            if self.journal and batch_job and not created:
+                self.journal.mark(batch_job, "failed")
+
+            record = tracer.end("ok" if created else "failed")
+            if record:
+                self.timing_records.append(record)
+
             if self.canceled(progress_dialog, language):
                 break
 
@@ -683,9 +1608,25 @@ class WorkerPageMany(QObject):
 
             self.progress_signal.emit(current_percentage)
 
-        time.sleep(1)
+    def _journal_marks(self, batch_job: BatchJob | None) -> Dict[str, Callable | None]:
+        """
+        Returns the functions that mark the song on the journal as rendered when its
+        presentation is in the destination folder (it can be copied later by the output
+        writer) and as failed when it couldn't be copied.
 
-        self.finished.emit()
+        :param batch_job (BatchJob | None): the song.
+
+        :return: the on_saved and on_failed params of the confirm function.
+        """
+        journal = self.journal
+
+        if not journal or not batch_job:
+            return {"on_saved": None, "on_failed": None}
+
+        return {
+            "on_saved": lambda: journal.mark(batch_job, "rendered"),
+            "on_failed": lambda: journal.mark(batch_job, "failed"),
+        }
 
     def canceled(
         self,
@@ -717,3 +1658,48 @@ class WorkerPageMany(QObject):
                 )
                 return True
         return False
+
+
+class WorkerCsvImport(QObject):
+    """Worker class that reads the CSV file of page many."""
+
+    rows_ready = Signal(list)
+    finished = Signal(object)
+
+    def __init__(self, csv_path: str) -> None:
+        """
+        Constructor of the worker class.
+
+        :param csv_path (str): The path of the CSV file.
+        """
+        super().__init__()
+
+        self.csv_path = csv_path
+        self._canceled = Event()
+
+    def run(self) -> None:
+        """
+        Reads the CSV file, emitting the songs in chunks as soon as they are read.
+        """
+        report = CsvImportReport()
+
+        try:
+            for chunk in iter_csv_songs(self.csv_path, report):
+                if self._canceled.is_set():
+                    return
+
+                self.rows_ready.emit(chunk)
+
+                # the songs of the CSV are suggested the next time they are typed
+                song_index.add_songs(SongEntry(music, singer) for music, singer in chunk)
+
+        except OSError:
+            report.bad_rows.append((0, "file"))
+
+        self.finished.emit(report)
+
+    def cancel(self) -> None:
+        """
+        Stops reading the CSV file.
+        """
+        self._canceled.set()
@@ -447,6 +447,34 @@ class UICreateSlideStyle(QDialog):
 
         self.grid_layout.addWidget(self.text_font_name_combobox, 35, 0)
 
+        # creates the text font autofit label
+        self.text_font_autofit_label = QLabel(self.frame)
+        self.text_font_autofit_label.setObjectName("text_font_autofit_label")
+        self.text_font_autofit_label.setMaximumHeight(30)
+
+        self.grid_layout.addWidget(self.text_font_autofit_label, 36, 0)
+
+        # creates the text font autofit combobox
+        self.text_font_autofit_combobox = ComboBox(self.frame)
+        self.text_font_autofit_combobox.setObjectName("text_font_autofit")
+        self.text_font_autofit_combobox.setMaximumHeight(30)
+
+        self.grid_layout.addWidget(self.text_font_autofit_combobox, 37, 0)
+
+        # creates the template name label
+        self.template_name_label = QLabel(self.frame)
+        self.template_name_label.setObjectName("template_name_label")
+        self.template_name_label.setMaximumHeight(30)
+
+        self.grid_layout.addWidget(self.template_name_label, 38, 0)
+
+        # creates the template name combobox (the masters saved as .pptx by the user)
+        self.template_name_combobox = ComboBox(self.frame)
+        self.template_name_combobox.setObjectName("template_name")
+        self.template_name_combobox.setMaximumHeight(30)
+
+        self.grid_layout.addWidget(self.template_name_combobox, 39, 0)
+
         # creates the confirm button
         self.confirm_button = QPushButton(self.frame)
         self.confirm_button.setObjectName("confirm_button")
@@ -457,7 +485,7 @@ class UICreateSlideStyle(QDialog):
         )
         self.confirm_button.clicked.connect(self._confirm)
 
-        self.grid_layout.addWidget(self.confirm_button, 36, 0)
+        self.grid_layout.addWidget(self.confirm_button, 40, 0)
 
         # adds the grid layout to the frame
         self.vertical_layout.addWidget(self.frame)
@@ -544,6 +572,29 @@ class UICreateSlideStyle(QDialog):
 
             self.text_font_name_label.setText("Nome da fonte do texto:")
 
+            self.text_font_autofit_label.setText(
+                "Ajustar o tamanho do texto a cada slide?"
+            )
+
+            self.text_font_autofit_combobox.set_options(
+                ["Não", "Sim"],
+                [
+                    "Usa o tamanho da fonte do texto em todos os slides",
+                    "Usa o maior tamanho de fonte que cabe em cada slide",
+                ],
+            )
+
+            self.template_name_label.setText("Modelo dos slides (.pptx):")
+
+            self.template_name_combobox.set_options(
+                ["Padrão"] + self._template_names(),
+                ["O modelo padrão do python-pptx"]
+                + [
+                    "Usa o slide mestre desse arquivo de app/slides styles"
+                    for _ in self._template_names()
+                ],
+            )
+
             # confirm button
             self.confirm_button.setText("Confirmar")
 
@@ -605,6 +656,27 @@ class UICreateSlideStyle(QDialog):
 
             self.text_font_name_label.setText("Text Font Name:")
 
+            self.text_font_autofit_label.setText("Fit the Text Size to Each Slide?")
+
+            self.text_font_autofit_combobox.set_options(
+                ["No", "Yes"],
+                [
+                    "Use the text font size on every slide",
+                    "Use the largest font size that fits on each slide",
+                ],
+            )
+
+            self.template_name_label.setText("Slides Template (.pptx):")
+
+            self.template_name_combobox.set_options(
+                ["Default"] + self._template_names(),
+                ["The default template of python-pptx"]
+                + [
+                    "Use the slide master of this file in app/slides styles"
+                    for _ in self._template_names()
+                ],
+            )
+
             # confirm button
             self.confirm_button.setText("Confirm")
 
@@ -664,7 +736,19 @@ class UICreateSlideStyle(QDialog):
                                 elif widget.currentText() in ("Direita", "Right"):
                                     style.update({object_name: 3})  # type: ignore
 
-                            elif object_name.endswith("isbold"):
+                            # the first option is the default template
+                            elif object_name == "template_name":
+                                style.update(
+                                    {
+                                        object_name: (
+                                            widget.currentText()
+                                            if widget.currentIndex() > 0
+                                            else ""
+                                        )
+                                    }
+                                )
+
+                            elif object_name.endswith(("isbold", "autofit")):
                                 style.update(
                                     {
                                         object_name: widget.currentText()
@@ -683,11 +767,35 @@ class UICreateSlideStyle(QDialog):
         if result:
             self.close()
 
+    def _template_names(self) -> list[str]:
+        """
+        Returns the names of the templates (.pptx files) saved in "app/slides styles".
+
+        :return (list[str]): the names, without the extension.
+        """
+        slide_style_dir = os.path.join(os.getcwd(), "app", "slides styles")
+
+        if not os.path.isdir(slide_style_dir):
+            return []
+
+        return sorted(
+            file_name[:-5]
+            for file_name in os.listdir(slide_style_dir)
+            if file_name.lower().endswith(".pptx") and not file_name.startswith("~$")
+        )
+
     def _save_style(self, style: dict) -> tuple[dict, str] | None:
         slide_style_dir = os.path.join(os.getcwd(), "app", "slides styles")
 
         os.makedirs(slide_style_dir, exist_ok=True)
 
+        # the templates (.pptx) are in the same folder
+        style_files = [
+            style_file
+            for style_file in os.listdir(slide_style_dir)
+            if style_file.endswith(".json")
+        ]
+
         file_name = QInputDialog.getText(
             self,
             (
@@ -697,11 +805,11 @@ class UICreateSlideStyle(QDialog):
             ),
             (
                 "Qual nome deseja dar ao arquivo de configuração?\n"
-                f"Configurações existentes: {os.listdir(slide_style_dir)}"
+                f"Configurações existentes: {style_files}"
                 if self.language == "pt"
                 else (
                     "What do you want to name the config file?\n"
-                    f"Existing configurations: {os.listdir(slide_style_dir)}"
+                    f"Existing configurations: {style_files}"
                 )
             ),
         )[0]
@@ -3,11 +3,12 @@ This module contains the code for the modify slide style page.
 """
 
 import json
-from typing import Literal, TYPE_CHECKING
+from typing import Dict, Literal, TYPE_CHECKING
 import os
 from glob import glob
+from threading import Event
 
-from PySide6.QtCore import QPoint, QEvent
+from PySide6.QtCore import QObject, QPoint, QEvent, QThread, Signal
 from PySide6.QtGui import Qt
 from PySide6.QtWidgets import (
     QWidget,
@@ -30,7 +31,11 @@ from gui.slides_adjusts.ui_create_slide_style import UICreateSlideStyle
 from gui.widgets.combobox import ComboBox
 from gui.widgets.treeview import TreeView
 
-from app.create_pptx import SlidesConfig, create_slides, extract_presentation_infos
+from app.create_pptx import SlidesConfig
+from app.deck_catalogue import DeckCatalogue
+from app.profiler import profile_operation
+from app.render_manifest import RenderManifest
+from app.restyle import restyle_deck
 
 if TYPE_CHECKING:
     from gui.widgets.menu_bar import MenuBar
@@ -129,18 +134,26 @@ class UIModifySlideStyle(QDialog):
 
         self.grid_layout.addWidget(self.select_input_folder_button, 1, 1)
 
+        # creates the search line edit (searches the catalogue of presentations)
+        self.search_line_edit = QLineEdit(self.frame)
+        self.search_line_edit.setObjectName("search_line_edit")
+        self.search_line_edit.setClearButtonEnabled(True)
+        self.search_line_edit.textChanged.connect(self._search_catalogue)
+
+        self.grid_layout.addWidget(self.search_line_edit, 2, 0, 1, 2)
+
         # creates treeview
         self.treeview = TreeView(self.frame)
         self.treeview.setVisible(False)
         self.treeview.setEnabled(False)
 
-        self.grid_layout.addWidget(self.treeview, 2, 0, 1, 2)
+        self.grid_layout.addWidget(self.treeview, 3, 0, 1, 2)
 
         # creates the selected output folder label
         self.selected_output_folder_label = QLabel(self.frame)
         self.selected_output_folder_label.setObjectName("selected_output_folder_label")
 
-        self.grid_layout.addWidget(self.selected_output_folder_label, 3, 0)
+        self.grid_layout.addWidget(self.selected_output_folder_label, 4, 0)
 
         # creates the select output folder line edit
         self.select_output_folder_line_edit = QLineEdit(self.frame)
@@ -149,7 +162,7 @@ class UIModifySlideStyle(QDialog):
         )
         self.select_output_folder_line_edit.setReadOnly(True)
 
-        self.grid_layout.addWidget(self.select_output_folder_line_edit, 4, 0)
+        self.grid_layout.addWidget(self.select_output_folder_line_edit, 5, 0)
 
         # creates the select output folder button
         self.select_output_folder_button = QPushButton(self.frame)
@@ -158,13 +171,13 @@ class UIModifySlideStyle(QDialog):
 
         self.select_output_folder_button.clicked.connect(self._open_output_folder)
 
-        self.grid_layout.addWidget(self.select_output_folder_button, 4, 1)
+        self.grid_layout.addWidget(self.select_output_folder_button, 5, 1)
 
         # creates the styles label
         self.styles_label = QLabel(self.frame)
         self.styles_label.setObjectName("styles_label")
 
-        self.grid_layout.addWidget(self.styles_label, 5, 0)
+        self.grid_layout.addWidget(self.styles_label, 6, 0)
 
         # creates the styles combobox
         self.styles_combobox = ComboBox(self.frame)
@@ -174,7 +187,7 @@ class UIModifySlideStyle(QDialog):
         )
         self.styles_combobox.currentTextChanged.connect(self._create_new_style_selected)
 
-        self.grid_layout.addWidget(self.styles_combobox, 6, 0)
+        self.grid_layout.addWidget(self.styles_combobox, 7, 0)
 
         # creates the confirm button
         self.confirm_button = QPushButton(self.frame)
@@ -188,7 +201,7 @@ class UIModifySlideStyle(QDialog):
 
         self.confirm_button.clicked.connect(self._confirm)
 
-        self.grid_layout.addWidget(self.confirm_button, 7, 0, 1, 2)
+        self.grid_layout.addWidget(self.confirm_button, 8, 0, 1, 2)
 
         # adds the grid layout to the frame
         self.vertical_layout.addWidget(self.frame)
@@ -208,6 +221,11 @@ class UIModifySlideStyle(QDialog):
         # adds the status bar to the frame
         self.vertical_layout.addWidget(self.statusbar)
 
+        self.catalogue = DeckCatalogue()
+
+        self.catalogue_thread: QThread | None = None
+        self.catalogue_worker: WorkerCatalogueIndex | None = None
+
         self.retranslate_ui()
 
         self.setMinimumWidth(450)
@@ -222,13 +240,17 @@ class UIModifySlideStyle(QDialog):
 
             self.select_input_folder_button.setText("Selecionar Pasta")
 
+            self.search_line_edit.setPlaceholderText(
+                "Buscar por título, cantor ou trecho da letra..."
+            )
+
             self.selected_output_folder_label.setText("Pasta de Destino Selecionada:")
 
             self.select_output_folder_button.setText("Selecionar Pasta de Destino")
 
             self.treeview.add_headers(
                 "Itens Selecionados",
-                ["Nomes dos Arquivos"],
+                ["Nomes dos Arquivos", "Trecho Encontrado"],
             )
 
             self.styles_label.setText("Estilo escolhido:")
@@ -242,13 +264,17 @@ class UIModifySlideStyle(QDialog):
 
             self.select_input_folder_button.setText("Select Folder")
 
+            self.search_line_edit.setPlaceholderText(
+                "Search by title, singer or part of the lyric..."
+            )
+
             self.selected_output_folder_label.setText("Selected Destiny Folder:")
 
             self.select_output_folder_button.setText("Select Destiny Folder")
 
             self.treeview.add_headers(
                 "Selected Items",
-                ["File Names"],
+                ["File Names", "Matched Text"],
             )
 
             self.styles_label.setText("Selected style:")
@@ -259,27 +285,158 @@ class UIModifySlideStyle(QDialog):
 
     def _open_input_folder(self) -> None:
         """
-        Opens a folder dialog.
+        Opens a folder dialog and starts indexing the presentations of the folder.
         """
         new_path = QFileDialog.getExistingDirectory(None, "Selecionar pasta")
 
         self.select_input_folder_line_edit.setText(str(new_path))
 
-        files_found = glob(os.path.join(new_path, "*.pptx"), recursive=False)
+        self.search_line_edit.clear()
+        self._show_folder_presentations()
+
+        if new_path:
+            self._index_catalogue(new_path)
+
+    def _show_folder_presentations(self) -> None:
+        """
+        Shows the presentations of the input folder (without the subfolders) on the treeview.
+        """
+        files_found = glob(
+            os.path.join(self.select_input_folder_line_edit.text(), "*.pptx"),
+            recursive=False,
+        )
+
+        self.treeview.clear()
 
         if files_found:
             file_names = [os.path.basename(file) for file in files_found]
 
-            self.treeview.clear()
-
             self.treeview.add_values(file_names)
 
-            self.treeview.setVisible(True)
+            self._show_treeview()
+
+    def _show_treeview(self) -> None:
+        """
+        Shows the treeview.
+        """
+        self.treeview.setVisible(True)
+
+        self.treeview.setEnabled(True)
+
+        if self.height() < 240:
+            self.resize(self.width(), 240)
+
+    def _search_catalogue(self, text: str) -> None:
+        """
+        Shows the presentations of the catalogue that match the text on the treeview.
+        The presentations inside the input folder (and its subfolders) are shown
+        relative to it, so they can be modified like the ones of the folder.
+
+        :param text (str): the text typed by the user.
+        """
+        if not text.strip():
+            self._show_folder_presentations()
+            return
+
+        input_folder = self.select_input_folder_line_edit.text()
+
+        entries = self.catalogue.search(text, input_folder or None)
+
+        self.treeview.clear()
+
+        self.treeview.add_values(
+            [
+                [
+                    (
+                        os.path.relpath(entry.path, input_folder)
+                        if input_folder
+                        else entry.path
+                    ),
+                    " / ".join(line for line in entry.snippet.splitlines() if line),
+                ]
+                for entry in entries
+            ]
+        )
+
+        self._show_treeview()
+
+        self.statusbar_label.setText(
+            f"{len(entries)} apresentações encontradas"
+            if self.language == "pt"
+            else f"{len(entries)} presentations found"
+        )
+
+    def _index_catalogue(self, folder: str) -> None:
+        """
+        Indexes the presentations of the folder and its subfolders on a thread.
+
+        :param folder (str): the folder.
+        """
+        self._stop_catalogue_index()
+
+        self.catalogue_worker = WorkerCatalogueIndex(self.catalogue, folder)
+        self.catalogue_thread = QThread()
+
+        self.catalogue_worker.moveToThread(self.catalogue_thread)
+
+        self.catalogue_worker.progress.connect(self._on_catalogue_progress)
+        self.catalogue_worker.finished.connect(self._on_catalogue_indexed)
+        self.catalogue_thread.started.connect(self.catalogue_worker.run)
+
+        self.catalogue_thread.start()
+
+    def _stop_catalogue_index(self) -> None:
+        """
+        Stops the indexing that is running, if there is one.
+        """
+        if self.catalogue_thread and self.catalogue_thread.isRunning():
+            if self.catalogue_worker:
+                self.catalogue_worker.finished.disconnect(self._on_catalogue_indexed)
+                self.catalogue_worker.cancel()
+
+            self.catalogue_thread.quit()
+            self.catalogue_thread.wait()
+
+    def _on_catalogue_progress(self, read: int) -> None:
+        """
+        Shows how many presentations were read by the indexing.
+
+        :param read (int): the number of presentations read.
+        """
+        self.statusbar_label.setText(
+            f"Indexando apresentações... {read}"
+            if self.language == "pt"
+            else f"Indexing presentations... {read}"
+        )
+
+    def _on_catalogue_indexed(self, read: int) -> None:
+        """
+        Called when the indexing is finished, searches again with the updated catalogue.
 
-            self.treeview.setEnabled(True)
+        :param read (int): the number of presentations read.
+        """
+        if self.catalogue_thread:
+            self.catalogue_thread.quit()
+            self.catalogue_thread.wait()
+
+        self.statusbar_label.setText(
+            f"Catálogo atualizado ({read} apresentações lidas)"
+            if self.language == "pt"
+            else f"Catalogue updated ({read} presentations read)"
+        )
 
-            if self.height() < 240:
-                self.resize(self.width(), 240)
+        if self.search_line_edit.text().strip():
+            self._search_catalogue(self.search_line_edit.text())
+
+    def done(self, result: int) -> None:
+        """
+        Closes the dialog, stopping the indexing first.
+
+        :param result (int): the result of the dialog.
+        """
+        self._stop_catalogue_index()
+
+        super().done(result)
 
     def _open_output_folder(self) -> None:
         """
@@ -353,37 +510,12 @@ class UIModifySlideStyle(QDialog):
             config = json.load(style_config)
             slide_config = SlidesConfig(**config)
 
-        file_names_list = []
-
-        for i in range(self.treeview.topLevelItemCount()):
-            item = self.treeview.topLevelItem(i)
-            if item.checkState(0) == Qt.CheckState.Checked:
-                file_names_list.append(item.text(1).strip())
-
-        for presentation in file_names_list:
-            (
-                presentation_title,
-                presentation_subtitle,
-                presentation_text,
-                image,
-                bg_image,
-            ) = extract_presentation_infos(
-                presentation_path=os.path.join(
-                    self.select_input_folder_line_edit.text(), presentation
-                )
-            )
-
-            create_slides(
-                widget=self.statusbar_label,
-                music_title=presentation_title,
-                music_singer=presentation_subtitle,
-                music_lyric=presentation_text,
-                slides_config=slide_config,
-                FILES_FOLDER=self.select_output_folder_line_edit.text(),
-                image=image,
-                background_image=bg_image,
-                language=self.language,
-            )
+        with profile_operation(
+            self.select_output_folder_line_edit.text(),
+            "restyle",
+            self.menu_bar.take_profile_request(),
+        ):
+            reused = self._modify_presentations(slide_config)
 
         self.statusbar_label.clear()
 
@@ -392,8 +524,97 @@ class UIModifySlideStyle(QDialog):
             "Sucesso!" if self.language == "pt" else "Success!",
             (
                 "As mudanças foram realizadas com sucesso"
+                + (
+                    f"\n{reused} apresentações já estavam com esse estilo e foram mantidas"
+                    if reused
+                    else ""
+                )
                 if self.language == "pt"
                 else "The changes were made successfully!"
+                + (
+                    f"\n{reused} presentations already had this style and were kept"
+                    if reused
+                    else ""
+                )
             ),
             QMessageBox.StandardButton.Ok,
         )
+
+    def _modify_presentations(self, slide_config: SlidesConfig) -> int:
+        """
+        Changes the style of the checked presentations. They are restyled in place
+        (see app.restyle) and only created again when that isn't possible.
+
+        :param slide_config (SlidesConfig): the new style.
+
+        :return (int): the number of unchanged presentations that were kept.
+        """
+        input_folder = self.select_input_folder_line_edit.text()
+        output_folder = self.select_output_folder_line_edit.text()
+
+        # the manifest of each destination folder
+        manifests: Dict[str, RenderManifest] = {}
+
+        file_names_list = [values[0].strip() for values in self.treeview.checked_values()]
+
+        for presentation in file_names_list:
+            # the presentations found by the search can be in the subfolders, they are
+            # written to the same subfolders of the output folder (two presentations
+            # with the same name in different subfolders don't replace each other)
+            folder = os.path.normpath(
+                os.path.join(output_folder, os.path.dirname(presentation))
+            )
+            os.makedirs(folder, exist_ok=True)
+
+            if folder not in manifests:
+                manifests[folder] = RenderManifest(folder)
+
+            restyle_deck(
+                os.path.join(input_folder, presentation),
+                folder,
+                slide_config,
+                manifests[folder],
+                self.statusbar_label,
+                self.language,
+            )
+
+        for manifest in manifests.values():
+            manifest.save()
+
+        return sum(manifest.reused for manifest in manifests.values())
+
+
+class WorkerCatalogueIndex(QObject):
+    """Worker class that indexes the presentations of a folder on the catalogue."""
+
+    progress = Signal(int)
+    finished = Signal(int)
+
+    def __init__(self, catalogue: DeckCatalogue, folder: str) -> None:
+        """
+        Constructor of the worker class.
+
+        :param catalogue (DeckCatalogue): the catalogue.
+        :param folder (str): the folder indexed (with its subfolders).
+        """
+        super().__init__()
+
+        self.catalogue = catalogue
+        self.folder = folder
+        self._canceled = Event()
+
+    def run(self) -> None:
+        """
+        Indexes the folder, emitting the number of presentations read.
+        """
+        read, _ = self.catalogue.index_folder(
+            self.folder, self.progress.emit, self._canceled.is_set
+        )
+
+        self.finished.emit(read)
+
+    def cancel(self) -> None:
+        """
+        Stops the indexing.
+        """
+        self._canceled.set()
@@ -6,7 +6,7 @@ from io import BytesIO
 from pathlib import Path
 
 from PySide6.QtWidgets import QVBoxLayout, QLabel, QDialog, QFileDialog
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import (
     QMouseEvent,
     QPixmap,
@@ -21,6 +21,9 @@ class ImageLabel(QLabel):
     This class is used to create the image label.
     """
 
+    # emitted when a new image is selected
+    image_changed = Signal()
+
     def __init__(self) -> None:
         super().__init__()
         self.setAcceptDrops(True)
@@ -102,6 +105,8 @@ class ImageLabel(QLabel):
         :param file_path (str): the path of the image.
         """
         self.setPixmap(QPixmap(file_path))
+        self.img_path = Path(file_path)
+        self.image_changed.emit()
 
     def set_image_data(self, image_data: bytes | BytesIO) -> None:
         """
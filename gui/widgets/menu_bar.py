@@ -4,20 +4,29 @@ The class is used to create the menu bar on the top of the main window.
 """
 
 import os
+from threading import Event
 from typing import Literal
 import webbrowser
 from pathlib import Path
 
-from PySide6.QtWidgets import QMenuBar, QMenu, QMainWindow
-from PySide6.QtCore import QRect, QPoint
+from PySide6.QtWidgets import (
+    QFileDialog,
+    QMenuBar,
+    QMenu,
+    QMainWindow,
+    QMessageBox,
+    QProgressDialog,
+)
+from PySide6.QtCore import QObject, QRect, QPoint, QThread, Signal
 from PySide6.QtGui import QActionGroup
 from dotenv import load_dotenv
 
-from gui.dialogs.ui_simple_dialog import UIGeniusKey, UiSelectedFolder
-from gui.slides_adjusts.ui_create_slide_style import UICreateSlideStyle
-from gui.slides_adjusts.ui_modify_slide_style import UIModifySlideStyle
 from language_manager import LanguageManager
 
+# the dialogs are imported only when opened, they import python-pptx, PIL and requests,
+# which would slow down the application startup
+# pylint: disable=import-outside-toplevel
+
 
 class MenuBar(QMenuBar):
     """
@@ -83,7 +92,41 @@ class MenuBar(QMenuBar):
 
         self.menu_choose_api_key.triggered.connect(self._type_api_key)
 
+        # creates the "Importar Biblioteca de Letras"
+        self.menu_import_lyric_library = self.menu.addAction(
+            "Importar Biblioteca de Letras"
+        )
+
+        self.menu_import_lyric_library.triggered.connect(self._import_lyric_library)
+
+        self.lyric_library_worker: WorkerLyricLibraryImport | None = None
+        self.lyric_library_thread: QThread | None = None
+        self.lyric_library_progress: QProgressDialog | None = None
+
+        self.menu.addSeparator()
+
+        # creates the "Perfilar Próxima Operação" diagnostics action
+        self.menu_profile_next_operation = self.menu.addAction(
+            "Perfilar Próxima Operação"
+        )
+        self.menu_profile_next_operation.setCheckable(True)
+
+    def take_profile_request(self) -> bool:
+        """
+        Returns if the next operation must be profiled, unchecking the profile action
+        (only one operation is profiled each time the action is checked).
+
+        :return (bool): True if the operation must be profiled.
+        """
+        requested = self.menu_profile_next_operation.isChecked()
+
+        self.menu_profile_next_operation.setChecked(False)
+
+        return requested
+
     def _config_slides(self) -> None:
+        from gui.slides_adjusts.ui_create_slide_style import UICreateSlideStyle
+
         create_slides_style_ui = UICreateSlideStyle(self.get_selected_language(), self)
 
         # create_slides_ui.adjustSize()
@@ -101,6 +144,8 @@ class MenuBar(QMenuBar):
         self.mainwindow.setEnabled(True)
 
     def _modify_slides(self) -> None:
+        from gui.slides_adjusts.ui_modify_slide_style import UIModifySlideStyle
+
         modify_slides_style = UIModifySlideStyle(self, self.get_selected_language())
 
         # modify_slides_style.adjustSize()
@@ -121,6 +166,8 @@ class MenuBar(QMenuBar):
         """
         Opens a dialog to choose the folder where the slides will be saved.
         """
+        from gui.dialogs.ui_simple_dialog import UiSelectedFolder
+
         load_dotenv(
             os.path.join(os.getcwd(), "settings", ".env"),
             override=True,
@@ -152,6 +199,8 @@ class MenuBar(QMenuBar):
         """
         Opens a dialog to type the API key.
         """
+        from gui.dialogs.ui_simple_dialog import UIGeniusKey
+
         load_dotenv(
             os.path.join(os.getcwd(), "settings", ".env"),
             override=True,
@@ -175,6 +224,96 @@ class MenuBar(QMenuBar):
         genius_ui.exec()
         self.mainwindow.setEnabled(True)
 
+    def _import_lyric_library(self) -> None:
+        """
+        Imports the lyric files of a folder (and its subfolders) to the lyric library
+        on a thread (see app.lyric_library).
+        """
+        language = self.get_selected_language()
+
+        if self.lyric_library_thread and self.lyric_library_thread.isRunning():
+            return
+
+        folder = QFileDialog.getExistingDirectory(
+            self.mainwindow,
+            (
+                "Selecione a pasta das letras (.txt, .lrc)"
+                if language == "pt"
+                else "Select the lyrics folder (.txt, .lrc)"
+            ),
+        )
+
+        if not folder:
+            return
+
+        self.lyric_library_worker = WorkerLyricLibraryImport(folder)
+        self.lyric_library_thread = QThread()
+
+        self.lyric_library_worker.moveToThread(self.lyric_library_thread)
+
+        self.lyric_library_progress = QProgressDialog(
+            "Importando letras..." if language == "pt" else "Importing lyrics...",
+            "Cancelar" if language == "pt" else "Cancel",
+            0,
+            0,
+            self.mainwindow,
+        )
+        self.lyric_library_progress.setWindowTitle(
+            "Biblioteca de Letras" if language == "pt" else "Lyric Library"
+        )
+        self.lyric_library_progress.canceled.connect(self.lyric_library_worker.cancel)
+
+        self.lyric_library_worker.progress.connect(self._on_lyric_library_progress)
+        self.lyric_library_worker.finished.connect(self._on_lyric_library_imported)
+        self.lyric_library_thread.started.connect(self.lyric_library_worker.run)
+
+        self.lyric_library_thread.start()
+        self.lyric_library_progress.show()
+
+    def _on_lyric_library_progress(self, imported: int) -> None:
+        """
+        Shows how many songs were imported.
+
+        :param imported (int): the number of songs imported.
+        """
+        if self.lyric_library_progress:
+            self.lyric_library_progress.setLabelText(
+                f"Importando letras... {imported}"
+                if self.get_selected_language() == "pt"
+                else f"Importing lyrics... {imported}"
+            )
+
+    def _on_lyric_library_imported(self, imported: int, removed: int) -> None:
+        """
+        Called when the import is finished, shows how many songs were imported.
+
+        :param imported (int): the number of songs imported (new or changed).
+        :param removed (int): the number of songs removed (their files were deleted).
+        """
+        if self.lyric_library_thread:
+            self.lyric_library_thread.quit()
+            self.lyric_library_thread.wait()
+
+        if self.lyric_library_progress:
+            self.lyric_library_progress.canceled.disconnect()
+            self.lyric_library_progress.close()
+
+        language = self.get_selected_language()
+
+        QMessageBox.information(
+            self.mainwindow,
+            "Biblioteca de Letras" if language == "pt" else "Lyric Library",
+            (
+                f"Músicas importadas ou atualizadas: {imported}\n"
+                f"Músicas removidas: {removed}\n"
+                "As músicas da biblioteca são criadas sem buscar no Genius"
+                if language == "pt"
+                else f"Songs imported or updated: {imported}\n"
+                f"Songs removed: {removed}\n"
+                "The songs of the library are created without searching on Genius"
+            ),
+        )
+
     def _create_about_menu(self) -> None:
         """
         Creates the about menu.
@@ -235,7 +374,8 @@ class MenuBar(QMenuBar):
 
         # creates the styles
         self.slide_style_group = QActionGroup(self.slide_style_menu)
-        for style in Path("app/slides styles").iterdir():
+        # the .pptx files in the folder are templates, not styles
+        for style in Path("app/slides styles").glob("*.json"):
             active_style = self.slide_style_menu.addAction(style.name[:-5])
             active_style.setCheckable(True)
             self.slide_style_group.addAction(active_style)
@@ -327,6 +467,18 @@ class MenuBar(QMenuBar):
                 "Seleciona a chave de API para usar na busca de musicas"
             )
 
+            self.menu_import_lyric_library.setText("Importar Biblioteca de Letras")
+            self.menu_import_lyric_library.setToolTip(
+                "Importa as letras (.txt, .lrc) de uma pasta, as músicas importadas "
+                "são criadas sem buscar no Genius"
+            )
+
+            self.menu_profile_next_operation.setText("Perfilar Próxima Operação")
+            self.menu_profile_next_operation.setToolTip(
+                "Grava um perfil de desempenho da próxima criação de slides "
+                "na pasta de destino (para relatar lentidão)"
+            )
+
             # about menu
             self.about_menu.setTitle("Sobre")
             self.about_menu_repository.setText("Repositório Git Hub")
@@ -380,6 +532,18 @@ class MenuBar(QMenuBar):
                 "Select the API key to use in the music search"
             )
 
+            self.menu_import_lyric_library.setText("Import Lyric Library")
+            self.menu_import_lyric_library.setToolTip(
+                "Imports the lyrics (.txt, .lrc) of a folder, the imported songs "
+                "are created without searching on Genius"
+            )
+
+            self.menu_profile_next_operation.setText("Profile Next Operation")
+            self.menu_profile_next_operation.setToolTip(
+                "Records a performance profile of the next slides creation "
+                "in the destination folder (to report slowness)"
+            )
+
             # about menu
             self.about_menu.setTitle("About")
             self.about_menu_repository.setText("Git Hub Repository")
@@ -406,3 +570,39 @@ class MenuBar(QMenuBar):
 
                 elif style.text() == "fundo branco":
                     style.setText("white background")
+
+
+class WorkerLyricLibraryImport(QObject):
+    """Worker class that imports the lyric files of a folder to the lyric library."""
+
+    progress = Signal(int)
+    finished = Signal(int, int)
+
+    def __init__(self, folder: str) -> None:
+        """
+        Constructor of the worker class.
+
+        :param folder (str): the folder imported (with its subfolders).
+        """
+        super().__init__()
+
+        self.folder = folder
+        self._canceled = Event()
+
+    def run(self) -> None:
+        """
+        Imports the folder, emitting the number of songs imported.
+        """
+        from app.lyric_library import lyric_library
+
+        imported, removed = lyric_library.import_folder(
+            self.folder, self.progress.emit, self._canceled.is_set
+        )
+
+        self.finished.emit(imported, removed)
+
+    def cancel(self) -> None:
+        """
+        Stops the import (the songs already imported are kept).
+        """
+        self._canceled.set()
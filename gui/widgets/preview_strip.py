@@ -0,0 +1,124 @@
+"""
+This module contains the PreviewStrip class.
+
+It shows the slides of the song (drawn by app.rasterizer) side by side,
+before the presentation is created.
+"""
+
+from typing import TYPE_CHECKING, Callable, List
+
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import QFrame, QHBoxLayout, QLabel, QScrollArea, QWidget
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# the time waited after the last change before drawing the previews (milliseconds),
+# so typing doesn't draw the slides at every key
+DEBOUNCE_MS = 40
+
+PREVIEW_HEIGHT = 180
+
+
+class PreviewStrip(QScrollArea):
+    """
+    This class is used to create the horizontal strip with the previews of the slides.
+    """
+
+    # the generation of the request and the slides as PNG
+    previews_ready = Signal(int, list)
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        """
+        Creates the preview strip.
+
+        :param parent (QWidget | None): the parent widget.
+        """
+        super().__init__(parent)
+
+        self.setWidgetResizable(True)
+        self.setFixedHeight(PREVIEW_HEIGHT + 30)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+        self.frame = QFrame()
+        self.horizontal_layout = QHBoxLayout(self.frame)
+        self.horizontal_layout.setAlignment(Qt.AlignmentFlag.AlignLeft)
+
+        self.setWidget(self.frame)
+
+        self.labels: List[QLabel] = []
+
+        # the previews of an old request are ignored
+        self._generation = 0
+
+        self._render_function: Callable[[], "Future[List[bytes]] | None"] | None = None
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(DEBOUNCE_MS)
+        self._debounce_timer.timeout.connect(self._render)
+
+        self.previews_ready.connect(self._show_previews)
+
+    def request_update(
+        self, render_function: Callable[[], "Future[List[bytes]] | None"]
+    ) -> None:
+        """
+        Asks for new previews, they are drawn when there are no changes for DEBOUNCE_MS.
+
+        :param render_function (Callable): returns the future of the previews
+            (see app.rasterizer.render_previews) or None if there is nothing to show.
+        """
+        self._render_function = render_function
+        self._debounce_timer.start()
+
+    def _render(self) -> None:
+        """
+        Starts drawing the previews on the threads of the rasterizer.
+        """
+        if not self._render_function:
+            return
+
+        self._generation += 1
+        generation = self._generation
+
+        future = self._render_function()
+
+        if future is None:
+            self._show_previews(generation, [])
+            return
+
+        # called on the thread of the rasterizer, the signal takes it to the GUI thread
+        future.add_done_callback(
+            lambda done: self.previews_ready.emit(
+                generation, done.result() if not done.exception() else []
+            )
+        )
+
+    def _show_previews(self, generation: int, previews: List[bytes]) -> None:
+        """
+        Shows the previews, reusing the labels of the previous ones.
+
+        :param generation (int): the generation of the request.
+        :param previews (List[bytes]): the slides as PNG.
+        """
+        if generation != self._generation:
+            return
+
+        while len(self.labels) < len(previews):
+            label = QLabel(self.frame)
+            label.setFixedHeight(PREVIEW_HEIGHT)
+            self.horizontal_layout.addWidget(label)
+            self.labels.append(label)
+
+        for i, label in enumerate(self.labels):
+            if i < len(previews):
+                pixmap = QPixmap()
+                pixmap.loadFromData(previews[i], "PNG")
+                label.setPixmap(pixmap)
+                label.setVisible(True)
+
+            else:
+                label.setVisible(False)
@@ -5,14 +5,10 @@ This module contains the TransparencySlider class.
 from typing import TYPE_CHECKING, List, Literal
 import io
 
-from PIL import Image
-
 from PySide6.QtWidgets import QSlider, QLabel, QWidget
 from PySide6.QtGui import QPixmap
 from PySide6.QtCore import Qt
 
-from utils.modify_image import modify_image
-
 
 if TYPE_CHECKING:
     from gui.widgets.image_label import ImageLabel
@@ -69,6 +65,12 @@ class TransparencySlider(QSlider):
         :param widgets_to_deactivate (List[QWidget]): List of widgets to disable during the process.
         :param language (Literal["pt", "en"]): the language.
         """
+        # PIL is only imported when needed, so it doesn't slow down the application startup
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+        from utils.modify_image import (  # pylint: disable=import-outside-toplevel
+            modify_image,
+        )
+
         opacity = self.value() / 100.0
 
         if self.label_with_image.img_path is None:
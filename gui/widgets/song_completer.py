@@ -0,0 +1,104 @@
+"""
+This module contains the code for the SongCompleter class.
+"""
+from typing import Dict, Tuple
+
+from PySide6.QtCore import QRect, QStringListModel, Qt, Signal
+from PySide6.QtWidgets import QCompleter, QWidget
+
+from app.song_index import song_index
+
+
+class SongCompleter(QCompleter):
+    """
+    This class is used to suggest the known songs (see app.song_index) while typing.
+
+    The suggestions are found by the index (without accents and case), so the completer
+    shows them as they are (unfiltered). The widget is changed by the chosen signal.
+    """
+
+    # the music (empty when a singer was suggested) and the singer chosen
+    chosen = Signal(str, str)
+
+    def __init__(self, widget: QWidget) -> None:
+        """
+        Creates the completer.
+
+        :param widget (QWidget): the widget where the names are typed.
+        """
+        super().__init__(widget)
+
+        self.setWidget(widget)
+        self.setModel(QStringListModel(self))
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        # the (music, singer) of each suggestion shown
+        self._suggestions: Dict[str, Tuple[str, str]] = {}
+
+        self.activated.connect(self._choose)
+
+    def suggest_songs(self, prefix: str, rect: QRect | None = None) -> None:
+        """
+        Shows the songs whose music starts with the prefix, as "music, singer".
+
+        :param prefix (str): the typed music.
+        :param rect (QRect | None): where the suggestions are shown, under the widget
+            if None.
+        """
+        self._show(
+            {
+                f"{song.music}, {song.singer}" if song.singer else song.music: (
+                    song.music,
+                    song.singer,
+                )
+                for song in song_index.suggest_songs(prefix)
+            },
+            rect,
+        )
+
+    def suggest_singers(self, prefix: str, rect: QRect | None = None) -> None:
+        """
+        Shows the singers whose name starts with the prefix.
+
+        :param prefix (str): the typed singer.
+        :param rect (QRect | None): where the suggestions are shown, under the widget
+            if None.
+        """
+        self._show(
+            {singer: ("", singer) for singer in song_index.suggest_singers(prefix)}, rect
+        )
+
+    def _show(self, suggestions: Dict[str, Tuple[str, str]], rect: QRect | None) -> None:
+        """
+        Shows the suggestions, or hides them if there is none.
+
+        :param suggestions (Dict[str, Tuple[str, str]]): the text of each suggestion
+            and its music and singer.
+        :param rect (QRect | None): where the suggestions are shown.
+        """
+        self._suggestions = suggestions
+        self.model().setStringList(list(suggestions))  # type: ignore
+
+        if not suggestions:
+            self.popup().hide()
+            return
+
+        if rect is None:
+            self.complete()
+
+        else:
+            rect.setWidth(
+                self.popup().sizeHintForColumn(0)
+                + self.popup().verticalScrollBar().sizeHint().width()
+            )
+            self.complete(rect)
+
+    def _choose(self, text: str) -> None:
+        """
+        Emits the music and singer of the chosen suggestion.
+
+        :param text (str): the text of the suggestion.
+        """
+        if text in self._suggestions:
+            self.chosen.emit(*self._suggestions[text])
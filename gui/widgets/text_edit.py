@@ -1,7 +1,18 @@
 """
 This module contains the code for the TextEdit class.
 """
-from PySide6.QtWidgets import QTextEdit, QWidget
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QKeyEvent
+from PySide6.QtWidgets import QCompleter, QTextEdit, QWidget
+
+# the keys used by the suggestions popup of the completer while it's visible
+COMPLETER_KEYS = (
+    Qt.Key.Key_Enter,
+    Qt.Key.Key_Return,
+    Qt.Key.Key_Escape,
+    Qt.Key.Key_Tab,
+    Qt.Key.Key_Backtab,
+)
 
 
 class TextEdit(QTextEdit):
@@ -9,6 +20,9 @@ class TextEdit(QTextEdit):
     This class is used to create the UI for the TextEdit.
     """
 
+    # the text of the current line before the cursor, emitted when the user types
+    line_typed = Signal(str)
+
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
 
@@ -19,6 +33,9 @@ class TextEdit(QTextEdit):
         )
         self.setMaximumHeight(500)
 
+        # the completer that shows its suggestions on this text edit
+        self.completer: QCompleter | None = None
+
         self._config_style()
 
     def _config_style(self) -> None:
@@ -26,3 +43,23 @@ class TextEdit(QTextEdit):
         This method configures the style of the TextEdit.
         """
         self.setStyleSheet("QTextEdit {border: 0px;}")
+
+    def keyPressEvent(self, event: QKeyEvent) -> None:  # pylint: disable=invalid-name
+        """
+        Types the key, the keys of the suggestions popup are left to the completer.
+
+        :param event (QKeyEvent): the key event.
+        """
+        if (
+            self.completer is not None
+            and self.completer.popup().isVisible()
+            and event.key() in COMPLETER_KEYS
+        ):
+            event.ignore()
+            return
+
+        super().keyPressEvent(event)
+
+        if event.text():
+            cursor = self.textCursor()
+            self.line_typed.emit(cursor.block().text()[: cursor.positionInBlock()])
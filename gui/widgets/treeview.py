@@ -1,14 +1,275 @@
 """
-This module contains the code for the TreeView class.
+This module contains the code for the TreeView class and its CheckableTableModel.
+
+The values are kept by the model in one list for each column and the check states in a
+bytearray, so a CSV with tens of thousands of rows doesn't create one item object per row.
+The rows are given to the view in batches (fetchMore) as the user scrolls.
 """
 
-from typing import List
+from typing import Any, List
+
+from PySide6.QtWidgets import QTreeView, QWidget
+from PySide6.QtCore import (
+    Qt,
+    QAbstractTableModel,
+    QModelIndex,
+    QPersistentModelIndex,
+)
 
-from PySide6.QtWidgets import QTreeWidget, QWidget, QTreeWidgetItem, QHeaderView
-from PySide6.QtCore import Qt
+# the number of rows given to the view each time it asks for more rows
+FETCH_BATCH_SIZE = 500
 
+ModelIndex = QModelIndex | QPersistentModelIndex
 
-class TreeView(QTreeWidget):
+
+class CheckableTableModel(QAbstractTableModel):
+    """
+    This class is the model of the TreeView.
+    The first column has the check box of the row and the other columns have the values.
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        """
+        Creates the model.
+
+        :param parent (QWidget | None): the parent widget.
+        """
+        super().__init__(parent)
+
+        self._headers: List[str] = [""]
+        self._columns: List[List[str]] = []
+        self._checked = bytearray()
+
+        # the number of rows already given to the view
+        self._fetched_rows = 0
+
+    def set_headers(self, headers: List[str]) -> None:
+        """
+        Sets the headers, the first one is the header of the check box column.
+
+        :param headers (List[str]): the headers.
+        """
+        columns_changed = len(headers) != len(self._headers)
+
+        if columns_changed:
+            self.beginResetModel()
+
+        self._headers = headers
+
+        while len(self._columns) < len(headers) - 1:
+            self._columns.append([""] * len(self._checked))
+
+        if columns_changed:
+            self.endResetModel()
+
+        else:
+            self.headerDataChanged.emit(
+                Qt.Orientation.Horizontal, 0, len(self._headers) - 1
+            )
+
+    def append_rows(self, rows: List[List[str]]) -> None:
+        """
+        Appends rows to the model, every row starts checked.
+        The view receives the new rows on the next fetchMore.
+
+        :param rows (List[List[str]]): the values of each row (without the check box column).
+        """
+        values_columns = max(len(self._headers) - 1, 1)
+
+        while len(self._columns) < values_columns:
+            self._columns.append([""] * len(self._checked))
+
+        for row in rows:
+            for column, values in enumerate(self._columns):
+                values.append(row[column] if column < len(row) else "")
+
+        self._checked.extend(b"\x01" * len(rows))
+
+        # the view only asks for more rows when scrolling, so the first rows are given now
+        if self._fetched_rows < FETCH_BATCH_SIZE and self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def clear_rows(self) -> None:
+        """
+        Removes all the rows.
+        """
+        self.beginResetModel()
+
+        self._columns = [[] for _ in self._columns]
+        self._checked = bytearray()
+        self._fetched_rows = 0
+
+        self.endResetModel()
+
+    def total_rows(self) -> int:
+        """
+        Returns the number of rows, including the ones not yet given to the view.
+
+        :return (int): the number of rows.
+        """
+        return len(self._checked)
+
+    def checked_rows(self) -> List[List[str]]:
+        """
+        Returns the values of the checked rows.
+
+        :return (List[List[str]]): the values of each checked row.
+        """
+        return [
+            [values[row] for values in self._columns]
+            for row, checked in enumerate(self._checked)
+            if checked
+        ]
+
+    def is_checked(self, row: int) -> bool:
+        """
+        Returns if the row is checked.
+
+        :param row (int): the row.
+
+        :return (bool): True if the row is checked.
+        """
+        return bool(self._checked[row])
+
+    def set_all_checked(self, checked: bool) -> None:
+        """
+        Sets the check state of all the rows.
+
+        :param checked (bool): the check state.
+        """
+        self._checked[:] = (b"\x01" if checked else b"\x00") * len(self._checked)
+
+        if self._fetched_rows:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self._fetched_rows - 1, 0),
+                [Qt.ItemDataRole.CheckStateRole],
+            )
+
+    # QAbstractTableModel methods
+    # //////////////////////////////////////////////////////////////////////////////////
+
+    def rowCount(self, parent: ModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+
+        return self._fetched_rows
+
+    def columnCount(self, parent: ModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+
+        return len(self._headers)
+
+    def canFetchMore(self, parent: ModelIndex) -> bool:
+        if parent.isValid():
+            return False
+
+        return self._fetched_rows < len(self._checked)
+
+    def fetchMore(self, parent: ModelIndex) -> None:
+        if parent.isValid():
+            return
+
+        rows_to_fetch = min(FETCH_BATCH_SIZE, len(self._checked) - self._fetched_rows)
+
+        if rows_to_fetch <= 0:
+            return
+
+        self.beginInsertRows(
+            QModelIndex(), self._fetched_rows, self._fetched_rows + rows_to_fetch - 1
+        )
+        self._fetched_rows += rows_to_fetch
+        self.endInsertRows()
+
+    def data(self, index: ModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+
+        if column == 0:
+            if role == Qt.ItemDataRole.CheckStateRole:
+                return (
+                    Qt.CheckState.Checked
+                    if self._checked[row]
+                    else Qt.CheckState.Unchecked
+                )
+
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self._columns[column - 1][row]
+
+        return None
+
+    def setData(
+        self, index: ModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole
+    ) -> bool:
+        if (
+            not index.isValid()
+            or index.column() != 0
+            or role != Qt.ItemDataRole.CheckStateRole
+        ):
+            return False
+
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        self._checked[index.row()] = checked
+
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+
+        return True
+
+    def flags(self, index: ModelIndex) -> Qt.ItemFlag:
+        flags = super().flags(index)
+
+        if index.isValid() and index.column() == 0:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+
+        return flags
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+            and section < len(self._headers)
+        ):
+            return self._headers[section]
+
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        """
+        Sorts all the rows (not only the ones given to the view) by a values column.
+
+        :param column (int): the column (the check box column can't be sorted).
+        :param order (Qt.SortOrder): the order.
+        """
+        if column < 1 or column > len(self._columns):
+            return
+
+        key_values = self._columns[column - 1]
+
+        new_order = sorted(
+            range(len(self._checked)),
+            key=lambda row: key_values[row].casefold(),
+            reverse=order == Qt.SortOrder.DescendingOrder,
+        )
+
+        self.layoutAboutToBeChanged.emit()
+
+        self._columns = [[values[row] for row in new_order] for values in self._columns]
+        self._checked = bytearray(self._checked[row] for row in new_order)
+
+        self.layoutChanged.emit()
+
+
+class TreeView(QTreeView):
     """
     This class is used to create the UI for the TreeView.
     """
@@ -25,6 +286,17 @@ class TreeView(QTreeWidget):
 
         self._config_style()
 
+        self.table_model = CheckableTableModel(self)
+        self.setModel(self.table_model)
+
+        # the rows have the same height, so the view doesn't need to measure each one
+        self.setUniformRowHeights(True)
+        self.setRootIsDecorated(False)
+
+        self.header().setSectionsClickable(True)
+        self.header().setStretchLastSection(True)
+        self.header().sectionClicked.connect(self.header_clicked)
+
         self.is_sorted_1 = True
         self.is_sorted_2 = True
 
@@ -34,11 +306,8 @@ class TreeView(QTreeWidget):
 
         :param list_headers (List[str]): the list of headers to add.
         """
-        self.setColumnCount(len(list_headers) + 1)
-        self.setHeaderLabels([f"{checked_header_name}"] + list_headers)
-        self.header().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.header().setSectionsClickable(True)
-        self.header().sectionClicked.connect(self.header_clicked)
+        self.table_model.set_headers([f"{checked_header_name}"] + list_headers)
+        self.resize_columns()
 
     def add_values(self, list_values: List[List[str]] | List[str]):
         """
@@ -46,24 +315,35 @@ class TreeView(QTreeWidget):
 
         :param list_values (List[List[str]], List[str]): the list of values to add.
         """
-        if isinstance(list_values[0], list):
-            for value in list_values:
-                child_item = QTreeWidgetItem(self)
-                child_item.setFlags(
-                    child_item.flags() | Qt.ItemFlag.ItemIsUserCheckable
-                )
-                child_item.setCheckState(0, Qt.CheckState.Checked)
-                for i, item in enumerate(value):
-                    child_item.setText(i + 1, item)
-
-        elif isinstance(list_values[0], str):
-            for value in list_values:
-                child_item = QTreeWidgetItem(self)
-                child_item.setFlags(
-                    child_item.flags() | Qt.ItemFlag.ItemIsUserCheckable
-                )
-                child_item.setCheckState(0, Qt.CheckState.Checked)
-                child_item.setText(1, value)  # type: ignore
+        if not list_values:
+            return
+
+        if isinstance(list_values[0], str):
+            list_values = [[value] for value in list_values]  # type: ignore
+
+        self.table_model.append_rows(list_values)  # type: ignore
+
+    def clear(self) -> None:
+        """
+        Removes all the values of the TreeView.
+        """
+        self.table_model.clear_rows()
+
+    def checked_values(self) -> List[List[str]]:
+        """
+        Returns the values of the checked rows.
+
+        :return (List[List[str]]): the values of each checked row, one item for each column.
+        """
+        return self.table_model.checked_rows()
+
+    def resize_columns(self) -> None:
+        """
+        Resizes the columns to their contents,
+        only the rows already given to the view are measured.
+        """
+        for column in range(self.table_model.columnCount() - 1):
+            self.resizeColumnToContents(column)
 
     def toggle_check_all(self, check: bool) -> None:
         """
@@ -71,10 +351,7 @@ class TreeView(QTreeWidget):
 
         :param check (bool): the check state to set.
         """
-        check_state = Qt.CheckState.Checked if check else Qt.CheckState.Unchecked
-
-        for i in range(self.topLevelItemCount()):
-            self.topLevelItem(i).setCheckState(0, check_state)
+        self.table_model.set_all_checked(check)
 
     def header_clicked(self, index: int) -> None:
         """
@@ -86,32 +363,27 @@ class TreeView(QTreeWidget):
         """
         if index == 0:
 
-            try:
-                self.toggle_check_all(
-                    not self.topLevelItem(0).checkState(0) == Qt.CheckState.Checked
-                )
-
-            except AttributeError:
-                pass
+            if self.table_model.total_rows():
+                self.toggle_check_all(not self.table_model.is_checked(0))
 
         elif index == 1:
 
             if self.is_sorted_1:
-                self.sortByColumn(index, Qt.SortOrder.AscendingOrder)
+                self.table_model.sort(index, Qt.SortOrder.AscendingOrder)
                 self.is_sorted_1 = False
 
             else:
-                self.sortByColumn(index, Qt.SortOrder.DescendingOrder)
+                self.table_model.sort(index, Qt.SortOrder.DescendingOrder)
                 self.is_sorted_1 = True
 
         elif index == 2:
 
             if self.is_sorted_2:
-                self.sortByColumn(index, Qt.SortOrder.AscendingOrder)
+                self.table_model.sort(index, Qt.SortOrder.AscendingOrder)
                 self.is_sorted_2 = False
 
             else:
-                self.sortByColumn(index, Qt.SortOrder.DescendingOrder)
+                self.table_model.sort(index, Qt.SortOrder.DescendingOrder)
                 self.is_sorted_2 = True
 
     def _config_style(self) -> None:
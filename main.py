@@ -17,8 +17,9 @@ from typing import Literal
 
 from PySide6.QtWidgets import QApplication, QSpacerItem, QSizePolicy
 from PySide6.QtGui import QIcon
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 
+from app.batch_journal import BatchJournal
 from gui.main_window.ui_main_window import MainWindow
 from gui.widgets.left_menu_buttons import LeftMenuButtons
 from styles import setup_theme
@@ -55,6 +56,9 @@ class MusicPPTXCreator(MainWindow):
 
         self.retranslate_ui()
 
+        # runs when the window is shown
+        QTimer.singleShot(0, self._offer_batch_resume)
+
     # def _setup_app(self) -> None:
     #     """
     #     Sets up the application.
@@ -146,6 +150,16 @@ class MusicPPTXCreator(MainWindow):
         self.pages.setCurrentWidget(self.pages_ui.page_insert_manually)
         self.button_insert_manual.set_active(True)
 
+    def _offer_batch_resume(self) -> None:
+        """
+        Shows page many and offers to resume its last batch, if it was interrupted.
+        """
+        journal = BatchJournal.load_unfinished()
+
+        if journal:
+            self.show_page_many()
+            self.pages_ui.offer_batch_resume(journal)
+
     def set_icon(self) -> None:
         """
         Sets the icon of the application.
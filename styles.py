@@ -8,7 +8,6 @@ Dark Theme
 https://pyqtdarktheme.readthedocs.io/en/latest/how_to_use.html
 """
 
-import qdarktheme
 from variables import PRIMARY_COLOR
 
 
@@ -16,8 +15,11 @@ def setup_theme() -> None:
     """
     This method sets up the theme of the application.
 
-    It uses the qdarktheme library to set the theme.
+    It uses the qdarktheme library to set the theme
+    (imported here, so only the modules that really set up the theme import it).
     """
+    import qdarktheme  # pylint: disable=import-outside-toplevel
+
     qdarktheme.setup_theme(
         theme="dark",
         corner_shape="rounded",